@@ -0,0 +1,70 @@
+"""
+DRF renderer and parser backed by orjson, with a stdlib json fallback.
+
+orjson encodes dates, datetimes, UUIDs and dataclasses natively and is
+several times faster than json on large task lists. Anything it cannot
+encode (Decimal, lazy translation strings, timedelta, querysets) goes
+through DRF's own JSONEncoder.default, so responses keep DRF's shape.
+When orjson is not installed both classes behave exactly like DRF's
+JSONRenderer and JSONParser.
+
+Enable them through REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] and
+REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def fast_json_enabled():
+    return orjson is not None and getattr(settings, 'FAST_JSON_ENABLED', True)
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    _fallback_default = JSONEncoder().default
+
+    def dumps(data):
+        return orjson.dumps(data, default=_fallback_default, option=ORJSON_OPTIONS)
+
+    loads = orjson.loads
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is available"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Indented output (browsable API, ?indent=) keeps the stdlib path
+        renderer_context = renderer_context or {}
+        if not fast_json_enabled() or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it is available"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not fast_json_enabled():
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                body = body.decode(encoding)
+            return loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,221 @@
+"""
+Per-request performance metrics.
+
+PerformanceMiddleware records, for every request, the wall time, the
+number and total time of database queries, the time spent rendering the
+response and its size, aggregated per view name and method. It then:
+
+- adds a Server-Timing header (app, db and render durations) that shows
+  up in the browser's network panel,
+- logs one JSON line on the ``backend.metrics`` logger for a sampled
+  share of requests (METRICS_LOG_SAMPLE_RATE) and for every request
+  slower than METRICS_SLOW_REQUEST_MS,
+- serves the aggregates in Prometheus text format from metrics_view,
+  mounted at /metrics for staff users, along with the lines of any
+  collector registered with registry.add_collector().
+
+Aggregates are kept per process, so each worker reports its own share of
+the traffic. Streaming responses (exports) are timed to their first byte.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the request latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+class RequestStats:
+    """Database and render timings of one request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook, active for the whole request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+class EndpointMetrics:
+    """Running totals and a latency histogram for one (view, method)"""
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.bytes = 0
+        self.statuses = {}
+
+    def observe(self, status_code, duration, stats, size):
+        self.count += 1
+        self.duration += duration
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                break
+        self.queries += stats.queries
+        self.db_time += stats.db_time
+        self.render_time += stats.render_time
+        self.bytes += size or 0
+        status_class = f'{status_code // 100}xx'
+        self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Thread-safe {(view, method): EndpointMetrics} with Prometheus output"""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def add_collector(self, collect):
+        """Append the lines returned by ``collect()`` to every render"""
+        if collect not in self.collectors:
+            self.collectors.append(collect)
+
+    def observe(self, view, method, status_code, duration, stats, size):
+        with self.lock:
+            endpoint = self.endpoints.get((view, method))
+            if endpoint is None:
+                endpoint = self.endpoints[(view, method)] = EndpointMetrics()
+            endpoint.observe(status_code, duration, stats, size)
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+    def render(self):
+        """The aggregates in Prometheus text exposition format"""
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = [
+                '# HELP http_request_duration_seconds Request wall time.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (view, method), endpoint in endpoints:
+                labels = f'view="{escape_label(view)}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, endpoint.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {endpoint.count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {endpoint.duration:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {endpoint.count}')
+
+            lines += ['# HELP http_requests_total Requests by status class.', '# TYPE http_requests_total counter']
+            for (view, method), endpoint in endpoints:
+                labels = f'view="{escape_label(view)}",method="{method}"'
+                for status_class, count in sorted(endpoint.statuses.items()):
+                    lines.append(f'http_requests_total{{{labels},status="{status_class}"}} {count}')
+
+            for name, help_text, attribute, fmt in [
+                ('http_request_db_queries_total', 'Database queries run by requests.', 'queries', '{}'),
+                ('http_request_db_seconds_total', 'Time spent in database queries.', 'db_time', '{:.6f}'),
+                ('http_request_render_seconds_total', 'Time spent rendering responses.', 'render_time', '{:.6f}'),
+                ('http_response_bytes_total', 'Response body bytes.', 'bytes', '{}'),
+            ]:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (view, method), endpoint in endpoints:
+                    labels = f'view="{escape_label(view)}",method="{method}"'
+                    lines.append(f'{name}{{{labels}}} {fmt.format(getattr(endpoint, attribute))}')
+        for collect in self.collectors:
+            lines += collect()
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class PerformanceMiddleware:
+    """Times each request; see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        stats = RequestStats()
+        request._performance_stats = stats
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        if stats.render_started is not None:
+            stats.render_time = started + duration - stats.render_started
+
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, stats, size)
+
+        if getattr(settings, 'METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f'render;dur={stats.render_time * 1000:.1f}'
+            )
+
+        slow = duration * 1000 >= getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+        if slow or random.random() < getattr(settings, 'METRICS_LOG_SAMPLE_RATE', 0.0):
+            logger.info(json.dumps({
+                'event': 'slow_request' if slow else 'request',
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'db_queries': stats.queries,
+                'db_ms': round(stats.db_time * 1000, 2),
+                'render_ms': round(stats.render_time * 1000, 2),
+                'bytes': size,
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before DRF responses are rendered
+        stats = getattr(request, '_performance_stats', None)
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Prometheus scrape endpoint for this process's request metrics"""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
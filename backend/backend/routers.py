@@ -0,0 +1,157 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+ReplicaMiddleware marks a request as replica-safe when it is a GET or
+HEAD to one of REPLICA_READ_VIEWS and the client has not written within
+the last REPLICA_PIN_SECONDS. ReplicaRouter then sends that request's
+reads to one of DATABASE_REPLICAS, picked at random per request.
+Everything else reads the primary ('default'): writes, other views,
+management commands, token and session lookups, and every read after the
+request's first write.
+
+A request that writes, or uses an unsafe method, pins its client to the
+primary for REPLICA_PIN_SECONDS. The pin is kept in a cookie, which
+follows a browser to any worker. It is also kept in the cache under a
+hash of the request's credentials, which covers token clients that drop
+cookies. That second pin reaches other workers only when CACHES points
+at a shared backend.
+"""
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'db_pin'
+PIN_KEY = 'db-pin:{}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_METHODS = ('GET', 'HEAD')
+# Credential lookups stay on the primary so a fresh login or token works at once
+PRIMARY_ONLY = {('authtoken', 'token'), ('sessions', 'session')}
+
+
+class RoutingState:
+    """Where the current request reads from, and whether it has written"""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+_state = ContextVar('database_routing', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, even in a replica-safe request"""
+    state = _state.get()
+    replica = state.replica if state is not None else None
+    if state is not None:
+        state.replica = None
+    try:
+        yield
+    finally:
+        if state is not None:
+            state.replica = replica
+
+
+class ReplicaRouter:
+    """Database router; see the module docstring"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote or state.replica is None:
+            return None
+        if (model._meta.app_label, model._meta.model_name) in PRIMARY_ONLY:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return False if db in replicas() else None
+
+
+def client_key(request):
+    """Hash of the request's credentials, or None for anonymous requests"""
+    credentials = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return hashlib.sha1(credentials.encode('utf-8')).hexdigest()
+
+
+def is_pinned(request):
+    try:
+        if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = client_key(request)
+    return key is not None and cache.get(PIN_KEY.format(key)) is not None
+
+
+def pin(request, response):
+    seconds = pin_seconds()
+    if seconds <= 0:
+        return
+    response.set_cookie(
+        PIN_COOKIE, str(int(time.time() + seconds)), max_age=seconds, httponly=True,
+        secure=settings.SESSION_COOKIE_SECURE, samesite=settings.SESSION_COOKIE_SAMESITE,
+    )
+    key = client_key(request)
+    if key is not None:
+        cache.set(PIN_KEY.format(key), 1, seconds)
+
+
+class ReplicaMiddleware:
+    """Chooses each request's read database; see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            pin(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if (
+            state is not None and replicas()
+            and request.method in REPLICA_METHODS
+            and request.resolver_match.view_name in getattr(settings, 'REPLICA_READ_VIEWS', ())
+            and not is_pinned(request)
+        ):
+            state.replica = random.choice(replicas())
+        request.read_database = state.replica if state is not None and state.replica else DEFAULT_DB_ALIAS
+        return None
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 # ── Middleware ────────────────────────────────────────────────────────────────
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at TOP
+    'backend.metrics.PerformanceMiddleware',  # Times everything below it
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +38,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.routers.ReplicaMiddleware',      # Picks each request's read database
 ]
 
 AUTHENTICATION_BACKENDS = [
@@ -101,6 +103,48 @@ else:
             }
         }
 
+# Read replicas, as replica_0, replica_1, ...: DATABASE_REPLICA_URLS takes
+# comma-separated database URLs; locally DB_REPLICA_NAMES takes SQLite files
+# (refreshed from the primary with `manage.py sync_replicas`). In tests
+# they mirror the primary.
+REPLICA_DATABASES = [
+    dj_database_url.parse(url, conn_max_age=600)
+    for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url
+]
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    REPLICA_DATABASES += [
+        {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / name}
+        for name in os.environ.get('DB_REPLICA_NAMES', '').split(',') if name
+    ]
+for index, replica in enumerate(REPLICA_DATABASES):
+    DATABASES[f'replica_{index}'] = {**replica, 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [f'replica_{index}' for index in range(len(REPLICA_DATABASES))]
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+
+# Seconds a client reads from the primary after writing, so it sees its own
+# changes despite replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '10'))
+
+# Views whose GET requests may read from a replica. The delta sync feed
+# (tasks/changes/) stays on the primary: a lagging replica could hand out a
+# cursor past rows it has not received yet.
+REPLICA_READ_VIEWS = [
+    'task_management:task-list',
+    'task_management:task-detail',
+    'task_management:task-all-tasks',
+    'task_management:task-my-tasks',
+    'task_management:task-by-milestone',
+    'task_management:task-by-location',
+    'task_management:task-search',
+    'task_management:task-export',
+    'task_management:render_all_tasks',
+    'task_management:task-summary',
+    'task_management:milestone-progress',
+    'task_management:progress-history',
+    'task_management:user-list',
+    'user-list',
+]
+
 # ── Password Validation ───────────────────────────────────────────────────────
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -112,14 +156,92 @@ AUTH_PASSWORD_VALIDATORS = [
 # ── REST Framework ────────────────────────────────────────────────────────────
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # orjson-backed JSON, falling back to the stdlib when orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'backend.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Set FAST_JSON_ENABLED=False to force the stdlib json encoder and parser
+FAST_JSON_ENABLED = os.environ.get('FAST_JSON_ENABLED', 'True') == 'True'
+
+# Keyset pagination for task lists (opt-in via ?page_size= or ?cursor=)
+TASK_PAGE_SIZE     = int(os.environ.get('TASK_PAGE_SIZE', '100'))
+TASK_MAX_PAGE_SIZE = int(os.environ.get('TASK_MAX_PAGE_SIZE', '1000'))
+
+# Delta sync (tasks/changes/): rows per response, how long deletion
+# tombstones are kept (older sync cursors must start over), and how old a
+# change must be before it is sent; the lag must exceed the longest
+# transaction that writes tasks
+TASK_SYNC_PAGE_SIZE           = int(os.environ.get('TASK_SYNC_PAGE_SIZE', '500'))
+TASK_SYNC_LAG_SECONDS         = int(os.environ.get('TASK_SYNC_LAG_SECONDS', '30'))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TASK_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+# Per-request timings (backend.metrics): Server-Timing headers, JSON logs for
+# a sampled share of requests and all slow ones, Prometheus text at /metrics
+METRICS_ENABLED         = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_SERVER_TIMING   = os.environ.get('METRICS_SERVER_TIMING', 'True') == 'True'
+METRICS_LOG_SAMPLE_RATE = float(os.environ.get('METRICS_LOG_SAMPLE_RATE', '0.01'))
+METRICS_SLOW_REQUEST_MS = float(os.environ.get('METRICS_SLOW_REQUEST_MS', '500'))
+
+# ── Logging ───────────────────────────────────────────────────────────────────
+APP_LOG_LEVEL = os.environ.get('APP_LOG_LEVEL', 'WARNING')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'backend.metrics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'tasks': {'handlers': ['console'], 'level': APP_LOG_LEVEL, 'propagate': False},
+        'users': {'handlers': ['console'], 'level': APP_LOG_LEVEL, 'propagate': False},
+    },
 }
 
 # ── Auth ──────────────────────────────────────────────────────────────────────
 AUTH_USER_MODEL = 'users.User'
 
+# API token lookups cached in CACHES for AUTH_TOKEN_CACHE_TTL seconds; tokens
+# expire after AUTH_TOKEN_EXPIRY seconds (0 = never)
+AUTH_TOKEN_CACHE_TTL  = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', '60'))
+AUTH_TOKEN_EXPIRY     = int(os.environ.get('AUTH_TOKEN_EXPIRY', '0'))
+
+# Processes used to hash passwords during bulk user creation (0 = CPU count)
+USER_HASH_WORKERS = int(os.environ.get('USER_HASH_WORKERS', '0'))
+
+# ── Caches ────────────────────────────────────────────────────────────────────
+# LocMemCache is per process. With several workers, point CACHE_BACKEND and
+# CACHE_LOCATION at a shared cache (e.g. django.core.cache.backends.redis.RedisCache
+# and redis://...) so version bumps from one worker reach the others.
+CACHES = {
+    'default': {
+        'BACKEND':  os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'polycab'),
+    }
+}
+
+# Aggregate and lookup responses cached until a write bumps their version,
+# and for at most RESPONSE_CACHE_TIMEOUT seconds. The lock timeout bounds how
+# long a request waits for another process computing the same response.
+RESPONSE_CACHE_ENABLED      = os.environ.get('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_TIMEOUT      = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '60'))
+RESPONSE_CACHE_LOCK_TIMEOUT = float(os.environ.get('RESPONSE_CACHE_LOCK_TIMEOUT', '10'))
+
 # ── Internationalisation ──────────────────────────────────────────────────────
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE     = 'UTC'
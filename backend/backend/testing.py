@@ -0,0 +1,179 @@
+"""
+Query-budget checks for API routes, shared by the app test suites.
+
+Every route is requested twice, each time against a fresh dataset seeded
+inside a rolled-back savepoint: once with SMALL and once with LARGE rows
+per table. A route passes when it answers with the expected status, runs
+the same number of queries at both sizes (anything else is an N+1), stays
+within its query budget and keeps its body under a size ceiling.
+assert_routes_covered() fails when a named route has no budget, so new
+endpoints cannot skip the suite.
+"""
+from datetime import date, timedelta
+from typing import Callable, NamedTuple, Optional
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver
+from rest_framework.test import APIClient
+
+SMALL = 3
+LARGE = 30
+# Rows per table are seeded as size * TASKS_PER_USER tasks and size users
+TASKS_PER_USER = 4
+
+PASSWORD = 'budget-pass-1'
+# Routes are measured with a cheap hasher so seeding and logins stay fast
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Route(NamedTuple):
+    """One request to measure; callables receive the seeded dataset"""
+    name: str
+    method: str
+    queries: int
+    max_kb: float
+    status: int = 200
+    args: Callable = lambda data: []
+    params: Optional[Callable] = None
+    format: Optional[str] = 'json'
+    # 'admin', 'user' (the first surveyor) or 'anonymous'
+    client: str = 'admin'
+    token: bool = False
+
+    @property
+    def label(self):
+        return f'{self.method.upper()} {self.name}'
+
+
+def seed_api_dataset(size):
+    """
+    Users, tasks spread over a few blocks, milestones, progress snapshots
+    and tombstones, all scaled by ``size``. Returns the handles routes need.
+    """
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+
+    from tasks.models import Block, DailyProgressSnapshot, Milestone, State, Task, TaskRollup
+    from users.models import User
+
+    password = make_password(PASSWORD)
+    admin = User.objects.create(
+        username='budget_admin', email='budget_admin@example.com', password=password,
+        role='admin', is_staff=True, is_superuser=True,
+    )
+    users = User.objects.bulk_create([
+        User(
+            username=f'budget_user_{i}', email=f'budget_user_{i}@example.com', password=password,
+            full_name=f'Budget User {i}', role='surveyor',
+        )
+        for i in range(size)
+    ])
+    state = State.objects.get(name='BIHAR')
+    blocks = list(Block.objects.filter(district__business_area__state=state).select_related('district__business_area__state'))[:5]
+    for code, name in Task.MILESTONE_CHOICES:
+        Milestone.objects.get_or_create(code=code, defaults={'name': name})
+
+    milestones = [code for code, _ in Task.MILESTONE_CHOICES]
+    statuses = [code for code, _ in Task.STATUS_CHOICES]
+    today = date.today()
+    Task.objects.bulk_create([
+        Task(
+            title=f'Budget task {i}', subtasks='Trench and splice', milestone=milestones[i % len(milestones)],
+            status=statuses[i % len(statuses)], assigned_to=users[i % size], block=blocks[i % len(blocks)],
+            start_date=today - timedelta(days=i), estimated_end_date=today + timedelta(days=i % 10 - 3),
+        )
+        for i in range(size * TASKS_PER_USER)
+    ])
+    TaskRollup.objects.rebuild()
+    for days_ago in range(3):
+        DailyProgressSnapshot.objects.capture(today - timedelta(days=days_ago))
+    tasks = list(Task.objects.order_by('id'))
+    tasks[-1].delete()
+
+    block = blocks[0]
+    return {
+        'admin': admin,
+        'users': users,
+        'tasks': tasks[:-1],
+        'token': Token.objects.create(user=users[0]),
+        'location': [
+            block.district.business_area.state.name, block.district.business_area.name,
+            block.district.name, block.name,
+        ],
+        'milestone': Milestone.objects.order_by('id').first(),
+    }
+
+
+def route_names(patterns, namespace=''):
+    """{(name, method)} for every named route; viewset routes per action method"""
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns, namespace)
+            continue
+        if not pattern.name:
+            continue
+        actions = getattr(pattern.callback, 'actions', None)
+        if actions:
+            # DRF adds 'head' to the shared actions dict once a GET is served
+            names |= {(namespace + pattern.name, method) for method in actions if method != 'head'}
+        else:
+            names.add((namespace + pattern.name, None))
+    return names
+
+
+class QueryBudgetMixin:
+    """TestCase mixin; see the module docstring"""
+
+    def assert_routes_covered(self, routes, urlpatterns, namespace=''):
+        covered = {(route.name, route.method) for route in routes} | {(route.name, None) for route in routes}
+        missing = sorted(
+            f'{method or "*"} {name}' for name, method in route_names(urlpatterns, namespace)
+            if (name, method) not in covered
+        )
+        self.assertEqual(missing, [], 'Routes without a query budget')
+
+    def client_for(self, route, data):
+        client = APIClient()
+        if route.token:
+            client.credentials(HTTP_AUTHORIZATION=f"Token {data['token'].key}")
+        elif route.client == 'admin':
+            client.force_authenticate(data['admin'])
+        elif route.client == 'user':
+            client.force_authenticate(data['users'][0])
+        return client
+
+    def measure(self, route, size):
+        """(queries, response, body) for ``route`` against a fresh dataset"""
+        from django.core.cache import cache
+        from django.urls import reverse
+
+        with override_settings(PASSWORD_HASHERS=FAST_HASHERS), transaction.atomic():
+            data = seed_api_dataset(size)
+            cache.clear()
+            client = self.client_for(route, data)
+            url = reverse(route.name, args=route.args(data))
+            payload = route.params(data) if route.params else None
+            request = getattr(client, route.method)
+            with CaptureQueriesContext(connection) as queries:
+                if route.method == 'get':
+                    response = request(url, payload)
+                else:
+                    response = request(url, payload, format=route.format)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+            transaction.set_rollback(True)
+        return queries, response, body
+
+    def assert_budgets(self, routes):
+        for route in routes:
+            with self.subTest(route=route.label):
+                small, _, _ = self.measure(route, SMALL)
+                large, response, body = self.measure(route, LARGE)
+                self.assertEqual(response.status_code, route.status, body[:500])
+                self.assertEqual(
+                    len(small), len(large),
+                    'Query count grows with rows:\n' + '\n'.join(query['sql'] for query in large),
+                )
+                self.assertLessEqual(len(large), route.queries, '\n'.join(query['sql'] for query in large))
+                self.assertLessEqual(len(body), route.max_kb * 1024)
@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -12,6 +14,9 @@ urlpatterns = [
     ])),
 
     path('api-auth/', include('rest_framework.urls')),
+
+    # Prometheus scrape endpoint, staff only
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,97 @@
+"""
+Compare two benchmarks.suite result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 10]
+
+A metric regresses when it moves the wrong way (latency up, throughput
+down) by more than --threshold percent. Latencies that differ by less
+than --noise-ms are never flagged, so sub-millisecond jitter on cheap
+lookups does not fail a run. Exits with status 1 when anything regressed.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def change(base, current):
+    """Percent change from base to current; positive means larger"""
+    if not base['value']:
+        return 0.0
+    return (current['value'] - base['value']) / base['value'] * 100
+
+
+def sort_key(name):
+    # "metric@size": group by metric, smallest dataset first
+    metric, _, size = name.rpartition('@')
+    return (metric, int(size)) if size.isdigit() else (name, 0)
+
+
+def compare(baseline, current, threshold=10.0, noise_ms=0.5):
+    """
+    One row per metric present in either run:
+    (name, base value, current value, percent change, verdict), where the
+    verdict is 'regression', 'improvement', 'ok', 'new' or 'missing'.
+    """
+    base_results, current_results = baseline['results'], current['results']
+    rows = []
+    for name in sorted(set(base_results) | set(current_results), key=sort_key):
+        base, now = base_results.get(name), current_results.get(name)
+        if base is None or now is None:
+            rows.append((name, base and base['value'], now and now['value'], None, 'new' if base is None else 'missing'))
+            continue
+        delta = change(base, now)
+        worse = -delta if now['higher_is_better'] else delta
+        if now['unit'] == 'ms' and abs(now['value'] - base['value']) < noise_ms:
+            verdict = 'ok'
+        elif worse > threshold:
+            verdict = 'regression'
+        elif worse < -threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'ok'
+        rows.append((name, base['value'], now['value'], delta, verdict))
+    return rows
+
+
+def report(baseline, current, rows, threshold):
+    def describe(run):
+        meta = run.get('meta', {})
+        return f"{meta.get('commit') or '?'} ({meta.get('vendor', '?')}, {meta.get('created_at', '?')})"
+
+    lines = [f'baseline {describe(baseline)}', f'current  {describe(current)}', '']
+    lines.append(f"{'metric':<52} {'baseline':>14} {'current':>14} {'change':>9}")
+    for name, base, now, delta, verdict in rows:
+        base_text = f'{base:,.2f}' if base is not None else '-'
+        now_text = f'{now:,.2f}' if now is not None else '-'
+        delta_text = f'{delta:+.1f}%' if delta is not None else ''
+        flag = '' if verdict == 'ok' else f'  {verdict.upper()}'
+        lines.append(f'{name:<52} {base_text:>14} {now_text:>14} {delta_text:>9}{flag}')
+
+    regressions = sum(1 for row in rows if row[4] == 'regression')
+    lines.append('')
+    lines.append(f'{regressions} regression(s) beyond {threshold:g}%' if regressions else
+                 f'No regressions beyond {threshold:g}%')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent change treated as a regression')
+    parser.add_argument('--noise-ms', type=float, default=0.5, help='Ignore latency changes smaller than this')
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    rows = compare(baseline, current, args.threshold, args.noise_ms)
+    print(report(baseline, current, rows, args.threshold))
+    return 1 if any(row[4] == 'regression' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Synthetic data for benchmarks, spread across every block of the
+location hierarchy
+"""
+import random
+from datetime import date, timedelta
+
+SUBTASK_NOTES = [
+    'Trench and backfill along the highway',
+    'Splice closure at the junction chamber',
+    'Duct laying and pulling of fibre',
+    'Survey of right of way with the panchayat',
+    'Pole erection and earthing',
+    '',
+]
+
+
+def seed(tasks, users=50, seed=0, batch_size=5000):
+    """
+    Insert ``users`` users and ``tasks`` tasks with bulk_create and
+    rebuild the dashboard rollup. Returns the benchmark user ids.
+    """
+    from tasks.models import TaskRollup
+
+    rng = random.Random(seed)
+    user_ids = seed_users(users)
+    add_tasks(tasks, user_ids, rng, batch_size=batch_size)
+    TaskRollup.objects.rebuild()
+    return user_ids
+
+
+def seed_users(users):
+    """Bulk-create ``users`` surveyors and return their ids"""
+    from users.models import User
+
+    User.objects.bulk_create([
+        User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com',
+             full_name=f'Bench User {i}', role='surveyor')
+        for i in range(users)
+    ])
+    return list(User.objects.filter(username__startswith='bench_user_').values_list('id', flat=True))
+
+
+def add_tasks(tasks, user_ids, rng, start=0, batch_size=5000):
+    """
+    Bulk-create ``tasks`` random tasks numbered from ``start``, so repeated
+    calls grow one dataset. The caller rebuilds the rollup afterwards.
+    """
+    from tasks.models import Block, Task
+
+    block_ids = list(Block.objects.values_list('id', flat=True))
+    milestones = [code for code, _ in Task.MILESTONE_CHOICES]
+    statuses = [code for code, _ in Task.STATUS_CHOICES]
+    epoch = date(2025, 1, 1)
+
+    batch = []
+    for i in range(start, start + tasks):
+        block_id = rng.choice(block_ids)
+        milestone = rng.choice(milestones)
+        task_status = rng.choices(statuses, weights=(2, 5, 3))[0]
+        task_start = epoch + timedelta(days=rng.randrange(730))
+        end = task_start + timedelta(days=rng.randrange(7, 180))
+        batch.append(Task(
+            title=f'{milestone} block {block_id} #{i}',
+            subtasks=rng.choice(SUBTASK_NOTES),
+            milestone=milestone,
+            status=task_status,
+            assigned_to_id=rng.choice(user_ids),
+            block_id=block_id,
+            start_date=task_start,
+            estimated_end_date=end,
+            completed_date=end if task_status == 'completed' else None,
+        ))
+        if len(batch) >= batch_size:
+            Task.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Task.objects.bulk_create(batch)
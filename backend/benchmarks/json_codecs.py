@@ -0,0 +1,87 @@
+"""
+Encode/decode throughput of the orjson renderer and parser against DRF's
+stdlib json ones, on realistic task list payloads.
+
+    DB_ENGINE=django.db.backends.sqlite3 python -m benchmarks.json_codecs --tasks 20000
+
+Payloads are built once through the task list fast path (the shape every
+list endpoint returns), so only rendering and parsing are timed.
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+
+from . import benchmark_database, setup
+
+
+def codecs():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from backend.fastjson import FastJSONParser, FastJSONRenderer
+
+    return [
+        ('stdlib json', JSONRenderer(), JSONParser()),
+        ('orjson', FastJSONRenderer(), FastJSONParser()),
+    ]
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def run(tasks, users, repeat, seed):
+    from tasks.models import Task
+    from tasks.serializers import TaskValuesSerializer
+    from .data import seed as seed_data
+
+    with benchmark_database():
+        seed_data(tasks, users=users, seed=seed)
+        serializer = TaskValuesSerializer()
+        payload = serializer.to_representation(serializer.values(Task.objects.all()))
+
+    results = {}
+    for label, renderer, parser in codecs():
+        body, encode_s = timed(lambda: renderer.render(payload), repeat)
+        _, decode_s = timed(lambda: parser.parse(io.BytesIO(body)), repeat)
+        results[label] = {
+            'bytes': len(body),
+            'encode_ms': encode_s * 1000,
+            'decode_ms': decode_s * 1000,
+            'encode_rows_per_s': len(payload) / encode_s,
+            'decode_rows_per_s': len(payload) / decode_s,
+        }
+        print(f"{label:<12} encode {encode_s * 1000:>8.1f} ms  decode {decode_s * 1000:>8.1f} ms  "
+              f"{len(body) / 1e6:.1f} MB")
+
+    base, fast = results['stdlib json'], results['orjson']
+    print(f"\norjson: {base['encode_ms'] / fast['encode_ms']:.1f}x faster encode, "
+          f"{base['decode_ms'] / fast['decode_ms']:.1f}x faster decode")
+    return {'tasks': tasks, 'codecs': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write timings to this file')
+    args = parser.parse_args(argv)
+
+    setup()
+    results = run(args.tasks, args.users, args.repeat, args.seed)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
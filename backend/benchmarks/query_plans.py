@@ -0,0 +1,145 @@
+"""
+Capture EXPLAIN plans and timings for every TaskViewSet action and the
+dashboard endpoints on a seeded dataset.
+
+    python -m benchmarks.query_plans --tasks 200000 [--repeat 5] [--json plans.json]
+
+Works on SQLite (EXPLAIN QUERY PLAN) and Postgres (EXPLAIN ANALYZE).
+Queries that scan the whole task table are flagged as FULL SCAN.
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+
+from . import benchmark_database, setup
+
+
+def endpoints(task_id, user_id):
+    """(label, url name, url kwargs, query params) for every endpoint measured"""
+    page = {'page_size': 100}
+    return [
+        ('list', 'task_management:task-list', {}, page),
+        ('retrieve', 'task_management:task-detail', {'pk': task_id}, {}),
+        ('all_tasks', 'task_management:task-all-tasks', {}, page),
+        ('my_tasks', 'task_management:task-my-tasks', {}, {'user_id': user_id, **page}),
+        ('by_milestone', 'task_management:task-by-milestone', {}, {'milestone': 'row', **page}),
+        ('by_location', 'task_management:task-by-location', {}, {'district': 'PATNA', **page}),
+        ('by_block', 'task_management:task-by-location', {}, {'block': 'BIHTA', **page}),
+        ('export', 'task_management:task-export', {}, {'block': 'BIHTA'}),
+        ('task_summary', 'task_management:task-summary', {}, {}),
+        ('milestone_progress', 'task_management:milestone-progress', {}, {}),
+        ('milestone_progress_assignee', 'task_management:milestone-progress', {},
+         {'assigned_to': user_id}),
+    ]
+
+
+# Plan lines that read every row of the task table
+FULL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on tasks_task\b'),
+    'sqlite': re.compile(r'^SCAN tasks_task\b(?!.*USING)'),
+}
+
+
+def explain(connection, sql):
+    """Return (plan lines, full scan on the task table?)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + sql)
+            lines = [row[0] for row in cursor.fetchall()]
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            lines = [row[-1] for row in cursor.fetchall()]
+    pattern = FULL_SCAN.get(connection.vendor, FULL_SCAN['sqlite'])
+    return lines, any(pattern.search(line) for line in lines)
+
+
+def fetch(client, url, params):
+    response = client.get(url, params)
+    # Streaming responses only hit the database while being consumed
+    if getattr(response, 'streaming', False):
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(connection, client, url, params, repeat):
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        fetch(client, url, params)
+    # Copy now: the next request resets connection.queries
+    captured_queries = list(captured.captured_queries)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fetch(client, url, params)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    queries = []
+    for query in captured_queries:
+        sql = query['sql']
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        plan, full_scan = explain(connection, sql)
+        queries.append({'sql': sql, 'plan': plan, 'full_scan': full_scan})
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'queries': queries,
+    }
+
+
+def run(tasks, users, repeat, seed):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from tasks.models import Task
+    from .data import seed as seed_data
+
+    with benchmark_database() as connection:
+        started = time.perf_counter()
+        user_ids = seed_data(tasks, users=users, seed=seed)
+        print(f'Seeded {tasks} tasks in {time.perf_counter() - started:.1f}s '
+              f'on {connection.vendor}\n')
+        # Refresh planner statistics so plans reflect the seeded data
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        client = APIClient()
+        task_id = Task.objects.values_list('id', flat=True).first()
+        results = {}
+        for label, name, kwargs, params in endpoints(task_id, user_ids[0]):
+            results[label] = measure(connection, client, reverse(name, kwargs=kwargs), params, repeat)
+            report(label, results[label])
+        return {'vendor': connection.vendor, 'tasks': tasks, 'endpoints': results}
+
+
+def report(label, result):
+    scans = sum(query['full_scan'] for query in result['queries'])
+    flag = f'  FULL SCAN x{scans}' if scans else ''
+    print(f"{label:<30} {result['median_ms']:>9.2f} ms  {len(result['queries'])} queries{flag}")
+    for query in result['queries']:
+        for line in query['plan']:
+            print(f'    {line}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write plans and timings to this file')
+    args = parser.parse_args(argv)
+
+    setup()
+    results = run(args.tasks, args.users, args.repeat, args.seed)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
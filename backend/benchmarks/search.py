@@ -0,0 +1,83 @@
+"""
+Latency of full-text task search against icontains scans.
+
+    DB_ENGINE=django.db.backends.sqlite3 python -m benchmarks.search --tasks 1000000
+
+"ranked" fetches the top --limit rows by relevance, as the search
+endpoint does, and so pays for ranking every match; "filtered" is the
+unranked ?search= list filter; "icontains" is the scan the admin and the
+list used before.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from . import benchmark_database, setup
+
+QUERIES = ['trench', 'spli bih', 'duct', 'survey row', 'fib']
+
+
+def variants(limit):
+    from django.db.models import Q
+
+    from tasks.models import Task
+    from tasks.search import search_tasks
+
+    def full_text(query):
+        ranked = search_tasks(Task.objects.all(), query, rank=True).order_by('-search_rank', 'id')
+        return list(ranked.values_list('id', flat=True)[:limit])
+
+    def full_text_filter(query):
+        return list(search_tasks(Task.objects.all(), query).values_list('id', flat=True)[:limit])
+
+    def icontains(query):
+        condition = Q()
+        for term in query.split():
+            condition &= Q(title__icontains=term) | Q(subtasks__icontains=term)
+        return list(Task.objects.filter(condition).values_list('id', flat=True)[:limit])
+
+    return [('ranked', full_text), ('filtered', full_text_filter), ('icontains', icontains)]
+
+
+def run(tasks, users, repeat, seed, limit):
+    from .data import seed as seed_data
+
+    with benchmark_database() as connection:
+        seed_data(tasks, users=users, seed=seed)
+        results = {}
+        for label, search in variants(limit):
+            timings = []
+            for _ in range(repeat):
+                for query in QUERIES:
+                    started = time.perf_counter()
+                    search(query)
+                    timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[label] = {
+                'p50_ms': statistics.median(timings) * 1000,
+                'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000,
+            }
+            print(f"{label:<10} p50 {results[label]['p50_ms']:>8.1f} ms  p95 {results[label]['p95_ms']:>8.1f} ms")
+        return {'vendor': connection.vendor, 'tasks': tasks, 'limit': limit, 'variants': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--json', help='Write timings to this file')
+    args = parser.parse_args(argv)
+
+    setup()
+    results = run(args.tasks, args.users, args.repeat, args.seed, args.limit)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Rows per second of TaskSerializer against the values() fast path.
+
+    DB_ENGINE=django.db.backends.sqlite3 python -m benchmarks.serializers --tasks 50000
+
+Each variant reads the full task list, including its query, and builds the
+response payload; --fields limits both to a sparse fieldset.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from . import benchmark_database, setup
+
+
+def variants(fields):
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer, TaskValuesSerializer
+
+    def model_serializer():
+        tasks = Task.objects.select_related('assigned_to', Task.LOCATION_RELATED)
+        return TaskSerializer(tasks, many=True, fields=fields).data
+
+    def values_serializer():
+        serializer = TaskValuesSerializer(fields)
+        return serializer.to_representation(serializer.values(Task.objects.all()))
+
+    return [
+        ('TaskSerializer', model_serializer),
+        ('TaskValuesSerializer', values_serializer),
+    ]
+
+
+def measure(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(build())
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {'rows': rows, 'median_s': median, 'rows_per_s': rows / median if median else 0}
+
+
+def run(tasks, users, repeat, seed, fields):
+    from .data import seed as seed_data
+
+    with benchmark_database() as connection:
+        seed_data(tasks, users=users, seed=seed)
+        results = {}
+        for label, build in variants(fields):
+            results[label] = measure(build, repeat)
+            print(f"{label:<22} {results[label]['median_s'] * 1000:>9.1f} ms  "
+                  f"{results[label]['rows_per_s']:>12,.0f} rows/s")
+        speedup = results['TaskValuesSerializer']['rows_per_s'] / results['TaskSerializer']['rows_per_s']
+        print(f'\nvalues() fast path: {speedup:.1f}x the rows per second')
+        return {'vendor': connection.vendor, 'tasks': tasks, 'fields': fields,
+                'speedup': speedup, 'variants': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fields', help='Comma-separated sparse fieldset, e.g. id,title,status')
+    parser.add_argument('--json', help='Write timings to this file')
+    args = parser.parse_args(argv)
+
+    setup()
+    fields = args.fields.split(',') if args.fields else None
+    results = run(args.tasks, args.users, args.repeat, args.seed, fields)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
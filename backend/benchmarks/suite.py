@@ -0,0 +1,239 @@
+"""
+Micro-benchmark suite: serializers, dashboard aggregations, location
+lookups and bulk writes, at several dataset sizes.
+
+    DB_ENGINE=django.db.backends.sqlite3 python -m benchmarks.suite --sizes 10000,100000,1000000
+
+One dataset is grown through each size in turn. Every measurement is the
+median of --repeat runs, and writes are rolled back so they never change
+the dataset. Results are written as JSON (by default under
+benchmarks/results/) for benchmarks.compare to diff against another run.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from . import BACKEND_DIR, benchmark_database, setup
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+# Rows serialized per measurement, so rows/s stays comparable across sizes
+SERIALIZER_ROWS = 5000
+# Rows written by each bulk-write measurement
+BULK_ROWS = 5000
+IMPORT_ROWS = 1000
+
+
+def timed(func, repeat):
+    """Median seconds of ``repeat`` calls, after one warm-up call"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def latency(seconds):
+    return {'value': round(seconds * 1000, 3), 'unit': 'ms', 'higher_is_better': False}
+
+
+def throughput(rows, seconds):
+    return {'value': round(rows / seconds, 1) if seconds else 0.0, 'unit': 'rows/s', 'higher_is_better': True}
+
+
+def rolled_back(write):
+    """Run ``write`` in a transaction that is always rolled back"""
+    from django.db import transaction
+
+    def run():
+        with transaction.atomic():
+            write()
+            transaction.set_rollback(True)
+    return run
+
+
+def serializer_benchmarks(repeat):
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer, TaskValuesSerializer
+
+    ids = list(Task.objects.order_by('id').values_list('id', flat=True)[:SERIALIZER_ROWS])
+    window = Task.objects.filter(id__range=(ids[0], ids[-1]))
+
+    def model_serializer():
+        return TaskSerializer(window.select_related('assigned_to', Task.LOCATION_RELATED), many=True).data
+
+    def values_serializer():
+        serializer = TaskValuesSerializer()
+        return serializer.to_representation(serializer.values(window))
+
+    return {
+        'serializer.TaskSerializer': throughput(len(ids), timed(model_serializer, repeat)),
+        'serializer.TaskValuesSerializer': throughput(len(ids), timed(values_serializer, repeat)),
+    }
+
+
+def endpoint_benchmarks(repeat):
+    """
+    Latency of the aggregate and location endpoints, computed on every
+    request: no conditional GET and the response cache switched off
+    """
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    endpoints = [
+        ('aggregate.task_summary', 'task_management:task-summary', [], {}),
+        ('aggregate.task_summary_district', 'task_management:task-summary', [], {'district': 'PATNA'}),
+        ('aggregate.milestone_progress', 'task_management:milestone-progress', [], {}),
+        ('aggregate.milestone_progress_district', 'task_management:milestone-progress', [], {'district': 'PATNA'}),
+        ('aggregate.progress_history', 'task_management:progress-history', [], {'bucket': 'week'}),
+        ('location.states', 'task_management:get-states', [], {}),
+        ('location.business_areas', 'task_management:get-business-areas', ['BIHAR'], {}),
+        ('location.districts', 'task_management:get-districts', ['BIHAR', 'PATNA'], {}),
+        ('location.blocks', 'task_management:get-blocks', ['BIHAR', 'PATNA', 'PATNA'], {}),
+    ]
+    results = {}
+    for name, url_name, args, params in endpoints:
+        url = reverse(url_name, args=args)
+
+        def fetch():
+            with override_settings(RESPONSE_CACHE_ENABLED=False):
+                response = client.get(url, params)
+            assert response.status_code == 200, (url, response.status_code)
+
+        results[name] = latency(timed(fetch, repeat))
+    return results
+
+
+def location_benchmarks(repeat):
+    from tasks.models import Block
+
+    return {
+        'location.path_map': latency(timed(Block.objects.path_map, repeat)),
+        'location.resolve': latency(timed(lambda: Block.objects.resolve('BIHAR', 'PATNA', 'PATNA', 'BIHTA'), repeat)),
+    }
+
+
+def write_benchmarks(repeat, user_ids, size):
+    from tasks.importer import import_tasks
+    from tasks.models import Task
+    from .data import add_tasks
+
+    def bulk_create():
+        # Numbered past the dataset so natural keys never collide
+        add_tasks(BULK_ROWS, user_ids, random.Random(size), start=size * 10)
+
+    ids = list(Task.objects.filter(status='in_progress').values_list('id', flat=True)[:BULK_ROWS])
+
+    def set_status():
+        Task.objects.filter(id__in=ids).set_status('completed')
+
+    header = 'title,milestone,status,state,business_area,district,block,start_date,estimated_end_date\n'
+    today = date.today()
+    rows = ''.join(
+        f'Imported {i},row,nil,BIHAR,PATNA,PATNA,BIHTA,{today},{today + timedelta(days=30)}\n'
+        for i in range(IMPORT_ROWS)
+    )
+    upload = (header + rows).encode('utf-8')
+
+    def import_csv():
+        result = import_tasks(io.BytesIO(upload), 'csv')
+        assert result['created'] == IMPORT_ROWS, result
+
+    return {
+        'write.bulk_create': throughput(BULK_ROWS, timed(rolled_back(bulk_create), repeat)),
+        'write.set_status': throughput(len(ids), timed(rolled_back(set_status), repeat)),
+        'write.import_csv': throughput(IMPORT_ROWS, timed(rolled_back(import_csv), repeat)),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, users, repeat, seed):
+    from tasks.models import DailyProgressSnapshot, TaskRollup
+    from .data import add_tasks, seed_users
+
+    rng = random.Random(seed)
+    results = {}
+    with benchmark_database() as connection:
+        user_ids = seed_users(users)
+        seeded = 0
+        for size in sorted(sizes):
+            started = time.perf_counter()
+            add_tasks(size - seeded, user_ids, rng, start=seeded)
+            seeded = size
+            TaskRollup.objects.rebuild()
+            DailyProgressSnapshot.objects.capture(date.today())
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            print(f'\n{size:,} tasks (seeded in {time.perf_counter() - started:.1f}s)')
+
+            measured = {}
+            measured.update(serializer_benchmarks(repeat))
+            measured.update(endpoint_benchmarks(repeat))
+            measured.update(location_benchmarks(repeat))
+            measured.update(write_benchmarks(repeat, user_ids, size))
+            for name, result in measured.items():
+                print(f"  {name:<40} {result['value']:>14,.2f} {result['unit']}")
+                results[f'{name}@{size}'] = result
+        vendor = connection.vendor
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'vendor': vendor,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'sizes': sorted(sizes),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated task counts, e.g. 10000,100000')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Results file (default: benchmarks/results/<time>-<commit>.json)')
+    args = parser.parse_args(argv)
+
+    setup()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run(sizes, args.users, args.repeat, args.seed)
+
+    path = args.json
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{results['meta']['commit'] or 'local'}.json")
+    with open(path, 'w') as fh:
+        json.dump(results, fh, indent=2)
+    print(f'\nResults written to {path}')
+
+
+if __name__ == '__main__':
+    main()
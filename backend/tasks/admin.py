@@ -1,15 +1,20 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Task, Milestone
+from .models import Task, Milestone, State, BusinessArea, District, Block
+from .search import search_tasks
 from users.models import User
 
 
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'milestone_display', 'assigned_to_display', 
                     'location_display', 'date_range', 'status_badge')
-    list_filter = ('status', 'milestone', 'state')
-    search_fields = ('title', 'subtasks', 'assigned_to__username', 'assigned_to__full_name', 
-                     'state', 'business_area', 'district', 'block')
+    list_filter = ('status', 'milestone', 'block__district__business_area__state')
+    # title and subtasks go through the full-text index, see get_search_results()
+    search_fields = ('assigned_to__username', 'assigned_to__full_name', 
+                     'block__district__business_area__state__name', 'block__district__business_area__name',
+                     'block__district__name', 'block__name')
+    list_select_related = ('assigned_to', 'block__district__business_area__state')
+    autocomplete_fields = ('block',)
     date_hierarchy = 'start_date'
     ordering = ('-start_date',)
     
@@ -18,13 +23,19 @@ class TaskAdmin(admin.ModelAdmin):
             'fields': ('title', 'subtasks', 'milestone', 'assigned_to', 'status')
         }),
         ('Location Details', {
-            'fields': ('state', 'business_area', 'district', 'block')
+            'fields': ('block',)
         }),
         ('Timeline', {
             'fields': ('start_date', 'estimated_end_date', 'completed_date')
         }),
     )
     
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= search_tasks(queryset, search_term)
+        return results, may_have_duplicates
+
     def milestone_display(self, obj):
         """Display the milestone name"""
         milestone_names = {
@@ -51,16 +62,8 @@ class TaskAdmin(admin.ModelAdmin):
     
     def location_display(self, obj):
         """Display hierarchical location information"""
-        parts = []
-        if obj.state:
-            parts.append(obj.state)
-        if obj.business_area:
-            parts.append(obj.business_area)
-        if obj.district:
-            parts.append(obj.district)
-        if obj.block:
-            parts.append(obj.block)
-        return ' > '.join(parts) if parts else '—'
+        parts = [obj.state, obj.business_area, obj.district, obj.block.name]
+        return ' > '.join(part for part in parts if part) or '—'
     location_display.short_description = 'Location'
     
     def date_range(self, obj):
@@ -115,7 +118,35 @@ class MilestoneAdmin(admin.ModelAdmin):
     task_count.short_description = 'Associated Tasks'
 
 
+class StateAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
+
+class BusinessAreaAdmin(admin.ModelAdmin):
+    list_display = ('name', 'state')
+    list_filter = ('state',)
+    search_fields = ('name',)
+
+
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ('name', 'business_area')
+    list_filter = ('business_area__state', 'business_area')
+    search_fields = ('name',)
+
+
+class BlockAdmin(admin.ModelAdmin):
+    list_display = ('name', 'district')
+    list_filter = ('district__business_area',)
+    list_select_related = ('district',)
+    search_fields = ('name', 'district__name')
+
+
 # Register models with custom admin classes
 admin.site.register(Task, TaskAdmin)
 # admin.site.register(User, UserAdmin)  # Commented out to avoid AlreadyRegistered error
 admin.site.register(Milestone, MilestoneAdmin)
+admin.site.register(State, StateAdmin)
+admin.site.register(BusinessArea, BusinessAreaAdmin)
+admin.site.register(District, DistrictAdmin)
+admin.site.register(Block, BlockAdmin)
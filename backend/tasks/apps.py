@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tasks'
\ No newline at end of file
+    name = 'tasks'
+
+    def ready(self):
+        from .search import repair_search_index
+        post_migrate.connect(repair_search_index, sender=self)
+        # Connect the response cache invalidation receivers
+        from . import caching  # noqa: F401
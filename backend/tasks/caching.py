@@ -0,0 +1,317 @@
+"""
+Versioned response cache for the aggregate and lookup endpoints.
+
+Responses are cached in Django's cache framework under a key built from
+the request path, any extra values (e.g. today's date) and the current
+version of every data namespace the endpoint reads. Writes bump those
+versions instead of deleting entries: post_save/post_delete on users,
+milestones and locations, post_save on tasks, plus tasks_bulk_changed
+(set-based task writes and every task delete) and users_bulk_changed.
+Bumps run when the writing transaction commits, and not at all if it
+rolls back. Until then that transaction reads the namespaces it wrote
+around the cache, so it sees its own changes and never stores them for
+anyone else. Entries are built
+from the primary database, so replica lag cannot outlive a bump.
+
+Concurrent misses on the same key are coalesced. Within a process the
+first request computes and the rest wait for its result. Across processes
+a short cache lock lets one process compute while the others poll for the
+entry, falling back to computing themselves after
+RESPONSE_CACHE_LOCK_TIMEOUT seconds.
+
+Endpoints with a fingerprint keep the ETag and Last-Modified it gave
+when the entry was built, so a hit answers conditional requests without
+touching the database. Hit, miss and coalesced counts per endpoint are
+exported on /metrics.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from backend.metrics import registry
+from backend.routers import primary_reads
+from users.signals import users_bulk_changed
+from .conditional import conditional_response, validated_response, validators
+from .models import BusinessArea, Block, District, Milestone, State, Task
+from .signals import tasks_bulk_changed
+
+# Data namespaces endpoints depend on; each has a version in the cache
+TASKS = 'tasks'
+USERS = 'users'
+MILESTONES = 'milestones'
+LOCATIONS = 'locations'
+
+VERSION_KEY = 'response-cache:version:{}'
+ENTRY_KEY = 'response-cache:{}:{}'
+LOCK_KEY = 'response-cache:lock:{}'
+# How often a request polls for an entry another process is computing
+LOCK_POLL_INTERVAL = 0.05
+
+OUTCOMES = ('hit', 'miss', 'coalesced')
+
+
+def cache_enabled():
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+
+
+def initial_version():
+    # Never reuse a number an evicted version key may have had
+    return time.time_ns()
+
+
+def current_versions(namespaces):
+    """[version] for ``namespaces``, starting any that are missing"""
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_now(namespaces):
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, initial_version(), None)
+
+
+class VersionBump:
+    """on_commit callback bumping ``namespaces``"""
+
+    def __init__(self, namespaces):
+        self.namespaces = namespaces
+
+    def __call__(self):
+        bump_now(self.namespaces)
+
+
+def bump(*namespaces, using=None):
+    """Invalidate every cached response reading ``namespaces`` once committed"""
+    transaction.on_commit(VersionBump(namespaces), using=using)
+
+
+def pending_namespaces():
+    """Namespaces written by this thread's open transactions"""
+    pending = set()
+    for connection in connections.all(initialized_only=True):
+        for _, callback, *_ in connection.run_on_commit:
+            if isinstance(callback, VersionBump):
+                pending.update(callback.namespaces)
+    return pending
+
+
+class Entry(NamedTuple):
+    status: int
+    data: Any
+    etag: Optional[str]
+    timestamp: Optional[int]
+
+    def response(self):
+        return Response(self.data, status=self.status)
+
+
+class CacheStats:
+    """Thread-safe per-endpoint counts of hits, misses and coalesced misses"""
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, outcome):
+        with self.lock:
+            self.counts[(endpoint, outcome)] = self.counts.get((endpoint, outcome), 0) + 1
+
+    def snapshot(self):
+        """{endpoint: {outcome: count}}"""
+        with self.lock:
+            counts = dict(self.counts)
+        stats = {}
+        for (endpoint, outcome), count in counts.items():
+            stats.setdefault(endpoint, dict.fromkeys(OUTCOMES, 0))[outcome] = count
+        return stats
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def render(self):
+        """Prometheus exposition lines, for registry.add_collector()"""
+        lines = [
+            '# HELP response_cache_requests_total Cacheable requests by outcome.',
+            '# TYPE response_cache_requests_total counter',
+        ]
+        for endpoint, outcomes in sorted(self.snapshot().items()):
+            for outcome in OUTCOMES:
+                lines.append(
+                    f'response_cache_requests_total{{endpoint="{endpoint}",outcome="{outcome}"}} {outcomes[outcome]}'
+                )
+        return lines
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    At most one call per key runs at a time in this process; callers
+    arriving while it runs wait for it and share its result
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def run(self, key, func):
+        """(func's result, whether this caller ran it)"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = func()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, True
+
+
+stats = CacheStats()
+flights = SingleFlight()
+registry.add_collector(stats.render)
+
+
+def wait_for_entry(key, timeout):
+    """The entry another process is computing, or None after ``timeout``"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def compute_entry(key, request, fingerprint, build, extra):
+    """(entry, whether it came from another process)"""
+    lock_timeout = getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 10)
+    lock = LOCK_KEY.format(key)
+    locked = cache.add(lock, 1, lock_timeout)
+    if not locked:
+        entry = wait_for_entry(key, lock_timeout)
+        if entry is not None:
+            return entry, True
+    try:
+        # Entries outlive the request, so build them from the primary
+        # rather than from a replica that may not have the latest writes
+        with primary_reads():
+            etag, timestamp = validators(request, fingerprint, *extra) if fingerprint else (None, None)
+            response = build()
+        if 200 <= response.status_code < 300:
+            entry = Entry(response.status_code, response.data, etag, timestamp)
+            cache.set(key, entry, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60))
+        else:
+            # Errors are shared with waiting requests but never stored
+            entry = Entry(response.status_code, response.data, None, None)
+    finally:
+        if locked:
+            cache.delete(lock)
+    return entry, False
+
+
+def uncached_response(request, fingerprint, build, extra):
+    return conditional_response(request, fingerprint, build, *extra) if fingerprint else build()
+
+
+def cached_response(request, endpoint, namespaces, fingerprint, build, *extra):
+    """
+    conditional_response() (plain ``build()`` when ``fingerprint`` is None)
+    served from the versioned cache: ``build()`` only runs when no entry
+    exists for the request under the current versions of ``namespaces``.
+    ``endpoint`` labels the stats.
+    """
+    if not cache_enabled():
+        return uncached_response(request, fingerprint, build, extra)
+    if pending_namespaces().intersection(namespaces):
+        # This transaction changed what the response reads
+        stats.record(endpoint, 'miss')
+        return uncached_response(request, fingerprint, build, extra)
+
+    digest = hashlib.sha1(
+        repr((request.get_full_path(), current_versions(namespaces), extra)).encode('utf-8')
+    ).hexdigest()
+    key = ENTRY_KEY.format(endpoint, digest)
+    entry = cache.get(key)
+    if entry is not None:
+        stats.record(endpoint, 'hit')
+    else:
+        (entry, elsewhere), ran = flights.run(key, lambda: compute_entry(key, request, fingerprint, build, extra))
+        stats.record(endpoint, 'miss' if ran and not elsewhere else 'coalesced')
+
+    if entry.etag is None:
+        return entry.response()
+    return validated_response(request, entry.etag, entry.timestamp, entry.response)
+
+
+@receiver(post_save, sender=Task)
+@receiver(tasks_bulk_changed)
+def bump_tasks(sender, using=None, **kwargs):
+    bump(TASKS, using=using)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def bump_users(sender, using, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached response shows
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump(USERS, using=using)
+
+
+@receiver(users_bulk_changed)
+def bump_bulk_users(sender, **kwargs):
+    bump(USERS)
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+def bump_milestones(sender, using, **kwargs):
+    bump(MILESTONES, using=using)
+
+
+@receiver(post_save, sender=State)
+@receiver(post_save, sender=BusinessArea)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=State)
+@receiver(post_delete, sender=BusinessArea)
+@receiver(post_delete, sender=District)
+@receiver(post_delete, sender=Block)
+def bump_locations(sender, using, **kwargs):
+    bump(LOCATIONS, using=using)
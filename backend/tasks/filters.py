@@ -0,0 +1,157 @@
+"""
+Server-side filtering, search and ordering for task lists.
+
+Every filter is a plain column predicate so it is pushed down to SQL and
+can use the Task indexes; the list is then paginated by keyset on the
+chosen ordering, so clients only receive the rows they display.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Task
+from .search import search_tasks
+
+DUE_SOON_DAYS = 7
+# Largest ?days= accepted with due_soon
+MAX_DUE_SOON_DAYS = 3650
+
+
+def location_filters(params):
+    """
+    Build Task filter kwargs from the location levels present in params
+    """
+    filters = {}
+    for field, lookup in Task.LOCATION_LOOKUPS.items():
+        value = params.get(field)
+        if value:
+            filters[lookup] = value
+    return filters
+
+
+def parse_choices(params, name, choices):
+    """Comma-separated choice codes from params[name], validated"""
+    values = [value for value in params.get(name, '').split(',') if value]
+    valid = {code for code, _ in choices}
+    unknown = [value for value in values if value not in valid]
+    if unknown:
+        raise ValidationError({name: f"Unknown value(s): {', '.join(unknown)}"})
+    return values
+
+
+def parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Date must be in YYYY-MM-DD format."})
+
+
+def parse_flag(params, name):
+    return params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def depends_on_today(params):
+    """Whether the overdue or due_soon filters make the result move on at midnight"""
+    return parse_flag(params, 'overdue') or parse_flag(params, 'due_soon')
+
+
+def parse_ordering(params):
+    """
+    ``?ordering=-estimated_end_date,title`` as order_by() terms, limited
+    to Task.ORDERING_FIELDS. The id tie-breaker keeps keyset pages stable.
+    """
+    raw = params.get('ordering')
+    if not raw:
+        return None
+    ordering = [term.strip() for term in raw.split(',') if term.strip()]
+    unknown = [term for term in ordering if term.lstrip('-') not in Task.ORDERING_FIELDS]
+    if unknown:
+        raise ValidationError({'ordering': f"Cannot order by: {', '.join(unknown)}"})
+    names = [term.lstrip('-') for term in ordering]
+    if len(set(names)) != len(names):
+        raise ValidationError({'ordering': "Each field may appear only once."})
+    return ordering + ['id']
+
+
+# Parameters handled by filter_tasks(); search and ordering are list-only
+FILTER_PARAMS = (
+    'status', 'milestone', *Task.LOCATION_LOOKUPS, 'assigned_to',
+    'start_from', 'start_to', 'due_from', 'due_to', 'overdue', 'due_soon',
+)
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the column filters in ``params`` (see TaskFilterBackend) to
+    ``queryset``, raising ValidationError for malformed values
+    """
+    filters = location_filters(params)
+    conditions = Q()
+
+    statuses = parse_choices(params, 'status', Task.STATUS_CHOICES)
+    if statuses:
+        filters['status__in'] = statuses
+    milestones = parse_choices(params, 'milestone', Task.MILESTONE_CHOICES)
+    if milestones:
+        filters['milestone__in'] = milestones
+
+    assignee = params.get('assigned_to')
+    if assignee == 'none':
+        filters['assigned_to__isnull'] = True
+    elif assignee:
+        if not assignee.isdigit():
+            raise ValidationError({'assigned_to': "Expected a user id or 'none'."})
+        filters['assigned_to_id'] = int(assignee)
+
+    for name, lookup in (
+        ('start_from', 'start_date__gte'), ('start_to', 'start_date__lte'),
+        ('due_from', 'estimated_end_date__gte'), ('due_to', 'estimated_end_date__lte'),
+    ):
+        value = parse_date(params, name)
+        if value is not None:
+            filters[lookup] = value
+
+    today = timezone.now().date()
+    if parse_flag(params, 'overdue'):
+        conditions &= ~Q(status='completed') & Q(estimated_end_date__lt=today)
+    if parse_flag(params, 'due_soon'):
+        days = params.get('days', str(DUE_SOON_DAYS))
+        if not days.isdigit() or int(days) > MAX_DUE_SOON_DAYS:
+            raise ValidationError({'days': f"Expected a number of days up to {MAX_DUE_SOON_DAYS}."})
+        conditions &= Q(status='in_progress', estimated_end_date__range=[today, today + timedelta(days=int(days))])
+
+    return queryset.filter(conditions, **filters)
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Combinable task list filters:
+
+        status, milestone         comma-separated codes
+        state, business_area,
+        district, block           location names
+        assigned_to               user id, or "none" for unassigned
+        start_from, start_to      start_date range (inclusive)
+        due_from, due_to          estimated_end_date range (inclusive)
+        overdue                   open tasks past their estimated end date
+        due_soon                  in-progress tasks due within ?days= (7, at most 3650)
+        search                    full-text prefix match on title and subtasks
+        ordering                  see parse_ordering()
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        queryset = filter_tasks(queryset, params)
+        search = params.get('search', '').strip()
+        if search:
+            queryset = search_tasks(queryset, search)
+        ordering = parse_ordering(params)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
@@ -0,0 +1,269 @@
+"""
+Bulk task import from CSV or XLSX.
+
+Rows are parsed as a stream, validated in memory against the location
+hierarchy, milestone and status choices, and written in batches with
+``bulk_create(update_conflicts=True)`` keyed on (block, milestone, title),
+so importing the same file twice updates rather than duplicates tasks.
+The whole file is imported in one transaction: a file that turns out to
+be unreadable partway through leaves no rows behind.
+"""
+import csv
+import io
+from xml.etree.ElementTree import ParseError
+from zipfile import BadZipFile
+from collections import Counter
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from .models import Block, Task, TaskRollup
+from .signals import tasks_bulk_changed
+
+IMPORT_BATCH_SIZE = 2000
+
+REQUIRED_COLUMNS = (
+    'title', 'milestone', 'state', 'business_area', 'district', 'block',
+    'start_date', 'estimated_end_date',
+)
+# Columns refreshed when a row matches an existing task
+UPDATE_FIELDS = [
+    'subtasks', 'status', 'assigned_to', 'start_date', 'estimated_end_date',
+    'completed_date', 'updated_at',
+]
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file cannot be read as a task import"""
+
+
+def read_csv(stream):
+    """Yield one dict per CSV row from a binary or text stream"""
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(stream)
+    except UnicodeDecodeError:
+        raise ImportFormatError("CSV files must be UTF-8 encoded")
+    except csv.Error as exc:
+        raise ImportFormatError(f"Malformed CSV: {exc}")
+
+
+def read_xlsx(stream):
+    """Yield one dict per row of the first worksheet, header row first"""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportFormatError("XLSX import requires the openpyxl package")
+
+    # Raised by corrupt, truncated or renamed files, at open or mid-sheet
+    unreadable = (BadZipFile, InvalidFileException, KeyError, ParseError, IndexError, OSError)
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except unreadable:
+        raise ImportFormatError("The file is not a readable XLSX workbook")
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if any(value not in (None, '') for value in values):
+                yield dict(zip(header, values))
+    except unreadable:
+        raise ImportFormatError("The file is not a readable XLSX workbook")
+    finally:
+        workbook.close()
+
+
+READERS = {
+    'csv': read_csv,
+    'xlsx': read_xlsx,
+}
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in READERS:
+        raise ImportFormatError(f"Unsupported file type '{extension}', expected csv or xlsx")
+    return extension
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+
+def clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+class TaskImporter:
+    """
+    Validates and upserts task rows. Lookup tables are loaded once so
+    per-row validation never touches the database.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.block_ids = Block.objects.path_map()
+        self.milestones = self.choice_map(Task.MILESTONE_CHOICES)
+        self.statuses = self.choice_map(Task.STATUS_CHOICES)
+        self.user_ids = {}
+        self.seen = {}
+        self.today = timezone.now().date()
+        self.created = 0
+        self.updated = 0
+        self.rejected = []
+
+    @staticmethod
+    def choice_map(choices):
+        """Accept either the stored code or the display label"""
+        mapping = {}
+        for code, label in choices:
+            mapping[code.lower()] = code
+            mapping[label.lower()] = code
+        return mapping
+
+    @transaction.atomic
+    def run(self, rows):
+        batch = []
+        # Row 1 is the header, so data rows are numbered from 2
+        for number, row in enumerate(rows, start=2):
+            task = self.validate(number, row)
+            if task is None:
+                continue
+            batch.append(task)
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+        return self.result()
+
+    def result(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'rejected': self.rejected,
+        }
+
+    def reject(self, number, errors):
+        self.rejected.append({'row': number, 'errors': errors})
+
+    def validate(self, number, row):
+        row = {clean(key).lower(): value for key, value in row.items() if key}
+        errors = {}
+        for column in REQUIRED_COLUMNS:
+            if not clean(row.get(column)):
+                errors[column] = "This field is required."
+        if errors:
+            self.reject(number, errors)
+            return None
+
+        path = tuple(clean(row[column]) for column in ('state', 'business_area', 'district', 'block'))
+        block_id = self.block_ids.get(path)
+        if block_id is None:
+            errors['block'] = "Unknown location: " + " > ".join(path)
+
+        milestone = self.milestones.get(clean(row['milestone']).lower())
+        if milestone is None:
+            errors['milestone'] = f"Unknown milestone '{clean(row['milestone'])}'"
+
+        task_status = self.statuses.get(clean(row.get('status')).lower() or 'in_progress')
+        if task_status is None:
+            errors['status'] = f"Unknown status '{clean(row.get('status'))}'"
+
+        dates = {}
+        for column in ('start_date', 'estimated_end_date', 'completed_date'):
+            if column == 'completed_date' and not clean(row.get(column)):
+                continue
+            try:
+                dates[column] = parse_date(row[column])
+            except (TypeError, ValueError):
+                errors[column] = "Date must be in YYYY-MM-DD format."
+        if 'start_date' in dates and 'estimated_end_date' in dates:
+            if dates['start_date'] > dates['estimated_end_date']:
+                errors['start_date'] = "Start date cannot be after estimated end date."
+
+        assigned_to_id = None
+        username = clean(row.get('assigned_to'))
+        if username:
+            assigned_to_id = self.user_id(username)
+            if assigned_to_id is None:
+                errors['assigned_to'] = f"Unknown user '{username}'"
+
+        title = clean(row['title'])[:255]
+        key = (block_id, milestone, title)
+        if not errors and key in self.seen:
+            errors['title'] = f"Duplicate of row {self.seen[key]}"
+        if errors:
+            self.reject(number, errors)
+            return None
+        self.seen[key] = number
+
+        # Same completed_date rules as Task.save()
+        completed_date = None
+        if task_status == 'completed':
+            completed_date = dates.get('completed_date') or self.today
+
+        return Task(
+            title=title,
+            subtasks=clean(row.get('subtasks')),
+            milestone=milestone,
+            status=task_status,
+            assigned_to_id=assigned_to_id,
+            block_id=block_id,
+            start_date=dates['start_date'],
+            estimated_end_date=dates['estimated_end_date'],
+            completed_date=completed_date,
+        )
+
+    def user_id(self, username):
+        if username not in self.user_ids:
+            self.user_ids[username] = (
+                User.objects.filter(username=username).values_list('id', flat=True).first()
+            )
+        return self.user_ids[username]
+
+    def write(self, batch):
+        """Upsert one batch and apply its rollup deltas"""
+        titles = {task.title for task in batch}
+        block_ids = {task.block_id for task in batch}
+        existing = {
+            (block_id, milestone, title): task_status
+            for block_id, milestone, title, task_status in (
+                Task.objects.select_for_update()
+                .filter(title__in=titles, block_id__in=block_ids)
+                .values_list('block_id', 'milestone', 'title', 'status')
+            )
+        }
+        deltas = Counter()
+        for task in batch:
+            old_status = existing.get((task.block_id, task.milestone, task.title))
+            if old_status is None:
+                self.created += 1
+            else:
+                self.updated += 1
+                deltas[(task.milestone, old_status, task.block_id)] -= 1
+            deltas[task.rollup_key()] += 1
+
+        options = {'update_conflicts': True, 'update_fields': UPDATE_FIELDS}
+        if connection.features.supports_update_conflicts_with_target:
+            options['unique_fields'] = ['block', 'milestone', 'title']
+        Task.objects.bulk_create(batch, **options)
+        TaskRollup.objects.apply_deltas(deltas)
+        tasks_bulk_changed.send(sender=Task, using=Task.objects.db)
+
+
+def import_tasks(stream, file_format, batch_size=IMPORT_BATCH_SIZE):
+    """Import every row of ``stream`` and return the created/updated/rejected summary"""
+    if file_format not in READERS:
+        raise ImportFormatError(f"Unsupported file type '{file_format}', expected csv or xlsx")
+    return TaskImporter(batch_size).run(READERS[file_format](stream))
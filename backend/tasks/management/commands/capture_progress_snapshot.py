@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DailyProgressSnapshot
+
+
+class Command(BaseCommand):
+    help = "Record today's task counts per milestone and district for the progress history charts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help="Day to file the snapshot under (YYYY-MM-DD), e.g. when a run slips past midnight",
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("--date must be in YYYY-MM-DD format")
+
+        rows = DailyProgressSnapshot.objects.capture(day)
+        self.stdout.write(self.style.SUCCESS(f"Captured {rows} progress snapshot rows"))
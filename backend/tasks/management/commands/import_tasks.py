@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_BATCH_SIZE, ImportFormatError, detect_format, import_tasks
+
+
+class Command(BaseCommand):
+    help = "Import tasks from a CSV or XLSX file, updating tasks that share a block, milestone and title"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file to import")
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Rows written per bulk upsert",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            file_format = detect_format(path)
+            with open(path, 'rb') as stream:
+                result = import_tasks(stream, file_format, batch_size=options['batch_size'])
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for rejected in result['rejected']:
+            errors = '; '.join(f"{field}: {message}" for field, message in rejected['errors'].items())
+            self.stderr.write(f"Row {rejected['row']}: {errors}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} new and {result['updated']} updated tasks, "
+            f"rejected {len(result['rejected'])} rows"
+        ))
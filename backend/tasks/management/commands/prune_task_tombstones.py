@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskTombstone, tombstone_retention_days
+
+
+class Command(BaseCommand):
+    help = "Delete task deletion tombstones older than TASK_TOMBSTONE_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        deleted = TaskTombstone.objects.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} tombstones older than {tombstone_retention_days()} days"
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import TaskRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the TaskRollup dashboard counters and verify them against a full recount"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only verify the stored counters, do not rebuild them",
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            buckets = TaskRollup.objects.rebuild()
+            self.stdout.write(f"Rebuilt {buckets} rollup buckets")
+
+        expected = TaskRollup.objects.recount()
+        stored = TaskRollup.objects.stored()
+        mismatched = {
+            key for key in expected.keys() | stored.keys()
+            if expected.get(key, 0) != stored.get(key, 0)
+        }
+        for key in sorted(mismatched):
+            self.stderr.write(
+                f"{'/'.join(map(str, key))}: stored {stored.get(key, 0)}, expected {expected.get(key, 0)}"
+            )
+        if mismatched:
+            raise CommandError(f"{len(mismatched)} rollup buckets differ from a full recount")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"TaskRollup matches a full recount ({sum(expected.values())} tasks)"
+        ))
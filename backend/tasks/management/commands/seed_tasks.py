@@ -0,0 +1,61 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from tasks.seeding import create_demo_accounts, seed_tasks
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users and tasks across every block for capacity testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100000, help="Number of tasks to create")
+        parser.add_argument('--users', type=int, default=200, help="Number of field users to assign tasks to")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same data")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes generating rows (1 generates in this process)",
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help="Delete every existing task first (tombstones are kept for syncing clients)",
+        )
+        parser.add_argument(
+            '--demo-accounts',
+            action='store_true',
+            help="Also create the demo admin and field accounts if they are missing",
+        )
+
+    def handle(self, *args, **options):
+        if options['tasks'] < 0 or options['users'] < 1:
+            raise CommandError("--tasks must be 0 or more and --users at least 1")
+
+        started = time.perf_counter()
+        verbose = options['verbosity'] > 1
+
+        def progress(written):
+            if verbose:
+                self.stdout.write(f"  {written:,} tasks written ({time.perf_counter() - started:.1f}s)")
+
+        if options['demo_accounts']:
+            for username in create_demo_accounts():
+                self.stdout.write(f"Created demo account: {username}")
+
+        try:
+            tasks, users = seed_tasks(
+                options['tasks'], options['users'], seed=options['seed'],
+                workers=options['workers'], clear=options['clear'], progress=progress,
+            )
+        except IntegrityError:
+            raise CommandError("Generated tasks clash with existing titles; rerun with --clear to replace them")
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {tasks:,} tasks for {users:,} users in {time.perf_counter() - started:.1f}s"
+        ))
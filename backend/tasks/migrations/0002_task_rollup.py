@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-18 10:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+KEY_FIELDS = ('milestone', 'status', 'state', 'business_area', 'district', 'block')
+
+
+def populate_rollup(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskRollup = apps.get_model('tasks', 'TaskRollup')
+    db = schema_editor.connection.alias
+    rows = (
+        Task.objects.using(db).order_by()
+        .values_list(*KEY_FIELDS)
+        .annotate(total=Count('id'))
+    )
+    TaskRollup.objects.using(db).bulk_create(
+        [TaskRollup(count=row[-1], **dict(zip(KEY_FIELDS, row[:-1]))) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('milestone', models.CharField(max_length=50)),
+                ('status', models.CharField(max_length=20)),
+                ('state', models.CharField(max_length=100)),
+                ('business_area', models.CharField(max_length=100)),
+                ('district', models.CharField(max_length=100)),
+                ('block', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskrollup',
+            constraint=models.UniqueConstraint(fields=('milestone', 'status', 'state', 'business_area', 'district', 'block'), name='unique_task_rollup_bucket'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,205 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+from tasks.location_data import iter_blocks
+
+
+def populate_locations(apps, schema_editor):
+    """
+    Create the hierarchy from the seed data plus any location path that
+    existing tasks use, so the backfill never drops a task's location
+    """
+    Task = apps.get_model('tasks', 'Task')
+    State = apps.get_model('tasks', 'State')
+    BusinessArea = apps.get_model('tasks', 'BusinessArea')
+    District = apps.get_model('tasks', 'District')
+    Block = apps.get_model('tasks', 'Block')
+    db = schema_editor.connection.alias
+
+    paths = list(iter_blocks())
+    paths += Task.objects.using(db).order_by().values_list(
+        'state', 'business_area', 'district', 'block'
+    ).distinct()
+
+    states, areas, districts, blocks = {}, {}, {}, set()
+    for state, business_area, district, block in paths:
+        if state not in states:
+            states[state] = State.objects.using(db).create(name=state)
+        area_key = (state, business_area)
+        if area_key not in areas:
+            areas[area_key] = BusinessArea.objects.using(db).create(
+                state=states[state], name=business_area)
+        district_key = area_key + (district,)
+        if district_key not in districts:
+            districts[district_key] = District.objects.using(db).create(
+                business_area=areas[area_key], name=district)
+        if district_key + (block,) not in blocks:
+            blocks.add(district_key + (block,))
+            Block.objects.using(db).create(district=districts[district_key], name=block)
+
+
+def backfill_task_blocks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Block = apps.get_model('tasks', 'Block')
+    db = schema_editor.connection.alias
+
+    block_ids = {
+        tuple(row[:4]): row[4]
+        for row in Block.objects.using(db).values_list(
+            'district__business_area__state__name', 'district__business_area__name',
+            'district__name', 'name', 'id',
+        )
+    }
+    paths = Task.objects.using(db).order_by().values_list(
+        'state', 'business_area', 'district', 'block'
+    ).distinct()
+    for path in paths:
+        state, business_area, district, block = path
+        Task.objects.using(db).filter(
+            state=state, business_area=business_area, district=district, block=block,
+        ).update(block_ref=block_ids[path])
+
+
+def populate_rollup(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskRollup = apps.get_model('tasks', 'TaskRollup')
+    db = schema_editor.connection.alias
+    rows = (
+        Task.objects.using(db).order_by()
+        .values_list('milestone', 'status', 'block_id')
+        .annotate(total=Count('id'))
+    )
+    TaskRollup.objects.using(db).bulk_create(
+        [TaskRollup(milestone=milestone, status=status, block_id=block_id, count=total)
+         for milestone, status, block_id, total in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='State',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BusinessArea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('state', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='business_areas', to='tasks.state')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('business_area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='districts', to='tasks.businessarea')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Block',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='tasks.district')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='businessarea',
+            constraint=models.UniqueConstraint(fields=('state', 'name'), name='unique_business_area_per_state'),
+        ),
+        migrations.AddConstraint(
+            model_name='district',
+            constraint=models.UniqueConstraint(fields=('business_area', 'name'), name='unique_district_per_business_area'),
+        ),
+        migrations.AddConstraint(
+            model_name='block',
+            constraint=models.UniqueConstraint(fields=('district', 'name'), name='unique_block_per_district'),
+        ),
+        migrations.RunPython(populate_locations, migrations.RunPython.noop),
+
+        # Point every task at its block, then drop the free-text columns
+        migrations.AddField(
+            model_name='task',
+            name='block_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='tasks.block'),
+        ),
+        migrations.RunPython(backfill_task_blocks, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_location_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_block_idx',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='state',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='business_area',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='district',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='block',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='block_ref',
+            new_name='block',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='block',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to='tasks.block'),
+        ),
+
+        # Re-key the dashboard rollup on the integer block id
+        migrations.DeleteModel(
+            name='TaskRollup',
+        ),
+        migrations.CreateModel(
+            name='TaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('milestone', models.CharField(max_length=50)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tasks.block')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskrollup',
+            constraint=models.UniqueConstraint(fields=('milestone', 'status', 'block'), name='unique_task_rollup_bucket'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_tasks(apps, schema_editor):
+    """
+    Keep the oldest task of each (block, milestone, title) as is and
+    suffix the others with their id, so the unique constraint can be
+    added without deleting any rows
+    """
+    Task = apps.get_model('tasks', 'Task')
+    db = schema_editor.connection.alias
+    duplicated = (
+        Task.objects.using(db).order_by()
+        .values_list('block_id', 'milestone', 'title')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for block_id, milestone, title, _ in duplicated:
+        ids = Task.objects.using(db).filter(
+            block_id=block_id, milestone=milestone, title=title,
+        ).order_by('id').values_list('id', flat=True)[1:]
+        for task_id in ids:
+            suffix = f' (#{task_id})'
+            Task.objects.using(db).filter(pk=task_id).update(
+                title=title[:255 - len(suffix)] + suffix
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_conditional_get'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_tasks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('block', 'milestone', 'title'), name='unique_task_per_block_milestone'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 11:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProgressSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('milestone', models.CharField(choices=[('desktop_survey_design', 'Desktop Survey Design'), ('network_health_checkup', 'Network Health Checkup'), ('hoto_existing', 'HOTO-Existing'), ('detailed_design', 'Detailed Design'), ('row', 'ROW (Right of Way)'), ('ifc', 'IFC (Issued for Construction)'), ('ic', 'IC (Initial Construction)'), ('as_built', 'As-Built'), ('hoto_final', 'HOTO (Final)'), ('field_survey', 'Field Survey')], max_length=50)),
+                ('nil_count', models.IntegerField(default=0)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('business_area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tasks.businessarea')),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tasks.district')),
+            ],
+            options={
+                'ordering': ['date', 'milestone'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyprogresssnapshot',
+            index=models.Index(fields=['business_area', 'date'], name='snapshot_area_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyprogresssnapshot',
+            constraint=models.UniqueConstraint(fields=('date', 'milestone', 'district'), name='unique_daily_progress_snapshot'),
+        ),
+    ]
@@ -1,7 +1,17 @@
-from django.db import models
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.conf import settings
 
+from users.signals import users_bulk_changed
+from .signals import tasks_bulk_changed
+
 
 class Milestone(models.Model):
     """
@@ -18,6 +28,168 @@ class Milestone(models.Model):
         ordering = ['name']
 
 
+class State(models.Model):
+    """
+    Top level of the location hierarchy
+    """
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['id']
+
+
+class BusinessArea(models.Model):
+    """
+    Business area within a state
+    """
+    state = models.ForeignKey(State, on_delete=models.CASCADE, related_name='business_areas')
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['state', 'name'], name='unique_business_area_per_state'),
+        ]
+
+
+class District(models.Model):
+    """
+    District within a business area
+    """
+    business_area = models.ForeignKey(BusinessArea, on_delete=models.CASCADE, related_name='districts')
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['business_area', 'name'], name='unique_district_per_business_area'),
+        ]
+
+
+class BlockManager(models.Manager):
+
+    def resolve(self, state, business_area, district, block):
+        """Look up a block, with its whole location loaded, by the names of its path"""
+        return self.select_related('district__business_area__state').get(
+            name=block,
+            district__name=district,
+            district__business_area__name=business_area,
+            district__business_area__state__name=state,
+        )
+
+    def path_map(self):
+        """{(state, business_area, district, block): block id} for in-memory lookups"""
+        rows = self.values_list(
+            'district__business_area__state__name', 'district__business_area__name',
+            'district__name', 'name', 'id',
+        )
+        return {tuple(row[:4]): row[4] for row in rows}
+
+
+class Block(models.Model):
+    """
+    Block within a district, the location every task is attached to
+    """
+    district = models.ForeignKey(District, on_delete=models.CASCADE, related_name='blocks')
+    name = models.CharField(max_length=100)
+
+    objects = BlockManager()
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['district', 'name'], name='unique_block_per_district'),
+        ]
+
+
+# Most ids deleted per DELETE statement
+DELETE_BATCH_SIZE = 1000
+
+
+class TaskQuerySet(models.QuerySet):
+
+    @property
+    def write_db(self):
+        """The alias writes through this queryset go to, as update() picks it"""
+        return self._db or router.db_for_write(self.model, **self._hints)
+
+    def set_status(self, new_status):
+        """
+        Move every task in the queryset to ``new_status`` with one UPDATE,
+        keeping the completed_date rules of Task.save() and the rollup in
+        step. Returns {id: previous status} for the matched tasks.
+        """
+        using = self.write_db
+        with transaction.atomic(using=using):
+            previous = dict(
+                self.using(using).select_for_update(of=('self',)).order_by().values_list('id', 'status')
+            )
+            changed = self.using(using).order_by().exclude(status=new_status)
+            # One row per rollup bucket rather than per task
+            moved = list(changed.values(*TaskRollup.KEY_FIELDS).annotate(count=models.Count('id')))
+            if moved:
+                if new_status == 'completed':
+                    completed_date = Coalesce('completed_date', Value(timezone.now().date()))
+                else:
+                    completed_date = None
+                changed.update(
+                    status=new_status,
+                    completed_date=completed_date,
+                    updated_at=timezone.now(),
+                )
+                deltas = Counter()
+                for row in moved:
+                    deltas[(row['milestone'], row['status'], row['block_id'])] -= row['count']
+                    deltas[(row['milestone'], new_status, row['block_id'])] += row['count']
+                TaskRollup.objects.db_manager(using).apply_deltas(deltas)
+                tasks_bulk_changed.send(sender=Task, using=using)
+        return previous
+
+    def delete(self):
+        """
+        Delete the tasks by id in bounded batches, returning the same
+        (count, {label: count}) as QuerySet.delete(). Task has no per-row
+        delete receivers, so each batch is a single DELETE, and the rollup,
+        tombstones and deletion counter are updated with one statement each
+        rather than per row.
+        """
+        using = self.write_db
+        # No savepoint, as in Django's own Collector.delete()
+        with transaction.atomic(using=using, savepoint=False):
+            rows = list(
+                self.using(using).select_for_update(of=('self',)).order_by()
+                .values_list('id', *TaskRollup.KEY_FIELDS)
+            )
+            if not rows:
+                return 0, {}
+            ids = [row[0] for row in rows]
+            batch_size = min(connections[using].ops.bulk_batch_size(['id'], ids) or len(ids), DELETE_BATCH_SIZE)
+            for start in range(0, len(ids), batch_size):
+                models.QuerySet(Task, using=using).filter(pk__in=ids[start:start + batch_size]).delete()
+            deltas = Counter()
+            for _, *key in rows:
+                deltas[tuple(key)] -= 1
+            TaskRollup.objects.db_manager(using).apply_deltas(deltas)
+            TaskTombstone.objects.db_manager(using).bulk_create(
+                [TaskTombstone(task_id=task_id) for task_id in ids], batch_size=DELETE_BATCH_SIZE
+            )
+            ChangeCounter.objects.db_manager(using).bump(ChangeCounter.TASK_DELETIONS, by=len(ids))
+        tasks_bulk_changed.send(sender=Task, using=using)
+        return len(ids), {Task._meta.label: len(ids)}
+
+
 class Task(models.Model):
     """
     Task model for tracking work items
@@ -42,7 +214,19 @@ class Task(models.Model):
         ('hoto_final', 'HOTO (Final)'),
         ('field_survey', 'Field Survey'),
     ]
-    
+
+    # Filter lookups for each level of the location hierarchy
+    LOCATION_LOOKUPS = {
+        'state': 'block__district__business_area__state__name',
+        'business_area': 'block__district__business_area__name',
+        'district': 'block__district__name',
+        'block': 'block__name',
+    }
+    # select_related() path that loads the whole location with the task
+    LOCATION_RELATED = 'block__district__business_area__state'
+    # Non-null columns list endpoints may be ordered (and keyset-paginated) by
+    ORDERING_FIELDS = ('start_date', 'estimated_end_date', 'title', 'status', 'milestone', 'created_at', 'updated_at')
+
     # Task information
     title = models.CharField(max_length=255)
     subtasks = models.TextField(blank=True)
@@ -60,11 +244,8 @@ class Task(models.Model):
         default='in_progress'
     )
     
-    # Location details
-    state = models.CharField(max_length=100)
-    business_area = models.CharField(max_length=100)
-    district = models.CharField(max_length=100)
-    block = models.CharField(max_length=100)
+    # Location: the block, from which district, business area and state follow
+    block = models.ForeignKey(Block, on_delete=models.PROTECT, related_name='tasks')
     
     # Timeline
     start_date = models.DateField()
@@ -74,7 +255,25 @@ class Task(models.Model):
     # Audit fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
     
+    @property
+    def district(self):
+        return self.block.district.name
+
+    @property
+    def business_area(self):
+        return self.block.district.business_area.name
+
+    @property
+    def state(self):
+        return self.block.district.business_area.state.name
+
+    def rollup_key(self):
+        """Key of the TaskRollup bucket this task is counted in"""
+        return tuple(getattr(self, field) for field in TaskRollup.KEY_FIELDS)
+
     def save(self, *args, **kwargs):
         # Set completed_date when status changes to completed
         if self.status == 'completed' and not self.completed_date:
@@ -82,11 +281,350 @@ class Task(models.Model):
         # Clear completed_date if status is not completed
         elif self.status != 'completed':
             self.completed_date = None
-            
-        super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            old_key = None
+            if not self._state.adding and self.pk is not None:
+                # The bucket the row is counted in now, not the one this
+                # instance was loaded from: another save or an update() may
+                # have moved it since
+                old_key = (
+                    Task.objects.db_manager(using).select_for_update()
+                    .filter(pk=self.pk).values_list(*TaskRollup.KEY_FIELDS).first()
+                )
+            super().save(*args, **kwargs)
+            new_key = self.rollup_key()
+            if old_key != new_key:
+                deltas = Counter({new_key: 1})
+                if old_key is not None:
+                    deltas[old_key] -= 1
+                TaskRollup.objects.db_manager(using).apply_deltas(deltas)
+
+    def delete(self, using=None, keep_parents=False):
+        # Through TaskQuerySet.delete(), which keeps the rollup, tombstones
+        # and deletion counter in step
+        if self.pk is None:
+            raise ValueError(
+                f"{self._meta.object_name} object can't be deleted because its "
+                f"{self._meta.pk.attname} attribute is set to None."
+            )
+        using = using or router.db_for_write(Task, instance=self)
+        result = Task.objects.db_manager(using).filter(pk=self.pk).delete()
+        self.pk = None
+        return result
     
     def __str__(self):
         return self.title
     
     class Meta:
         ordering = ['-start_date', 'title']
+        indexes = [
+            # Default ordering and keyset pagination: (-start_date, title, id)
+            models.Index(fields=['-start_date', 'title', 'id'], name='task_ordering_idx'),
+            # by_milestone and milestone-scoped dashboards, already in list order
+            models.Index(fields=['milestone', '-start_date', 'title'], name='task_milestone_idx'),
+            # my_tasks / assignee scoping, already in list order
+            models.Index(fields=['assigned_to', '-start_date', 'title'], name='task_assignee_idx'),
+            # Status filters and due_soon ranges on estimated_end_date
+            models.Index(fields=['status', 'estimated_end_date'], name='task_status_due_idx'),
+            # Max(updated_at) for conditional GET fingerprints
+            models.Index(fields=['updated_at', 'id'], name='task_updated_idx'),
+        ]
+        constraints = [
+            # Natural key that bulk imports upsert on
+            models.UniqueConstraint(fields=['block', 'milestone', 'title'], name='unique_task_per_block_milestone'),
+        ]
+
+
+
+class TaskRollupManager(models.Manager):
+
+    def apply_deltas(self, deltas):
+        """
+        Add a {rollup key: count delta} mapping to the stored counters.
+        Missing buckets are inserted empty in one statement, then buckets
+        sharing a delta are bumped together, so a batch costs 1 + (distinct
+        deltas) queries however many buckets it touches.
+        """
+        # {delta: {(milestone, status): [block ids]}}
+        by_delta = {}
+        for (milestone, task_status, block_id), delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, {}).setdefault((milestone, task_status), []).append(block_id)
+        if not by_delta:
+            return
+        using = self._db or router.db_for_write(self.model)
+        # Inside a caller's transaction a savepoint would only add two queries
+        with transaction.atomic(using=using, savepoint=False):
+            # ignore_conflicts also covers another writer creating a bucket first
+            self.db_manager(using).bulk_create(
+                [
+                    TaskRollup(milestone=milestone, status=task_status, block_id=block_id, count=0)
+                    for groups in by_delta.values()
+                    for (milestone, task_status), block_ids in groups.items()
+                    for block_id in block_ids
+                ],
+                ignore_conflicts=True,
+            )
+            for delta, groups in by_delta.items():
+                # One term per (milestone, status) keeps the condition shallow
+                condition = Q()
+                for (milestone, task_status), block_ids in groups.items():
+                    condition |= Q(milestone=milestone, status=task_status, block_id__in=block_ids)
+                self.db_manager(using).filter(condition).update(count=F('count') + delta)
+
+    def recount(self):
+        """Fresh {rollup key: count} mapping computed from the Task table"""
+        rows = (
+            Task.objects.order_by()
+            .values_list(*TaskRollup.KEY_FIELDS)
+            .annotate(total=models.Count('id'))
+        )
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def stored(self):
+        """Current non-empty {rollup key: count} mapping"""
+        rows = self.exclude(count=0).values_list(*TaskRollup.KEY_FIELDS, 'count')
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def rebuild(self):
+        """Replace every bucket with a full recount of the Task table"""
+        with transaction.atomic(using=self.db):
+            counts = self.recount()
+            self.all().delete()
+            self.bulk_create(
+                [TaskRollup(count=count, **dict(zip(TaskRollup.KEY_FIELDS, key)))
+                 for key, count in counts.items()],
+                batch_size=1000,
+            )
+        return len(counts)
+
+
+class TaskRollup(models.Model):
+    """
+    Task counts per (milestone, status, block) bucket, kept in step with
+    the Task table so dashboards read O(groups) rows instead of scanning
+    every task
+    """
+    KEY_FIELDS = ('milestone', 'status', 'block_id')
+
+    milestone = models.CharField(max_length=50)
+    status = models.CharField(max_length=20)
+    block = models.ForeignKey(Block, on_delete=models.CASCADE, related_name='+')
+    count = models.IntegerField(default=0)
+
+    objects = TaskRollupManager()
+
+    def __str__(self):
+        return f"{self.milestone}/{self.status} @ {self.block_id}: {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['milestone', 'status', 'block'],
+                name='unique_task_rollup_bucket',
+            ),
+        ]
+
+
+def tombstone_retention_days():
+    return getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30)
+
+
+class TaskTombstoneManager(models.Manager):
+
+    def prune(self, before=None):
+        """Delete tombstones older than the retention window; returns how many"""
+        if before is None:
+            before = timezone.now() - timedelta(days=tombstone_retention_days())
+        deleted, _ = self.filter(deleted_at__lt=before).delete()
+        return deleted
+
+
+class TaskTombstone(models.Model):
+    """
+    Id of a deleted task, so delta sync clients can drop it from their
+    copy. Tombstones are read in id order after a sync cursor.
+    """
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = TaskTombstoneManager()
+
+    def __str__(self):
+        return f"task {self.task_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class DailyProgressSnapshotQuerySet(models.QuerySet):
+
+    def capture(self, day=None):
+        """
+        Record the current TaskRollup counts as the snapshot for ``day``
+        (today by default), replacing any earlier capture of that day so
+        reruns are safe. Returns the number of rows written.
+        """
+        day = day or timezone.now().date()
+        rows = (
+            TaskRollup.objects.using(self.db).order_by().exclude(count=0)
+            .values('milestone', 'status', 'block__district_id', 'block__district__business_area_id')
+            .annotate(total=models.Sum('count'))
+        )
+        snapshots = {}
+        for row in rows:
+            field = DailyProgressSnapshot.STATUS_FIELDS.get(row['status'])
+            if field is None:
+                continue
+            key = (row['milestone'], row['block__district_id'])
+            if key not in snapshots:
+                snapshots[key] = DailyProgressSnapshot(
+                    date=day,
+                    milestone=row['milestone'],
+                    district_id=row['block__district_id'],
+                    business_area_id=row['block__district__business_area_id'],
+                )
+            setattr(snapshots[key], field, getattr(snapshots[key], field) + row['total'])
+
+        with transaction.atomic(using=self.db):
+            self.model.objects.using(self.db).filter(date=day).delete()
+            self.bulk_create(snapshots.values(), batch_size=1000)
+            ChangeCounter.objects.db_manager(self.db).bump(ChangeCounter.SNAPSHOTS)
+        return len(snapshots)
+
+    def series(self, bucket, start, end):
+        """
+        Summed status counts for each day, week or month in [start, end],
+        taken from the last captured day of each bucket. Counts are levels,
+        not flows, so only those days' rows are read.
+        """
+        bucket_start = DailyProgressSnapshot.BUCKETS[bucket]
+        captured = self.filter(date__range=(start, end)).order_by().values_list('date', flat=True).distinct()
+        as_of = {}
+        for day in captured:
+            key = bucket_start(day)
+            as_of[key] = max(as_of.get(key, day), day)
+
+        sums = {field: models.Sum(field) for field in DailyProgressSnapshot.STATUS_FIELDS.values()}
+        totals = {
+            row['date']: row
+            for row in self.filter(date__in=as_of.values()).order_by().values('date').annotate(**sums)
+        }
+        series = []
+        for key in sorted(as_of):
+            row = totals[as_of[key]]
+            counts = {code: row[field] or 0 for code, field in DailyProgressSnapshot.STATUS_FIELDS.items()}
+            series.append({'date': key, 'as_of': as_of[key], **counts, 'total': sum(counts.values())})
+        return series
+
+
+class DailyProgressSnapshot(models.Model):
+    """
+    Task counts by status per (date, milestone, district), captured once a
+    day from TaskRollup so progress charts read history without scanning
+    tasks. The business area is stored alongside the district to filter
+    without a join.
+    """
+    # Count column for each task status
+    STATUS_FIELDS = {
+        'nil': 'nil_count',
+        'in_progress': 'in_progress_count',
+        'completed': 'completed_count',
+    }
+    # First day of the day, week (Monday) or month bucket containing a date
+    BUCKETS = {
+        'day': lambda day: day,
+        'week': lambda day: day - timedelta(days=day.weekday()),
+        'month': lambda day: day.replace(day=1),
+    }
+    # Filter lookups for the location levels snapshots are kept at
+    LOCATION_LOOKUPS = {
+        'state': 'business_area__state__name',
+        'business_area': 'business_area__name',
+        'district': 'district__name',
+    }
+
+    date = models.DateField()
+    milestone = models.CharField(max_length=50, choices=Task.MILESTONE_CHOICES)
+    business_area = models.ForeignKey(BusinessArea, on_delete=models.CASCADE, related_name='+')
+    district = models.ForeignKey(District, on_delete=models.CASCADE, related_name='+')
+    nil_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    objects = DailyProgressSnapshotQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.date} {self.milestone} @ {self.district_id}"
+
+    class Meta:
+        ordering = ['date', 'milestone']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'milestone', 'district'], name='unique_daily_progress_snapshot'),
+        ]
+        indexes = [
+            # Business-area scoped charts
+            models.Index(fields=['business_area', 'date'], name='snapshot_area_date_idx'),
+        ]
+
+
+class ChangeCounterManager(models.Manager):
+
+    def bump(self, name, by=1):
+        """Atomically add ``by`` to the named counter, creating it if needed"""
+        if self.filter(name=name).update(value=F('value') + by):
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(name=name, value=by)
+        except IntegrityError:
+            self.filter(name=name).update(value=F('value') + by)
+
+    def current(self, *names):
+        """{name: value} for the requested counters, 0 for ones never bumped"""
+        values = dict(self.filter(name__in=names).values_list('name', 'value'))
+        return {name: values.get(name, 0) for name in names}
+
+
+class ChangeCounter(models.Model):
+    """
+    Monotonic named counters for changes that leave no row behind to
+    inspect, such as deletions, used to fingerprint cached responses
+    """
+    TASK_DELETIONS = 'task_deletions'
+    USERS = 'users'
+    LOCATIONS = 'locations'
+    SNAPSHOTS = 'progress_snapshots'
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    objects = ChangeCounterManager()
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def count_user_change(sender, using, update_fields=None, **kwargs):
+    # Task payloads embed the assignee; logins only touch last_login
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    ChangeCounter.objects.db_manager(using).bump(ChangeCounter.USERS)
+
+
+@receiver(users_bulk_changed)
+def count_user_bulk_change(sender, **kwargs):
+    ChangeCounter.objects.bump(ChangeCounter.USERS)
+
+
+@receiver(post_save, sender=State)
+@receiver(post_save, sender=BusinessArea)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=State)
+@receiver(post_delete, sender=BusinessArea)
+@receiver(post_delete, sender=District)
+@receiver(post_delete, sender=Block)
+def count_location_change(sender, using, **kwargs):
+    ChangeCounter.objects.db_manager(using).bump(ChangeCounter.LOCATIONS)
@@ -0,0 +1,139 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Opaque-cursor keyset pagination over the Task ordering.
+
+    Rows are ordered by the queryset's order_by() (by default
+    (-start_date, title, id)), always with id as the final tie-breaker,
+    and each page continues strictly after the last row of the previous
+    one, so fetching page N costs the same as fetching page 1: no OFFSET
+    scans and no COUNT(*). The cursor carries the last row's value for
+    each ordering column.
+
+    Pagination is opt-in so existing clients that expect a bare JSON
+    array keep working: a request is only paginated when it carries a
+    ``cursor`` or ``page_size`` query parameter.
+    """
+    ordering = ('-start_date', 'title', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_default_page_size(self):
+        return getattr(settings, 'TASK_PAGE_SIZE', 100)
+
+    def get_max_page_size(self):
+        return getattr(settings, 'TASK_MAX_PAGE_SIZE', 1000)
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                page_size = int(raw)
+            except ValueError:
+                page_size = 0
+            if page_size > 0:
+                return min(page_size, self.get_max_page_size())
+        return self.get_default_page_size()
+
+    def get_ordering(self, queryset):
+        """
+        The queryset's explicit order_by() (e.g. from ?ordering=), else the
+        default, always ending with id so every row has a unique position
+        """
+        ordering = list(queryset.query.order_by) or list(self.ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('id')
+        return ordering
+
+    def encode_cursor(self, task):
+        # Pages hold Task instances or values() dicts
+        payload = []
+        for term in self.ordering_used:
+            name = term.lstrip('-')
+            value = task[name] if isinstance(task, dict) else getattr(task, name)
+            payload.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor, queryset):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(values, list) or len(values) != len(self.ordering_used):
+                raise ValueError('cursor does not match the ordering')
+            fields = [queryset.model._meta.get_field(term.lstrip('-')) for term in self.ordering_used]
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, values):
+        """
+        Rows that sort strictly after ``values`` in the ordering: for
+        (-start_date, title, id) that is start_date < a, or start_date = a
+        and title > b, or start_date = a, title = b and id > c.
+        """
+        condition = Q()
+        equal = {}
+        for term, value in zip(self.ordering_used, values):
+            name = term.lstrip('-')
+            lookup = '__lt' if term.startswith('-') else '__gt'
+            condition |= Q(**equal, **{name + lookup: value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        self.ordering_used = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering_used)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor, queryset)))
+
+        # Fetch one extra row to learn whether a next page exists.
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,167 @@
+"""
+Full-text search over task titles and subtasks.
+
+Each database keeps its own index, maintained by the database itself so
+that save(), update(), bulk_create() upserts and raw SQL all stay in sync:
+
+    postgresql  GIN index on a weighted tsvector expression
+    mysql       InnoDB FULLTEXT index on (title, subtasks)
+    sqlite      FTS5 external-content table fed by triggers
+
+search_tasks() turns free text into a prefix query ("tren bih" matches
+"Trench Bihta") for whichever engine the queryset runs on, falling back
+to icontains elsewhere.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_INDEX = 'task_search_idx'
+SQLITE_SEARCH_TABLE = 'tasks_task_search'
+MAX_TERMS = 8
+# Rows returned by the ranked search endpoint
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 200
+
+SQLITE_SEARCH_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5(
+        title, subtasks, content='tasks_task', content_rowid='id', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title, subtasks) VALUES (new.id, new.title, new.subtasks);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, title, subtasks)
+        VALUES ('delete', old.id, old.title, old.subtasks);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_update AFTER UPDATE OF title, subtasks ON tasks_task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, title, subtasks)
+        VALUES ('delete', old.id, old.title, old.subtasks);
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title, subtasks) VALUES (new.id, new.title, new.subtasks);
+    END""",
+]
+
+
+def pg_vector(table=''):
+    """The indexed tsvector expression; title matches outrank subtasks"""
+    return (
+        f"setweight(to_tsvector('english'::regconfig, {table}title), 'A') || "
+        f"setweight(to_tsvector('english'::regconfig, {table}subtasks), 'B')"
+    )
+
+
+def search_terms(query):
+    """Lower-cased word tokens of a free-text query"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def install_sqlite_search(connection):
+    """
+    Create the SQLite FTS5 table and its triggers if they are missing and
+    rebuild the index when anything had to be (re)created. SQLite drops
+    triggers whenever a migration remakes tasks_task, so this also runs
+    after every migrate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name LIKE %s",
+            [SQLITE_SEARCH_TABLE + '%'],
+        )
+        # The FTS5 table comes with four shadow tables, plus three triggers
+        if cursor.fetchone()[0] >= 8:
+            return
+        for statement in SQLITE_SEARCH_SQL:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def repair_search_index(sender, using, **kwargs):
+    """post_migrate receiver restoring SQLite triggers lost to table remakes"""
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and SQLITE_SEARCH_TABLE in connection.introspection.table_names():
+        install_sqlite_search(connection)
+
+
+def install_search_index(connection):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON tasks_task USING GIN (({pg_vector()}))')
+    elif connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE FULLTEXT INDEX {SEARCH_INDEX} ON tasks_task (title, subtasks)')
+    elif connection.vendor == 'sqlite':
+        install_sqlite_search(connection)
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX}')
+        elif connection.vendor == 'mysql':
+            cursor.execute(f'DROP INDEX {SEARCH_INDEX} ON tasks_task')
+        elif connection.vendor == 'sqlite':
+            for suffix in ('_insert', '_delete', '_update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {SQLITE_SEARCH_TABLE}{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}')
+
+
+def sqlite_query(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_expressions(vendor, terms):
+    """(match condition, relevance) SQL expressions for the given terms"""
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        vector, query = pg_vector('"tasks_task".'), "to_tsquery('english'::regconfig, %s)"
+        return (
+            RawSQL(f'({vector}) @@ {query}', [tsquery], output_field=BooleanField()),
+            RawSQL(f'ts_rank({vector}, {query})', [tsquery], output_field=FloatField()),
+        )
+    if vendor == 'mysql':
+        boolean_query = ' '.join(f'+{term}*' for term in terms)
+        match = '(MATCH (`tasks_task`.`title`, `tasks_task`.`subtasks`) AGAINST (%s IN BOOLEAN MODE))'
+        return (
+            RawSQL(match, [boolean_query], output_field=BooleanField()),
+            RawSQL(match, [boolean_query], output_field=FloatField()),
+        )
+    if vendor == 'sqlite':
+        table = SQLITE_SEARCH_TABLE
+        return (
+            RawSQL(f'"tasks_task"."id" IN (SELECT rowid FROM {table} WHERE {table} MATCH %s)',
+                   [sqlite_query(terms)], output_field=BooleanField()),
+            None,  # ranked by joining the FTS table, see search_tasks()
+        )
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(subtasks__icontains=term)
+    return condition, Value(0.0, output_field=FloatField())
+
+
+def search_tasks(queryset, query, rank=False):
+    """
+    Tasks in ``queryset`` matching every word of ``query`` as a prefix.
+    With rank=True each row is annotated with ``search_rank``, higher
+    being more relevant.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if rank and vendor == 'sqlite':
+        # A correlated bm25() subquery re-runs MATCH for every row; joining
+        # the FTS table ranks all matches in the same pass
+        table = SQLITE_SEARCH_TABLE
+        return queryset.extra(
+            select={'search_rank': f'-bm25({table}, 10.0, 1.0)'},
+            tables=[table],
+            where=[f'{table}.rowid = "tasks_task"."id"', f'{table} MATCH %s'],
+            params=[sqlite_query(terms)],
+        )
+    condition, relevance = search_expressions(vendor, terms)
+    queryset = queryset.filter(condition)
+    if rank:
+        queryset = queryset.annotate(search_rank=relevance)
+    return queryset
@@ -0,0 +1,336 @@
+"""
+Synthetic task data for capacity testing.
+
+Rows are generated in fixed-size chunks, each from its own seeded random
+stream, so the output depends only on the seed and the counts, never on
+the number of worker processes. Chunks are built as plain tuples (across
+a process pool when asked) and written with Postgres COPY, or one
+prepared INSERT per chunk elsewhere. Raw inserts rather than bulk_create() keep
+the generated created_at/updated_at history instead of auto_now stamps
+and skip a million model instantiations.
+"""
+import csv
+import io
+import random
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from .models import Block, ChangeCounter, Task, TaskRollup, TaskTombstone
+from .search import SEARCH_INDEX, SQLITE_SEARCH_TABLE, drop_search_index, install_search_index
+from .signals import tasks_bulk_changed
+
+CHUNK_SIZE = 20000
+USER_BATCH_SIZE = 1000
+SEED_USER_PREFIX = 'seed_user_'
+# Negative: KiB, so 256 MB of SQLite page cache while loading
+SQLITE_LOAD_CACHE_KB = -262144
+
+# Columns written for each task, in tuple order
+TASK_COLUMNS = (
+    'title', 'subtasks', 'milestone', 'status', 'assigned_to_id', 'block_id',
+    'start_date', 'estimated_end_date', 'completed_date', 'created_at', 'updated_at',
+)
+
+# Relative frequency and typical duration range (days) of each milestone;
+# early survey work is more common and quicker than construction
+MILESTONE_PROFILE = {
+    'desktop_survey_design': (14, (7, 30)),
+    'field_survey': (14, (10, 45)),
+    'network_health_checkup': (10, (7, 30)),
+    'hoto_existing': (8, (14, 60)),
+    'detailed_design': (12, (20, 75)),
+    'row': (12, (30, 150)),
+    'ifc': (9, (14, 45)),
+    'ic': (9, (60, 240)),
+    'as_built': (6, (14, 60)),
+    'hoto_final': (6, (14, 45)),
+}
+
+SUBTASKS = [
+    'Trench and backfill along the highway',
+    'Splice closure at the junction chamber',
+    'Duct laying and pulling of fibre',
+    'Survey of right of way with the panchayat',
+    'Pole erection and earthing',
+    'OTDR testing of the span',
+    'Collect permissions from the district office',
+    '',
+]
+
+ROLES = ['surveyor'] * 6 + ['site_manager'] * 2 + ['row_coordinator', 'quality_inspector']
+
+# The fixed accounts the demo deployment is set up with:
+# (username, email, password, full name, role)
+DEMO_ACCOUNTS = [
+    ('admin', 'admin@polycab.com', 'Admin123!', 'Admin User', 'admin'),
+    ('admin_rajesh', 'rajesh@polycab.com', 'Admin123!', 'Rajesh Kumar', 'admin'),
+    ('admin_priya', 'priya@polycab.com', 'Admin123!', 'Priya Sharma', 'admin'),
+    ('rammohan', 'rammohan@polycab.com', 'Rammohan@01', 'Rammohan Sangati', 'project_manager'),
+    ('suresh_sm', 'suresh@polycab.com', 'User@1234', 'Suresh Babu', 'site_manager'),
+    ('mahesh_sv', 'mahesh@polycab.com', 'User@1234', 'Mahesh Yadav', 'surveyor'),
+    ('sunil_rc', 'sunil@polycab.com', 'User@1234', 'Sunil Patil', 'row_coordinator'),
+    ('harish_qi', 'harish@polycab.com', 'User@1234', 'Harish Nair', 'quality_inspector'),
+]
+
+# Share of tasks nobody is assigned to yet
+UNASSIGNED_SHARE = 0.1
+# Tasks start within this many days before (and 60 after) the reference day
+HISTORY_DAYS = 730
+
+
+def block_layout(tasks, blocks, seed):
+    """
+    [(last task number + 1, block id, block name)]: each block gets one
+    contiguous run of task numbers, at least one task when there are
+    enough to go round, and an uneven, seeded share of the rest. Runs keep
+    the (block, milestone, title) key close to insertion order, which
+    loads far faster than random order.
+    """
+    rng = random.Random(f'{seed}:blocks')
+    floor = 1 if tasks >= len(blocks) else 0
+    weights = [rng.lognormvariate(0, 0.75) for _ in blocks]
+    spare, total = tasks - floor * len(blocks), sum(weights)
+    layout, end, share = [], 0, 0.0
+    for (block_id, name), weight in zip(blocks, weights):
+        share += spare * weight / total
+        end = min(tasks, round(share) + floor * (len(layout) + 1))
+        layout.append((end, block_id, name))
+    layout[-1] = (tasks, *layout[-1][1:])
+    return layout
+
+
+def generate_chunk(args):
+    """
+    Task rows number ``start`` .. ``start + count - 1`` as tuples in
+    TASK_COLUMNS order, with ``first_number`` added to the number in
+    each title. Dates and datetimes are strings so chunks pickle
+    cheaply between processes.
+    """
+    seed, start, count, layout, user_ids, today, first_number = args
+    rand = random.Random(f'{seed}:{start}').random
+    labels = dict(Task.MILESTONE_CHOICES)
+    milestones = [code for code, (weight, _) in MILESTONE_PROFILE.items() for _ in range(weight)]
+    # Day n of the window is day_text[n]; the window opens a month before
+    # the earliest start so creation dates stay inside it
+    first = today - timedelta(days=HISTORY_DAYS + 31)
+    span = (today - first).days + 60 + max(high for _, (_, high) in MILESTONE_PROFILE.values()) + 22
+    day_text = [(first + timedelta(days=n)).isoformat() for n in range(span)]
+    today_n = (today - first).days
+
+    position = bisect_right([end for end, _, _ in layout], start)
+    rows = []
+    for number in range(start, start + count):
+        while number >= layout[position][0]:
+            position += 1
+        _, block_id, block_name = layout[position]
+        milestone = milestones[int(rand() * len(milestones))]
+        low, high = MILESTONE_PROFILE[milestone][1]
+        start_n = today_n + 60 - int(rand() * (HISTORY_DAYS + 60))
+        end_n = start_n + low + int(rand() * (high - low + 1))
+
+        # Status follows the calendar: future work has not started, overdue
+        # work is mostly done, with a share running late
+        if start_n > today_n:
+            task_status = 'nil'
+        elif end_n < today_n:
+            task_status = 'completed' if rand() < 0.85 else 'in_progress'
+        else:
+            roll = rand()
+            task_status = 'in_progress' if roll < 0.8 else 'nil' if roll < 0.9 else 'completed'
+        completed_n = None
+        if task_status == 'completed':
+            completed_n = min(max(end_n - 7 + int(rand() * 29), start_n), today_n)
+
+        created_n = start_n - 1 - int(rand() * 30)
+        updated_n = max(created_n, completed_n if completed_n is not None else min(today_n, end_n))
+        rows.append((
+            f'{labels[milestone]} - {block_name} #{first_number + number}',
+            SUBTASKS[int(rand() * len(SUBTASKS))],
+            milestone,
+            task_status,
+            None if rand() < UNASSIGNED_SHARE else user_ids[int(rand() * len(user_ids))],
+            block_id,
+            day_text[start_n],
+            day_text[end_n],
+            None if completed_n is None else day_text[completed_n],
+            # Naive UTC, the form every backend stores timestamps in
+            day_text[created_n] + ' 09:00:00',
+            day_text[updated_n] + ' 17:00:00',
+        ))
+    return rows
+
+
+def generate(tasks, seed, blocks, user_ids, workers=1, today=None, first_number=0):
+    """Yield row chunks for ``tasks`` tasks, in order, numbered from ``first_number``"""
+    today = today or timezone.now().date()
+    layout = block_layout(tasks, blocks, seed)
+    jobs = [
+        (seed, start, min(CHUNK_SIZE, tasks - start), layout, user_ids, today, first_number)
+        for start in range(0, tasks, CHUNK_SIZE)
+    ]
+    if workers <= 1 or len(jobs) <= 1:
+        yield from map(generate_chunk, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(generate_chunk, jobs)
+
+
+def seed_users(count, seed):
+    """Bulk-create ``count`` field users (unusable passwords); returns their ids"""
+    rng = random.Random(f'{seed}:users')
+    password = make_password(None)
+    User.objects.bulk_create([
+        User(
+            username=f'{SEED_USER_PREFIX}{i}', email=f'{SEED_USER_PREFIX}{i}@example.com',
+            full_name=f'Seed User {i}', role=rng.choice(ROLES), password=password,
+        )
+        for i in range(count)
+    ], batch_size=USER_BATCH_SIZE, ignore_conflicts=True)
+    return list(
+        User.objects.filter(username__startswith=SEED_USER_PREFIX)
+        .order_by('id').values_list('id', flat=True)[:count]
+    )
+
+
+def create_demo_accounts():
+    """Create any missing DEMO_ACCOUNTS; returns the usernames created"""
+    usernames = [account[0] for account in DEMO_ACCOUNTS]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    created = []
+    for username, email, password, full_name, role in DEMO_ACCOUNTS:
+        if username in existing:
+            continue
+        create = User.objects.create_superuser if role == 'admin' else User.objects.create_user
+        create(username=username, email=email, password=password, full_name=full_name, role=role)
+        created.append(username)
+    return created
+
+
+def copy_rows(cursor, rows):
+    """Stream rows into tasks_task with COPY (psycopg2)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # An explicit NULL marker keeps empty subtasks as '' rather than NULL
+        writer.writerow([r'\N' if value is None else value for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {Task._meta.db_table} ({', '.join(TASK_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer,
+    )
+
+
+def insert_rows(cursor, rows):
+    """
+    One prepared INSERT run for every row; SQLite reuses the statement and
+    MySQL's driver folds the batch into multi-row INSERTs
+    """
+    quote = connection.ops.quote_name
+    cursor.executemany(
+        f"INSERT INTO {quote(Task._meta.db_table)} ({', '.join(map(quote, TASK_COLUMNS))}) "
+        f"VALUES ({', '.join(['%s'] * len(TASK_COLUMNS))})",
+        rows,
+    )
+
+
+def clear_tasks():
+    """
+    Delete every task in one statement, leaving a tombstone for each so
+    delta-sync clients drop them too. Returns the number deleted.
+    """
+    table = Task._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TaskTombstone._meta.db_table} (task_id, deleted_at) SELECT id, %s FROM {table}',
+            [connection.ops.adapt_datetimefield_value(timezone.now())],
+        )
+        cursor.execute(f'DELETE FROM {table}')
+        deleted = cursor.rowcount
+    TaskRollup.objects.all().delete()
+    ChangeCounter.objects.bump(ChangeCounter.TASK_DELETIONS)
+    return deleted
+
+
+@contextmanager
+def bulk_load(cursor):
+    """
+    Drop the search index and Task's secondary indexes for the duration
+    of a load and build them once at the end, which is several times
+    faster than maintaining them row by row. On SQLite the page cache is
+    also raised so the remaining indexes stay in memory.
+    """
+    existing = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+    if connection.vendor == 'sqlite':
+        search = SQLITE_SEARCH_TABLE in connection.introspection.table_names(cursor)
+    else:
+        search = SEARCH_INDEX in existing
+    indexes = [index for index in Task._meta.indexes if index.name in existing]
+    schema_editor = connection.schema_editor()
+
+    if search:
+        drop_search_index(connection)
+    for index in indexes:
+        cursor.execute(str(index.remove_sql(Task, schema_editor)))
+    if connection.vendor == 'sqlite':
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+        cursor.execute(f'PRAGMA cache_size = {SQLITE_LOAD_CACHE_KB}')
+    try:
+        yield
+    finally:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'PRAGMA cache_size = {cache_size}')
+    for index in indexes:
+        cursor.execute(str(index.create_sql(Task, schema_editor)))
+    if search:
+        install_search_index(connection)
+
+
+def seed_tasks(tasks, users, seed=0, workers=1, clear=False, progress=None):
+    """
+    Generate ``users`` users and ``tasks`` tasks spread over every block
+    and add them to the rollup. Returns (tasks created, users available).
+    """
+    blocks = list(Block.objects.order_by('id').values_list('id', 'name'))
+    if not blocks:
+        raise ValueError('No blocks found; run migrate to load the location hierarchy')
+
+    with transaction.atomic():
+        user_ids = seed_users(users, seed)
+        if not user_ids:
+            raise ValueError('At least one user is needed to assign tasks to')
+
+        written = 0
+        # Rollup deltas are counted as rows stream past rather than
+        # recounted from the whole table afterwards
+        counts = Counter()
+        # The DB-API cursor: with DEBUG on, Django's wrapper would log (and
+        # on SQLite re-quote) every parameter of every batch
+        cursor = connection.cursor().cursor
+        write = copy_rows if connection.vendor == 'postgresql' else insert_rows
+        # Added tasks are numbered on from the existing ones so their titles
+        # stay unique. Rebuilding indexes costs about as much as loading the
+        # rows already there, so it only pays when the load at least doubles them.
+        existing = 0 if clear else Task.objects.count()
+        rebuild = tasks >= existing
+        with bulk_load(cursor) if rebuild else nullcontext():
+            # Inside the load so the delete skips the search triggers too
+            if clear:
+                clear_tasks()
+            for rows in generate(tasks, seed, blocks, user_ids, workers, first_number=existing):
+                write(cursor, rows)
+                counts.update((row[2], row[3], row[5]) for row in rows)
+                written += len(rows)
+                if progress:
+                    progress(written)
+        TaskRollup.objects.apply_deltas(counts)
+        tasks_bulk_changed.send(sender=Task, using=connection.alias)
+    return written, len(user_ids)
@@ -1,47 +1,58 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task, Milestone
+from .models import Task, Milestone, Block
 from users.models import User
 
+MILESTONE_NAMES = dict(Task.MILESTONE_CHOICES)
+STATUS_NAMES = dict(Task.STATUS_CHOICES)
 
-class UserSerializer(serializers.ModelSerializer):
+
+class TaskCountsMixin(serializers.Serializer):
     """
-    Serializer for User model with task count
+    Task counts read from queryset annotations (see views.task_counts)
+    """
+    task_count = serializers.IntegerField(read_only=True)
+    open_count = serializers.IntegerField(read_only=True)
+    completed_count = serializers.IntegerField(read_only=True)
+    overdue_count = serializers.IntegerField(read_only=True)
+
+    COUNT_FIELDS = ['task_count', 'open_count', 'completed_count', 'overdue_count']
+
+
+class UserSerializer(TaskCountsMixin, serializers.ModelSerializer):
+    """
+    Serializer for User model with task counts
     """
-    task_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = User
-        fields = ['id', 'username', 'full_name', 'email', 'is_active', 'task_count']
-    
-    def get_task_count(self, obj):
-        """Get count of tasks assigned to this user"""
-        return obj.assigned_tasks.count()
+        fields = ['id', 'username', 'full_name', 'email', 'is_active'] + TaskCountsMixin.COUNT_FIELDS
 
 
-class MilestoneSerializer(serializers.ModelSerializer):
+class MilestoneSerializer(TaskCountsMixin, serializers.ModelSerializer):
     """
-    Serializer for Milestone model
+    Serializer for Milestone model with task counts
     """
-    task_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Milestone
-        fields = ['id', 'name', 'code', 'description', 'task_count']
-    
-    def get_task_count(self, obj):
-        """Get count of tasks for this milestone"""
-        return Task.objects.filter(milestone=obj.code).count()
+        fields = ['id', 'name', 'code', 'description'] + TaskCountsMixin.COUNT_FIELDS
 
 
 class TaskSerializer(serializers.ModelSerializer):
     """
-    Serializer for Task model
+    Serializer for Task model. Pass fields=[...] to return only some fields.
     """
     # Add display fields for frontend
     milestone_name = serializers.SerializerMethodField()
     assigned_to_name = serializers.SerializerMethodField()
     status_display = serializers.SerializerMethodField()
-    
+
+    # Location is exposed by name; validate() resolves the names to a Block
+    state = serializers.CharField(max_length=100)
+    business_area = serializers.CharField(max_length=100)
+    district = serializers.CharField(max_length=100)
+    block = serializers.CharField(max_length=100)
+
     class Meta:
         model = Task
         fields = [
@@ -51,29 +62,16 @@ class TaskSerializer(serializers.ModelSerializer):
             'start_date', 'estimated_end_date', 'completed_date',
             'created_at', 'updated_at'
         ]
-    
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def get_milestone_name(self, obj):
         """Get display name for milestone"""
-        milestone_names = {
-            'desktop_survey_design': 'Desktop Survey Design',
-            'network_health_checkup': 'Network Health Checkup',
-            'hoto_existing': 'HOTO-Existing',
-            'detailed_design': 'Detailed Design',
-            'row': 'ROW (Right of Way)',
-            'ifc': 'IFC (Issued for Construction)',
-            'ic': 'IC (Initial Construction)',
-            'as_built': 'As-Built',
-            'hoto_final': 'HOTO (Final)',
-            'field_survey': 'Field Survey'
-        }
-        return milestone_names.get(obj.milestone, obj.milestone)
-    # tasks/serializers.py
-class TaskSerializer(serializers.ModelSerializer):
-    assignedTo = serializers.StringRelatedField()  # or serializers.PrimaryKeyRelatedField(read_only=True)
-
-    class Meta:
-        model = Task
-        fields = '__all__'
+        return MILESTONE_NAMES.get(obj.milestone, obj.milestone)
 
     def get_assigned_to_name(self, obj):
         """Get display name for assigned user"""
@@ -83,17 +81,54 @@ class TaskSerializer(serializers.ModelSerializer):
     
     def get_status_display(self, obj):
         """Get display text for status"""
-        status_display = {
-            'nil': 'Nil',
-            'in_progress': 'In Progress',
-            'completed': 'Completed'
-        }
-        return status_display.get(obj.status, obj.status)
+        return STATUS_NAMES.get(obj.status, obj.status)
     
+    def validate_location(self, data):
+        """
+        Replace the location names in data with the matching Block.
+        Partial updates fall back to the task's current location.
+        """
+        names = {field: data.pop(field) for field in Task.LOCATION_LOOKUPS if field in data}
+        if not names:
+            return data
+
+        if self.instance is not None:
+            for field in Task.LOCATION_LOOKUPS:
+                names.setdefault(field, str(getattr(self.instance, field)))
+        missing = [field for field in Task.LOCATION_LOOKUPS if field not in names]
+        if missing:
+            raise serializers.ValidationError({field: "This field is required." for field in missing})
+
+        try:
+            data['block'] = Block.objects.resolve(
+                names['state'], names['business_area'], names['district'], names['block']
+            )
+        except Block.DoesNotExist:
+            raise serializers.ValidationError({
+                'block': "Unknown location: " + " > ".join(names[field] for field in Task.LOCATION_LOOKUPS)
+            })
+        return data
+
     def validate(self, data):
         """
         Custom validation for task data
         """
+        data = self.validate_location(data)
+
+        # (block, milestone, title) is the task's natural key
+        key = {
+            field: data.get(field, getattr(self.instance, field, None))
+            for field in ('block', 'milestone', 'title')
+        }
+        if all(key.values()):
+            duplicates = Task.objects.filter(**key)
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError({
+                    'title': "A task with this title already exists for this milestone and block."
+                })
+
         # Ensure start_date is not after estimated_end_date
         if 'start_date' in data and 'estimated_end_date' in data:
             if data['start_date'] > data['estimated_end_date']:
@@ -103,12 +138,81 @@ class TaskSerializer(serializers.ModelSerializer):
         
         # If status is 'completed', set completed_date if not provided
         if data.get('status') == 'completed' and not data.get('completed_date'):
-            from django.utils import timezone
             data['completed_date'] = timezone.now().date()
         
         return data
 
 
+def sparse_fields(request):
+    """
+    Field names from a ``?fields=a,b`` query parameter, or None for all
+    fields. Unknown names are a validation error.
+    """
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in TaskSerializer.Meta.fields]
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+    return fields
+
+
+class TaskValuesSerializer:
+    """
+    Read-only stand-in for TaskSerializer on list endpoints. Rows are read
+    with QuerySet.values() and shaped into the same output directly,
+    without model instances or DRF field machinery; display labels come
+    from the precomputed choice maps.
+    """
+    # values() lookups behind each output field
+    SOURCES = {
+        'assigned_to': ('assigned_to_id',),
+        'assigned_to_name': ('assigned_to__full_name', 'assigned_to__username'),
+        'milestone_name': ('milestone',),
+        'status_display': ('status',),
+        **{field: (lookup,) for field, lookup in Task.LOCATION_LOOKUPS.items()},
+    }
+    # Always fetched so keyset pagination can build its cursor on any ordering
+    KEYSET_LOOKUPS = ('id',) + Task.ORDERING_FIELDS
+
+    def __init__(self, fields=None):
+        self.fields = fields or TaskSerializer.Meta.fields
+        # Resolve the output timezone once rather than on every row
+        datetime_field = serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone() if settings.USE_TZ else None
+        )
+        lookups = set(self.KEYSET_LOOKUPS)
+        self.builders = []
+        for name in self.fields:
+            sources = self.SOURCES.get(name, (name,))
+            lookups.update(sources)
+            self.builders.append((name, self.builder(name, sources[0], datetime_field)))
+        self.lookups = sorted(lookups)
+
+    @staticmethod
+    def builder(name, source, datetime_field):
+        if name == 'milestone_name':
+            return lambda row: MILESTONE_NAMES.get(row[source], row[source])
+        if name == 'status_display':
+            return lambda row: STATUS_NAMES.get(row[source], row[source])
+        if name == 'assigned_to_name':
+            return lambda row: row['assigned_to__full_name'] or row['assigned_to__username']
+        if name in ('start_date', 'estimated_end_date', 'completed_date'):
+            return lambda row: row[source].isoformat() if row[source] is not None else None
+        if name in ('created_at', 'updated_at'):
+            return lambda row: datetime_field.to_representation(row[source])
+        return lambda row: row[source]
+
+    def values(self, queryset, *extra):
+        """The queryset as the dicts to_representation() expects, plus ``extra`` lookups"""
+        return queryset.values(*self.lookups, *extra)
+
+    def to_representation(self, rows):
+        builders = self.builders
+        return [{name: build(row) for name, build in builders} for row in rows]
+
+
 class TaskCreateSerializer(TaskSerializer):
     """
     Serializer for creating tasks with simpler validation
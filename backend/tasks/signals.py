@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent after set-based task writes (queryset update(), bulk_create, raw SQL)
+# that bypass the per-instance post_save signal, and after every task
+# delete, which TaskQuerySet.delete() handles in batches without per-row
+# post_delete receivers.
+# Arguments: using.
+tasks_bulk_changed = Signal()
@@ -0,0 +1,158 @@
+"""
+Delta sync for clients that keep a local copy of the task list.
+
+GET tasks/changes/ without ``since`` starts a full sync; every response
+carries a ``cursor`` to pass back as ``?since=`` and ``has_more`` while
+rows remain. Each response lists the tasks created or updated after the
+cursor, in (updated_at, id) order so the task_updated_idx index serves
+it, and the ids of tasks deleted since, read from TaskTombstone. Clients
+apply ``deleted`` before ``changed``.
+
+Rows and tombstones are stamped when they are written, not when their
+transaction commits, so a slow transaction can commit a row stamped
+before one a client has already been sent. The cursor therefore only
+moves past rows and tombstones stamped more than TASK_SYNC_LAG_SECONDS
+ago. The lag must exceed the longest transaction that writes tasks; rows
+written later than that after their stamp are missed by clients already
+past it. Once a client has caught up to the lag, responses also carry
+the rows and tombstones stamped inside it, so a client sees its own
+edits on its next call, and repeat them on later calls until they are
+past the lag. Applying a change twice leaves the copy the same.
+
+With a ``scope`` (tasks/changes/?assigned_to=<user id>), a client keeps
+only that user's tasks. The full sync pages through the tasks in scope
+that were stamped before it started. Later responses list changed tasks
+still in scope under ``changed``, and tasks that left it, such as
+reassigned ones, under ``deleted``.
+
+A cursor older than TASK_TOMBSTONE_RETENTION_DAYS may have missed pruned
+tombstones, so it is refused with 410 Gone and the client starts over.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Max, Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .models import TaskTombstone, tombstone_retention_days
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync cursor has expired, start a full sync.'
+    default_code = 'cursor_expired'
+
+
+def encode_sync_cursor(updated_at, task_id, tombstone_id, issued_at, snapshot=None):
+    payload = [updated_at.isoformat() if updated_at else None, task_id, tombstone_id, issued_at.isoformat()]
+    if snapshot is not None:
+        payload.append(snapshot.isoformat())
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_sync_cursor(cursor):
+    """
+    (updated_at, task id, tombstone id, issued_at, snapshot) from a sync
+    cursor; snapshot is set while a scoped full sync is in progress
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, task_id, tombstone_id, issued_at, *snapshot = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(updated_at) if updated_at else None,
+            int(task_id) if task_id is not None else None,
+            int(tombstone_id),
+            datetime.fromisoformat(issued_at),
+            datetime.fromisoformat(snapshot[0]) if snapshot else None,
+        )
+    except (TypeError, ValueError, UnicodeDecodeError, IndexError):
+        raise NotFound('Invalid cursor')
+
+
+def get_sync_page_size(raw):
+    limit = getattr(settings, 'TASK_SYNC_PAGE_SIZE', 500)
+    if raw:
+        try:
+            limit = int(raw) or limit
+        except ValueError:
+            pass
+    return max(1, min(limit, getattr(settings, 'TASK_MAX_PAGE_SIZE', 1000)))
+
+
+def sync_lag():
+    return timedelta(seconds=getattr(settings, 'TASK_SYNC_LAG_SECONDS', 30))
+
+
+def task_changes(queryset, serializer, since=None, limit=500, scope=None):
+    """
+    One delta sync response for ``queryset``: the changed rows through
+    ``serializer`` (a TaskValuesSerializer), deleted ids and the next cursor.
+    ``scope`` is a Q limiting the rows the client keeps.
+    """
+    now = timezone.now()
+    # Everything stamped before this has committed; see the module docstring
+    horizon = now - sync_lag()
+    recent_tombstones = []
+    if since:
+        updated_at, task_id, tombstone_id, issued_at, snapshot = decode_sync_cursor(since)
+        if issued_at < now - timedelta(days=tombstone_retention_days()):
+            raise CursorExpired()
+        tombstones = list(
+            TaskTombstone.objects.filter(id__gt=tombstone_id).order_by('id')
+            .values_list('id', 'task_id', 'deleted_at')[:limit + 1]
+        )
+        # Stop at the first tombstone inside the lag, so none with a lower id
+        # can still commit behind the cursor; the rest are sent as recent
+        for index, (_, _, deleted_at) in enumerate(tombstones):
+            if deleted_at >= horizon:
+                tombstones, recent_tombstones = tombstones[:index], tombstones[index:limit]
+                break
+    else:
+        # A full sync starts from every current row; deletions from now on follow
+        updated_at = task_id = None
+        tombstone_id = TaskTombstone.objects.filter(deleted_at__lt=horizon).aggregate(last=Max('id'))['last'] or 0
+        tombstones = []
+        snapshot = horizon if scope is not None else None
+
+    extra = ()
+    if snapshot is not None:
+        # Scoped full sync: only rows in scope, up to where it started
+        queryset = queryset.filter(scope, updated_at__lt=snapshot)
+    elif scope is not None:
+        queryset = queryset.annotate(in_scope=ExpressionWrapper(scope, output_field=BooleanField()))
+        extra = ('in_scope',)
+    if updated_at is not None:
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=task_id))
+
+    rows = list(serializer.values(queryset.order_by('updated_at', 'id'), *extra)[:limit + 1])
+    # Rows inside the lag come last; they are sent once the others are,
+    # without moving the cursor past them
+    settled = next((index for index, row in enumerate(rows) if row['updated_at'] >= horizon), len(rows))
+    rows, recent_rows = rows[:settled], rows[settled:limit]
+    has_more = len(rows) > limit or len(tombstones) > limit
+    rows_done = len(rows) <= limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+
+    if rows:
+        updated_at, task_id = rows[-1]['updated_at'], rows[-1]['id']
+    if snapshot is not None and rows_done:
+        # The scoped full sync is complete; changes since it began follow
+        updated_at, task_id, snapshot = snapshot, 0, None
+    if tombstones:
+        tombstone_id = tombstones[-1][0]
+    deleted = [deleted_id for _, deleted_id, _ in tombstones + recent_tombstones]
+    rows += recent_rows
+    if extra:
+        deleted += [row['id'] for row in rows if not row['in_scope']]
+        rows = [row for row in rows if row['in_scope']]
+    return {
+        'changed': serializer.to_representation(rows),
+        'deleted': deleted,
+        'cursor': encode_sync_cursor(updated_at, task_id, tombstone_id, now, snapshot),
+        'has_more': has_more,
+    }
@@ -1,30 +1,1393 @@
-from django.test import TestCase
-from .models import Task
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.db import connection, connections, models, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from backend.fastjson import FastJSONRenderer
+from backend.metrics import registry
+from backend.routers import PIN_COOKIE
+from backend.testing import QueryBudgetMixin, Route
+from users.models import User
+from .conditional import TASK_FINGERPRINT_QUERIES
+from .importer import ImportFormatError, import_tasks
+from .models import Task, TaskRollup, TaskTombstone, DailyProgressSnapshot, Milestone, State, BusinessArea, District, Block
+from .search import repair_search_index
+from .serializers import TaskSerializer
+from .sync import decode_sync_cursor, encode_sync_cursor
+from . import caching as response_cache
+from . import urls as task_urls
+
+def location(block, district='PATNA', business_area='PATNA', state='BIHAR'):
+    """Block for the given path, creating any level missing from the seed data"""
+    state_obj, _ = State.objects.get_or_create(name=state)
+    area, _ = BusinessArea.objects.get_or_create(state=state_obj, name=business_area)
+    district_obj, _ = District.objects.get_or_create(business_area=area, name=district)
+    return Block.objects.get_or_create(district=district_obj, name=block)[0]
+
 
 class TaskModelTest(TestCase):
 
     def setUp(self):
-        Task.objects.create(
-            title="Desktop survey Design",
-            status="Nil"
-        )
-        Task.objects.create(
-            title="Network Health checkup",
-            status="In progress"
-        )
-        Task.objects.create(
-            title="Hoto-existing",
-            status="Completed"
-        )
+        block = location('BIHTA')
+        for title, milestone, task_status in [
+            ("Desktop survey Design", 'desktop_survey_design', 'nil'),
+            ("Network Health checkup", 'network_health_checkup', 'in_progress'),
+            ("Hoto-existing", 'hoto_existing', 'completed'),
+        ]:
+            Task.objects.create(
+                title=title, milestone=milestone, status=task_status, block=block,
+                start_date=date(2024, 1, 1), estimated_end_date=date(2024, 2, 1),
+            )
 
     def test_task_creation(self):
         task = Task.objects.get(title="Desktop survey Design")
-        self.assertEqual(task.status, "Nil")
+        self.assertEqual(task.status, "nil")
+        self.assertIsNone(task.completed_date)
 
     def test_task_status(self):
         task = Task.objects.get(title="Network Health checkup")
-        self.assertEqual(task.status, "In progress")
+        self.assertEqual(task.get_status_display(), "In Progress")
 
     def test_completed_task(self):
         task = Task.objects.get(title="Hoto-existing")
-        self.assertEqual(task.status, "Completed")
\ No newline at end of file
+        self.assertEqual(task.status, "completed")
+        self.assertEqual(task.completed_date, timezone.now().date())
+
+        task.status = 'in_progress'
+        task.save()
+        self.assertIsNone(task.completed_date)
+
+
+class TaskKeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        start = date(2026, 1, 1)
+        # Several tasks share a start_date and title so the id tie-breaker matters
+        for i in range(7):
+            Task.objects.create(
+                title="Task %d" % (i % 3),
+                milestone="row",
+                block=location(("BIHTA", "MANER", "DANAPUR")[i // 3]),
+                start_date=start + timedelta(days=i % 2),
+                estimated_end_date=start + timedelta(days=30),
+            )
+        self.expected = list(
+            Task.objects.order_by('-start_date', 'title', 'id').values_list('id', flat=True)
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.json()['results'])
+            url = response.json()['next']
+        return ids
+
+    def test_pages_follow_task_ordering(self):
+        url = reverse('task_management:task-all-tasks') + '?page_size=2'
+        self.assertEqual(self.walk(url), self.expected)
+
+    def test_all_tasks_view_paginates(self):
+        url = reverse('task_management:render_all_tasks') + '?page_size=3'
+        self.assertEqual(self.walk(url), self.expected)
+
+    def test_unpaginated_request_returns_list(self):
+        response = self.client.get(reverse('task_management:task-by-milestone'), {'milestone': 'row'})
+        self.assertEqual(len(response.json()), 7)
+
+    def test_page_fetch_does_not_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('task_management:task-list'), {'page_size': 2})
+        sql = ' '.join(q['sql'] for q in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('task_management:task-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskExportTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='surveyor', email='surveyor@example.com', full_name='Field Surveyor'
+        )
+        for block, milestone in [('BIHTA', 'row'), ('MANER', 'row'), ('BIHTA', 'ifc')]:
+            Task.objects.create(
+                title=f"{milestone} - {block}",
+                milestone=milestone,
+                assigned_to=self.user,
+                block=location(block),
+                start_date=date(2026, 1, 1),
+                estimated_end_date=date(2026, 2, 1),
+            )
+        self.url = reverse('task_management:task-export')
+
+    def test_ndjson_export_joins_assignee(self):
+        response = self.client.get(self.url, {'block': 'BIHTA'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        with CaptureQueriesContext(connection) as queries:
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(queries), 1)
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['assigned_to_full_name'], 'Field Surveyor')
+
+    def test_csv_export_with_milestone_filter(self):
+        response = self.client.get(self.url, {'output': 'csv', 'milestone': 'row', 'district': 'PATNA'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,title'))
+        self.assertEqual(len(lines), 3)
+
+    def test_unknown_output(self):
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MilestoneProgressTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='sm', email='sm@example.com')
+        patna = location('BIHTA')
+        gaya = location('BODHGAYA', 'GAYA', 'GAYA')
+        rows = [
+            ('row', 'completed', patna, self.user),
+            ('row', 'in_progress', patna, None),
+            ('row', 'nil', gaya, self.user),
+            ('ifc', 'completed', gaya, None),
+        ]
+        for milestone, task_status, block, user in rows:
+            Task.objects.create(
+                title=f"{milestone} {task_status} {block}",
+                milestone=milestone,
+                status=task_status,
+                assigned_to=user,
+                block=block,
+                start_date=date(2026, 1, 1),
+                estimated_end_date=date(2026, 2, 1),
+            )
+        self.url = reverse('task_management:milestone-progress')
+
+    def by_code(self, response):
+        return {row['code']: row for row in response.json()}
+
+    def test_single_query(self):
+        # One aggregate plus the constant conditional GET fingerprint
+        with self.assertNumQueries(1 + TASK_FINGERPRINT_QUERIES):
+            response = self.client.get(self.url)
+        data = self.by_code(response)
+        self.assertEqual(len(data), len(Task.MILESTONE_CHOICES))
+        self.assertEqual(data['row']['total'], 3)
+        self.assertEqual(data['row']['completed'], 1)
+        self.assertEqual(data['row']['in_progress'], 1)
+        self.assertEqual(data['row']['nil'], 1)
+        self.assertEqual(data['row']['percentage'], 33.33)
+        self.assertEqual(data['ifc']['percentage'], 100)
+        self.assertEqual(data['ic']['total'], 0)
+
+    def test_scoped_counts(self):
+        data = self.by_code(self.client.get(self.url, {'business_area': 'GAYA'}))
+        self.assertEqual(data['row']['total'], 1)
+        self.assertEqual(data['ifc']['total'], 1)
+
+        with self.assertNumQueries(1 + TASK_FINGERPRINT_QUERIES):
+            response = self.client.get(self.url, {'assigned_to': self.user.id})
+        data = self.by_code(response)
+        self.assertEqual(data['row']['total'], 2)
+        self.assertEqual(data['ifc']['total'], 0)
+
+    def test_invalid_assignee(self):
+        response = self.client.get(self.url, {'assigned_to': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assigned_to', response.json())
+
+
+class TaskRollupTest(TestCase):
+
+    def make_task(self, **kwargs):
+        fields = dict(
+            title="Rollup task",
+            milestone="row",
+            status="in_progress",
+            block=location('BIHTA'),
+            start_date=date(2026, 1, 1),
+            estimated_end_date=date(2026, 2, 1),
+        )
+        fields.update(kwargs)
+        return Task.objects.create(**fields)
+
+    def test_counts_follow_writes(self):
+        first = self.make_task()
+        self.make_task(block=location('MANER'))
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+        first.status = 'completed'
+        first.save()
+        task = Task.objects.get(pk=first.pk)
+        task.block = location('DANAPUR')
+        task.save()
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+        task.delete()
+        Task.objects.filter(block__name='MANER').delete()
+        self.assertEqual(TaskRollup.objects.stored(), {})
+
+    def test_stale_instances_count_the_current_bucket(self):
+        task = self.make_task()
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.status = 'completed'
+        first.save()
+        second.status = 'nil'
+        second.save()
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+        Task.objects.filter(pk=task.pk).update(block=location('MANER'))
+        TaskRollup.objects.rebuild()
+        second.status = 'in_progress'
+        second.save()
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_queryset_delete_is_batched(self):
+        tasks = [self.make_task(title=f"Task {n}", status=('nil', 'completed')[n % 2]) for n in range(30)]
+        kept = self.make_task(block=location('MANER'))
+        with CaptureQueriesContext(connection) as queries:
+            deleted = Task.objects.filter(block__name='BIHTA').delete()
+        self.assertEqual(deleted, (30, {'tasks.Task': 30}))
+        statements = [' '.join(query['sql'].split()[:3]) for query in queries]
+        self.assertEqual(statements.count('DELETE FROM "tasks_task"'), 1)
+        self.assertEqual(statements.count('INSERT INTO "tasks_tasktombstone"'), 1)
+        self.assertEqual(statements.count('UPDATE "tasks_taskrollup" SET'), 1)
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+        self.assertEqual(
+            set(TaskTombstone.objects.values_list('task_id', flat=True)), {task.pk for task in tasks}
+        )
+        self.assertTrue(Task.objects.filter(pk=kept.pk).exists())
+        self.assertEqual(Task.objects.none().delete(), (0, {}))
+
+    def test_apply_deltas(self):
+        key = ('row', 'nil', location('AMAS', 'GAYA', 'GAYA').id)
+        TaskRollup.objects.apply_deltas({key: 3})
+        TaskRollup.objects.apply_deltas({key: -1})
+        self.assertEqual(TaskRollup.objects.stored(), {key: 2})
+
+    def test_apply_deltas_across_many_buckets(self):
+        # Thousands of buckets must not turn into one huge OR condition
+        block_ids = list(Block.objects.values_list('id', flat=True)[:400])
+        deltas = {
+            (milestone, task_status, block_id): 1
+            for block_id in block_ids for milestone in ('row', 'ifc') for task_status in ('nil', 'completed')
+        }
+        TaskRollup.objects.apply_deltas(deltas)
+        TaskRollup.objects.apply_deltas(deltas)
+        self.assertEqual(TaskRollup.objects.stored(), {key: 2 for key in deltas})
+
+    def test_rebuild_command_repairs_drift(self):
+        self.make_task()
+        TaskRollup.objects.update(count=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_rollup', '--check', stdout=StringIO(), stderr=StringIO())
+        call_command('rebuild_task_rollup', stdout=StringIO())
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_task_summary_reads_rollup(self):
+        self.make_task(status='completed')
+        self.make_task(block=location('RANCHI', 'RANCHI', 'RANCHI', 'JHARKHAND'))
+        with self.assertNumQueries(2 + TASK_FINGERPRINT_QUERIES):
+            response = self.client.get(reverse('task_management:task-summary'))
+        data = response.json()
+        self.assertEqual(data['total_tasks'], 2)
+        self.assertEqual(data['completed_tasks'], 1)
+        self.assertEqual(data['completion_percentage'], 50)
+        self.assertEqual(len(data['tasks_by_state']), 2)
+
+
+class LocationHierarchyTest(TestCase):
+
+    def test_seeded_hierarchy_endpoints(self):
+        self.assertEqual(self.client.get(reverse('task_management:get-states')).json(), ['BIHAR'])
+        areas = self.client.get(reverse('task_management:get-business-areas', args=['BIHAR'])).json()
+        self.assertEqual(areas[0], 'PATNA')
+        # The block list plus the location change counter
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('task_management:get-blocks', args=['BIHAR', 'PATNA', 'NALANDA']))
+        self.assertIn('RAJGIR', response.json())
+
+    def test_unknown_parent_is_404(self):
+        response = self.client.get(reverse('task_management:get-districts', args=['BIHAR', 'NOWHERE']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_task_written_and_read_by_location_names(self):
+        payload = {
+            'title': 'Survey Rajgir',
+            'milestone': 'field_survey',
+            'state': 'BIHAR',
+            'business_area': 'PATNA',
+            'district': 'NALANDA',
+            'block': 'RAJGIR',
+            'start_date': '2026-01-01',
+            'estimated_end_date': '2026-03-01',
+        }
+        response = self.client.post(reverse('task_management:task-list'), payload)
+        self.assertEqual(response.status_code, 201, response.content)
+        task = Task.objects.get(title='Survey Rajgir')
+        self.assertEqual(task.block, Block.objects.resolve('BIHAR', 'PATNA', 'NALANDA', 'RAJGIR'))
+
+        data = self.client.get(reverse('task_management:task-detail', args=[task.pk])).json()
+        self.assertEqual(
+            [data['state'], data['business_area'], data['district'], data['block']],
+            ['BIHAR', 'PATNA', 'NALANDA', 'RAJGIR'],
+        )
+
+        payload['block'] = 'NOT A BLOCK'
+        response = self.client.post(reverse('task_management:task-list'), payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('block', response.json())
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        self.task = Task.objects.create(
+            title="Conditional task",
+            milestone="row",
+            block=location('BIHTA'),
+            start_date=date(2026, 1, 1),
+            estimated_end_date=date(2026, 2, 1),
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_list_is_not_modified(self):
+        url = reverse('task_management:render_all_tasks')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+
+        # Only the fingerprint runs, not the list query or the serializer
+        with self.assertNumQueries(TASK_FINGERPRINT_QUERIES):
+            second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        url = reverse('task_management:task-list')
+        first = self.client.get(url)
+
+        self.task.status = 'completed'
+        self.task.save()
+        second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+
+        self.task.delete()
+        self.assertEqual(self.revalidate(url, second).status_code, 200)
+
+    def test_overdue_list_moves_on_at_midnight(self):
+        url = reverse('task_management:task-list') + '?overdue=1'
+        evening = datetime(2026, 3, 10, 23, 59, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=evening):
+            Task.objects.filter(pk=self.task.pk).update(
+                estimated_end_date=date(2026, 3, 10), updated_at=evening - timedelta(days=1)
+            )
+            first = self.client.get(url)
+            self.assertEqual(first.json(), [])
+            self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        with mock.patch('django.utils.timezone.now', return_value=evening + timedelta(minutes=2)):
+            second = self.revalidate(url, first)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual([row['id'] for row in second.json()], [self.task.pk])
+            since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(since.status_code, 200)
+
+    def test_etag_varies_with_query(self):
+        url = reverse('task_management:milestone-progress')
+        first = self.client.get(url)
+        scoped = self.client.get(url, {'district': 'PATNA'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(scoped.status_code, 200)
+
+    def test_location_endpoints(self):
+        url = reverse('task_management:get-states')
+        first = self.client.get(url)
+        self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        State.objects.create(name='JHARKHAND')
+        second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertIn('JHARKHAND', second.json())
+
+
+class ResponseCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        response_cache.stats.reset()
+        self.states = reverse('task_management:get-states')
+
+    def test_repeat_requests_are_served_from_cache(self):
+        first = self.client.get(self.states)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.states)
+            not_modified = self.client.get(self.states, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(response_cache.stats.snapshot()['states'], {'hit': 2, 'miss': 1, 'coalesced': 0})
+        self.assertIn(
+            'response_cache_requests_total{endpoint="states",outcome="hit"} 2', registry.render()
+        )
+
+    def test_writes_are_read_around_the_cache_until_committed(self):
+        self.client.get(self.states)
+        with transaction.atomic():
+            State.objects.create(name='JHARKHAND')
+            self.assertIn('JHARKHAND', self.client.get(self.states).json())
+            transaction.set_rollback(True)
+        # The rolled-back write neither bumped the version nor was cached
+        with self.assertNumQueries(0):
+            self.assertNotIn('JHARKHAND', self.client.get(self.states).json())
+
+    def test_commits_bump_versions(self):
+        task = Task.objects.create(
+            title="Cached task", milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+        writes = [
+            lambda: Task.objects.filter(pk=task.pk).set_status('completed'),
+            lambda: import_tasks(BytesIO(
+                b"title,milestone,status,state,business_area,district,block,start_date,estimated_end_date\n"
+                b"Imported,row,nil,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01\n"
+            ), 'csv'),
+            lambda: User.objects.create_user(username='cached', email='cached@example.com'),
+        ]
+        for namespace, write in zip([response_cache.TASKS, response_cache.TASKS, response_cache.USERS], writes):
+            before = response_cache.current_versions([namespace])
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertNotEqual(response_cache.current_versions([namespace]), before)
+
+    def test_concurrent_misses_share_one_computation(self):
+        flights = response_cache.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'summary'
+
+        leader = threading.Thread(target=lambda: results.append(flights.run('key', compute)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flights.run('key', compute))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [('summary', False)] * 4 + [('summary', True)])
+
+    def test_waits_for_another_process_holding_the_lock(self):
+        key = 'response-cache:states:elsewhere'
+        cache.add(response_cache.LOCK_KEY.format(key), 1, 5)
+        entry = response_cache.Entry(200, ['BIHAR'], None, None)
+        threading.Timer(0.1, cache.set, [key, entry]).start()
+        computed = response_cache.compute_entry(key, None, None, lambda: self.fail('computed twice'), ())
+        self.assertEqual(computed, (entry, True))
+
+
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    A second SQLite file copied from the test database stands in for a
+    replica; TransactionTestCase so the copy sees committed rows
+    """
+    serialized_rollback = True
+    alias = 'replica_test'
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Copies the test database with the SQLite backup API')
+        cache.clear()
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.settings[self.alias] = {**connection.settings_dict, 'NAME': self.path}
+        self.addCleanup(self.remove_replica)
+        self.enterContext(override_settings(DATABASE_REPLICAS=[self.alias]))
+
+        self.writer, self.reader = [
+            Token.objects.create(user=User.objects.create_user(username=name, email=f'{name}@example.com'))
+            for name in ('writer', 'reader')
+        ]
+        self.synced = Task.objects.create(
+            title='Synced', milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+        call_command('sync_replicas', stdout=StringIO())
+        # Written after the copy: the replica is lagging behind
+        Task.objects.create(
+            title='Lagging', milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+
+    def remove_replica(self):
+        connections[self.alias].close()
+        del connections[self.alias]
+        del connections.settings[self.alias]
+        os.remove(self.path)
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def read(self, client, name='task_management:task-list'):
+        """(database the request read from, task titles)"""
+        response = client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        rows = body['results'] if isinstance(body, dict) else body
+        return response.wsgi_request.read_database, sorted(row['title'] for row in rows)
+
+    def test_listed_views_read_from_the_replica(self):
+        self.assertEqual(self.read(self.client_for(self.reader)), (self.alias, ['Synced']))
+        response = self.client_for(self.reader).get(reverse('task_management:task-changes'))
+        self.assertEqual(response.wsgi_request.read_database, 'default')
+        # Outside a request everything uses the primary
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_rollup_follows_the_write_alias(self):
+        primary = TaskRollup.objects.stored()
+        task = Task.objects.using(self.alias).get(pk=self.synced.pk)
+        task.status = 'completed'
+        task.save(using=self.alias)
+        self.assertEqual(TaskRollup.objects.stored(), primary)
+        self.assertEqual(
+            TaskRollup.objects.db_manager(self.alias).stored(),
+            {('row', 'completed', self.synced.block_id): 1},
+        )
+
+    def test_streamed_export_reads_from_the_replica(self):
+        # The body is only consumed once the middleware has reset the routing
+        response = self.client_for(self.reader).get(reverse('task_management:task-export'))
+        self.assertEqual(response.wsgi_request.read_database, self.alias)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Synced'])
+
+    def test_writers_read_their_writes_from_the_primary(self):
+        writer = self.client_for(self.writer)
+        response = writer.patch(
+            reverse('task_management:task-detail', args=[self.synced.pk]), {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.read(writer), ('default', ['Lagging', 'Synced']))
+        # The pin follows the token without the cookie, but not other users
+        self.assertEqual(self.read(self.client_for(self.writer))[0], 'default')
+        self.assertEqual(self.read(self.client_for(self.reader)), (self.alias, ['Synced']))
+
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            cache.clear()
+            writer = self.client_for(self.writer)
+            writer.patch(
+                reverse('task_management:task-detail', args=[self.synced.pk]), {'status': 'nil'}, format='json'
+            )
+            self.assertEqual(self.read(writer)[0], self.alias)
+
+
+class TaskImportTest(TestCase):
+
+    HEADER = "title,milestone,status,state,business_area,district,block,start_date,estimated_end_date,assigned_to\n"
+
+    def setUp(self):
+        location('BIHTA')
+        self.surveyor = User.objects.create_user(username='surveyor', email='surveyor@example.com')
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.url = reverse('task_management:task-import-tasks')
+
+    def upload(self, body, name='tasks.csv'):
+        upload = SimpleUploadedFile(name, (self.HEADER + body).encode('utf-8'), content_type='text/csv')
+        return self.client.post(self.url, {'file': upload}, format='multipart')
+
+    def test_reimport_updates_in_place(self):
+        rows = (
+            "Survey Bihta,row,in_progress,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,surveyor\n"
+            "IFC Bihta,IFC (Issued for Construction),nil,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n"
+        )
+        first = self.upload(rows)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), {'created': 2, 'updated': 0, 'rejected': []})
+
+        second = self.upload(rows.replace('in_progress', 'completed'))
+        self.assertEqual(second.json(), {'created': 0, 'updated': 2, 'rejected': []})
+
+        task = Task.objects.get(title='Survey Bihta')
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(task.status, 'completed')
+        self.assertIsNotNone(task.completed_date)
+        self.assertEqual(task.assigned_to, self.surveyor)
+        self.assertEqual(Task.objects.get(title='IFC Bihta').milestone, 'ifc')
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_rejected_rows_report_reasons(self):
+        response = self.upload(
+            "Good,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n"
+            "Bad place,row,,BIHAR,PATNA,PATNA,NOWHERE,2026-01-01,2026-02-01,\n"
+            "Bad dates,bogus,,BIHAR,PATNA,PATNA,BIHTA,2026-03-01,2026-02-01,\n"
+            "Good,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,nobody\n"
+            "Good,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n"
+        )
+        result = response.json()
+        self.assertEqual(result['created'], 1)
+        rejected = {row['row']: set(row['errors']) for row in result['rejected']}
+        self.assertEqual(rejected, {
+            3: {'block'},
+            4: {'milestone', 'start_date'},
+            5: {'assigned_to'},
+            6: {'title'},
+        })
+
+    def test_xlsx_import(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(self.HEADER.strip().split(','))
+        sheet.append(['Survey Bihta', 'row', 'completed', 'BIHAR', 'PATNA', 'PATNA', 'BIHTA',
+                      datetime(2026, 1, 1), date(2026, 2, 1), 'surveyor'])
+        sheet.append(['Bad place', 'row', None, 'BIHAR', 'PATNA', 'PATNA', 'NOWHERE',
+                      '2026-01-01', '2026-02-01', None])
+        content = BytesIO()
+        workbook.save(content)
+
+        upload = SimpleUploadedFile('tasks.xlsx', content.getvalue())
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual([row['row'] for row in response.json()['rejected']], [3])
+        task = Task.objects.get(title='Survey Bihta')
+        self.assertEqual((task.status, task.start_date, task.assigned_to), ('completed', date(2026, 1, 1), self.surveyor))
+
+    def test_unreadable_files_are_rejected(self):
+        latin = SimpleUploadedFile('tasks.csv', (self.HEADER + "Caf\xe9,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n").encode('cp1252'))
+        corrupt = SimpleUploadedFile('tasks.xlsx', b'PK\x03\x04 not really a workbook')
+        for upload in (latin, corrupt):
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+    def test_failed_import_writes_nothing(self):
+        rows = "".join(
+            f"Survey {i},row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n" for i in range(500)
+        )
+        # The undecodable byte sits well past the first batches
+        content = (self.HEADER + rows).encode('utf-8') + b"Caf\xe9,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n"
+        with self.assertRaises(ImportFormatError):
+            import_tasks(BytesIO(content), 'csv', batch_size=10)
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_requires_admin_and_known_format(self):
+        self.assertEqual(self.upload('', name='tasks.txt').status_code, 400)
+        self.client.force_authenticate(self.surveyor)
+        self.assertEqual(self.upload('').status_code, 403)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(self.HEADER + "Survey Bihta,row,,BIHAR,PATNA,PATNA,BIHTA,2026-01-01,2026-02-01,\n")
+        self.addCleanup(os.remove, handle.name)
+        path = handle.name
+        out = StringIO()
+        call_command('import_tasks', path, stdout=out)
+        self.assertIn('Imported 1 new', out.getvalue())
+        self.assertTrue(Task.objects.filter(title='Survey Bihta', block__name='BIHTA').exists())
+
+
+class BulkStatusUpdateTest(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='manager', email='manager@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.url = reverse('task_management:task-bulk-status')
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {i}",
+                milestone='row',
+                status='completed' if i == 0 else 'in_progress',
+                block=location('BIHTA' if i < 3 else 'MANER'),
+                start_date=date(2026, 1, 1),
+                estimated_end_date=date(2026, 2, 1),
+                completed_date=date(2026, 1, 15) if i == 0 else None,
+            )
+            for i in range(4)
+        ]
+
+    def test_items_one_update_per_status(self):
+        first, second, third, _ = self.tasks
+        items = [
+            {'id': first.id, 'status': 'completed'},
+            {'id': second.id, 'status': 'completed'},
+            {'id': third.id, 'status': 'nil'},
+            {'id': 999999, 'status': 'nil'},
+            {'id': third.id, 'status': 'completed'},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'items': items}, format='json')
+        updates = [q for q in queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual(response.status_code, 207)
+        results = {(row['id'], row['result']) for row in response.json()['results']}
+        self.assertEqual(results, {
+            (first.id, 'unchanged'), (second.id, 'updated'), (third.id, 'updated'),
+            (999999, 'not_found'), (third.id, 'invalid'),
+        })
+        # completed_date follows the Task.save() rules
+        self.assertEqual(Task.objects.get(pk=first.pk).completed_date, date(2026, 1, 15))
+        self.assertIsNotNone(Task.objects.get(pk=second.pk).completed_date)
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_filter_closes_out_block(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {'filter': {'block': 'BIHTA'}, 'status': 'completed'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        # The UPDATE carries the filter, not a list of every matched id
+        update = next(q['sql'] for q in queries if q['sql'].startswith('UPDATE "tasks_task"'))
+        self.assertIn('IN (SELECT', update)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(Task.objects.filter(block__name='BIHTA', status='completed').count(), 3)
+        self.assertEqual(Task.objects.get(block__name='MANER').status, 'in_progress')
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_requires_filter(self):
+        response = self.client.post(self.url, {'filter': {}, 'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_values_are_validated(self):
+        for criteria in ({'assigned_to': 'alice'}, {'milestone': 'bogus'}, {'due_soon': True, 'days': 'x'}):
+            response = self.client.post(self.url, {'filter': criteria, 'status': 'completed'}, format='json')
+            self.assertEqual(response.status_code, 400, criteria)
+        self.assertFalse(Task.objects.filter(status='completed').exclude(pk=self.tasks[0].pk).exists())
+
+    def test_item_ids_must_be_integers(self):
+        first, second = self.tasks[:2]
+        items = [
+            {'id': [second.id], 'status': 'nil'},
+            {'id': {}, 'status': 'nil'},
+            {'id': True, 'status': 'nil'},
+            {'id': first.id, 'status': 'bogus'},
+            {'id': first.id, 'status': 'nil'},
+        ]
+        response = self.client.post(self.url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [(row['id'], row['result']) for row in response.json()['results']],
+            [([second.id], 'invalid'), ({}, 'invalid'), (True, 'invalid'), (first.id, 'invalid'),
+             (first.id, 'updated')],
+        )
+        self.assertEqual(Task.objects.get(pk=second.pk).status, 'in_progress')
+
+
+class TaskCountAnnotationTest(TestCase):
+
+    def setUp(self):
+        Milestone.objects.create(name='ROW', code='row')
+        Milestone.objects.create(name='IFC', code='ifc')
+        self.users = [
+            User.objects.create_user(username=f'surveyor{i}', email=f'surveyor{i}@example.com')
+            for i in range(3)
+        ]
+        past, future = date(2020, 1, 1), date(2100, 1, 1)
+        for title, task_status, end, user in [
+            ('Done', 'completed', past, self.users[0]),
+            ('Late', 'in_progress', past, self.users[0]),
+            ('Open', 'nil', future, self.users[1]),
+        ]:
+            Task.objects.create(
+                title=title, milestone='row', status=task_status, assigned_to=user,
+                block=location('BIHTA'), start_date=past, estimated_end_date=end,
+            )
+
+    def test_user_list_counts(self):
+        url = reverse('task_management:user-list')
+        with CaptureQueriesContext(connection) as queries:
+            rows = {row['username']: row for row in self.client.get(url).json()}
+        User.objects.create_user(username='extra', email='extra@example.com')
+        with self.assertNumQueries(len(queries)):
+            self.client.get(url)
+
+        self.assertEqual(
+            {key: rows['surveyor0'][key] for key in ('task_count', 'open_count', 'completed_count', 'overdue_count')},
+            {'task_count': 2, 'open_count': 1, 'completed_count': 1, 'overdue_count': 1},
+        )
+        self.assertEqual(rows['surveyor2']['task_count'], 0)
+
+    def test_milestone_list_counts(self):
+        with self.assertNumQueries(1):
+            rows = {row['code']: row for row in self.client.get(reverse('task_management:milestone-list')).json()}
+        self.assertEqual(rows['row']['task_count'], 3)
+        self.assertEqual(rows['row']['open_count'], 2)
+        self.assertEqual(rows['row']['overdue_count'], 1)
+        self.assertEqual(rows['ifc']['task_count'], 0)
+
+
+class TaskListSerializationTest(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='surveyor', email='surveyor@example.com', full_name='Field Surveyor')
+        for title, task_status, assignee in [('Assigned', 'completed', user), ('Open', 'nil', None)]:
+            Task.objects.create(
+                title=title, milestone='row', status=task_status, assigned_to=assignee,
+                block=location('BIHTA'), start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+            )
+        self.url = reverse('task_management:task-list')
+
+    def test_fast_path_matches_serializer(self):
+        tasks = Task.objects.select_related('assigned_to', Task.LOCATION_RELATED)
+        expected = json.loads(json.dumps(TaskSerializer(tasks, many=True).data))
+        self.assertEqual(self.client.get(self.url).json(), expected)
+        self.assertEqual(expected[0]['milestone_name'], 'ROW (Right of Way)')
+        self.assertEqual(expected[0]['assigned_to_name'], 'Field Surveyor')
+
+    def test_sparse_fieldsets(self):
+        rows = self.client.get(self.url, {'fields': 'id,title,status_display'}).json()
+        self.assertEqual(rows, [
+            {'id': row.id, 'title': row.title, 'status_display': row.get_status_display()}
+            for row in Task.objects.all()
+        ])
+        page = self.client.get(reverse('task_management:render_all_tasks'), {'fields': 'title', 'page_size': 1}).json()
+        self.assertEqual(list(page['results'][0]), ['title'])
+        self.assertIsNotNone(page['next'])
+
+        response = self.client.get(self.url, {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskFilterTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='surveyor', email='surveyor@example.com')
+        today = date.today()
+        rows = [
+            ('Trench Bihta', 'row', 'in_progress', 'BIHTA', self.user, -10, 3),
+            ('Splice Bihta', 'ifc', 'nil', 'BIHTA', None, -20, -2),
+            ('Trench Maner', 'row', 'completed', 'MANER', self.user, -30, -5),
+            ('Survey Maner', 'field_survey', 'in_progress', 'MANER', None, -5, 30),
+            ('Trench Danapur', 'row', 'in_progress', 'DANAPUR', None, -1, -1),
+        ]
+        self.tasks = {}
+        for title, milestone, task_status, block, assignee, start, due in rows:
+            self.tasks[title] = Task.objects.create(
+                title=title, milestone=milestone, status=task_status, block=location(block),
+                assigned_to=assignee, start_date=today + timedelta(days=start),
+                estimated_end_date=today + timedelta(days=due),
+            )
+        self.url = reverse('task_management:task-list')
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {row['title'] for row in response.json()}
+
+    def test_combined_filters(self):
+        self.assertEqual(self.titles(status='in_progress,nil', milestone='row'), {'Trench Bihta', 'Trench Danapur'})
+        self.assertEqual(self.titles(block='MANER', assigned_to=self.user.id), {'Trench Maner'})
+        self.assertEqual(self.titles(assigned_to='none', search='trench'), {'Trench Danapur'})
+        self.assertEqual(self.titles(overdue='true'), {'Splice Bihta', 'Trench Danapur'})
+        self.assertEqual(self.titles(due_soon='true'), {'Trench Bihta'})
+        self.assertEqual(self.titles(due_soon='true', days='30'), {'Trench Bihta', 'Survey Maner'})
+        start_to = (date.today() - timedelta(days=10)).isoformat()
+        self.assertEqual(self.titles(start_to=start_to), {'Trench Bihta', 'Splice Bihta', 'Trench Maner'})
+
+    def test_ordering_pages_with_keyset(self):
+        expected = list(Task.objects.order_by('estimated_end_date', '-title', 'id').values_list('title', flat=True))
+        titles, params = [], {'ordering': 'estimated_end_date,-title', 'page_size': 2}
+        url = self.url
+        while url:
+            page = self.client.get(url, params).json()
+            titles.extend(row['title'] for row in page['results'])
+            url, params = page['next'], None
+        self.assertEqual(titles, expected)
+
+        ordered = self.client.get(self.url, {'ordering': '-updated_at', 'fields': 'title'}).json()
+        self.assertEqual(ordered[0], {'title': 'Trench Danapur'})
+
+    def test_invalid_parameters(self):
+        for params in [
+            {'status': 'done'}, {'milestone': 'row,bogus'}, {'assigned_to': 'me'},
+            {'due_from': '01/02/2026'}, {'ordering': 'password'}, {'ordering': 'title,-title'},
+            {'days': '99999999', 'due_soon': 'true'},
+        ]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
+
+
+class TaskSearchTest(TestCase):
+
+    def setUp(self):
+        for title, subtasks, block in [
+            ('Trench Bihta', 'Dig and backfill', 'BIHTA'),
+            ('Splice joints', 'Trench crossing near Bihta bridge', 'BIHTA'),
+            ('Trench Maner', '', 'MANER'),
+        ]:
+            Task.objects.create(
+                title=title, subtasks=subtasks, milestone='row', block=location(block),
+                start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+            )
+        self.url = reverse('task_management:task-search')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.json()]
+
+    def test_ranked_prefix_search(self):
+        # Title matches rank above matches in subtasks only
+        self.assertEqual(self.search('tren bih'), ['Trench Bihta', 'Splice joints'])
+        self.assertEqual(self.search('tren', block='MANER'), ['Trench Maner'])
+        self.assertEqual(self.search('tren bih', limit=1), ['Trench Bihta'])
+        self.assertEqual(self.client.get(self.url, {'q': ' - '}).status_code, 400)
+
+    def test_list_search_filter(self):
+        response = self.client.get(reverse('task_management:task-list'), {'search': 'backfill'})
+        self.assertEqual([row['title'] for row in response.json()], ['Trench Bihta'])
+
+    def test_index_follows_bulk_writes(self):
+        Task.objects.filter(title='Trench Maner').update(subtasks='Duct laying')
+        Task.objects.filter(title='Splice joints').delete()
+        Task.objects.bulk_create([Task(
+            title='Duct Danapur', milestone='row', block=location('DANAPUR'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )])
+        self.assertEqual(sorted(self.search('duct')), ['Duct Danapur', 'Trench Maner'])
+        self.assertEqual(self.search('crossing'), [])
+
+    def test_post_migrate_restores_sqlite_triggers(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite FTS5 only')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER tasks_task_search_update')
+        repair_search_index(sender=None, using=connection.alias)
+        Task.objects.filter(title='Trench Maner').update(title='Conduit Maner')
+        self.assertEqual(self.search('conduit'), ['Conduit Maner'])
+
+
+class ProgressSnapshotTest(TestCase):
+
+    def setUp(self):
+        gaya = location('BELAGANJ', district='GAYA', business_area='GAYA')
+        for title, milestone, task_status, block in [
+            ('Trench Bihta', 'row', 'in_progress', location('BIHTA')),
+            ('Splice Bihta', 'row', 'completed', location('BIHTA')),
+            ('Survey Maner', 'field_survey', 'nil', location('MANER')),
+            ('Survey Gaya', 'field_survey', 'nil', gaya),
+        ]:
+            Task.objects.create(
+                title=title, milestone=milestone, status=task_status, block=block,
+                start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+            )
+        self.url = reverse('task_management:progress-history')
+
+    def test_capture_is_idempotent(self):
+        day = date(2026, 3, 2)
+        self.assertEqual(DailyProgressSnapshot.objects.capture(day), 3)
+        Task.objects.filter(title='Trench Bihta').set_status('completed')
+        call_command('capture_progress_snapshot', '--date', day.isoformat(), stdout=StringIO())
+
+        snapshots = DailyProgressSnapshot.objects.filter(date=day)
+        self.assertEqual(snapshots.count(), 3)
+        row = snapshots.get(milestone='row')
+        self.assertEqual((row.nil_count, row.in_progress_count, row.completed_count), (0, 0, 2))
+        self.assertEqual(row.business_area.name, 'PATNA')
+
+    def test_series_buckets(self):
+        # Mon 2 Mar, Wed 4 Mar and Mon 9 Mar; the weekly point is the latest day captured
+        DailyProgressSnapshot.objects.capture(date(2026, 3, 2))
+        Task.objects.filter(title='Survey Maner').set_status('in_progress')
+        DailyProgressSnapshot.objects.capture(date(2026, 3, 4))
+        Task.objects.filter(title='Survey Maner').set_status('completed')
+        DailyProgressSnapshot.objects.capture(date(2026, 3, 9))
+
+        params = {'from': '2026-03-01', 'to': '2026-03-31'}
+        days = self.client.get(self.url, params).json()['series']
+        self.assertEqual([point['date'] for point in days], ['2026-03-02', '2026-03-04', '2026-03-09'])
+        self.assertEqual(days[0], {
+            'date': '2026-03-02', 'as_of': '2026-03-02', 'nil': 2, 'in_progress': 1, 'completed': 1, 'total': 4,
+        })
+
+        weeks = self.client.get(self.url, {**params, 'bucket': 'week'}).json()['series']
+        self.assertEqual([(point['date'], point['as_of'], point['in_progress']) for point in weeks], [
+            ('2026-03-02', '2026-03-04', 2), ('2026-03-09', '2026-03-09', 1),
+        ])
+
+        months = self.client.get(self.url, {**params, 'bucket': 'month', 'district': 'PATNA'}).json()['series']
+        self.assertEqual(months, [{
+            'date': '2026-03-01', 'as_of': '2026-03-09', 'nil': 0, 'in_progress': 1, 'completed': 2, 'total': 3,
+        }])
+
+        scoped = self.client.get(self.url, {**params, 'milestone': 'field_survey', 'business_area': 'GAYA'}).json()
+        self.assertEqual([point['nil'] for point in scoped['series']], [1, 1, 1])
+
+    def test_series_reads_bucket_days_only(self):
+        for day in range(1, 29):
+            DailyProgressSnapshot.objects.capture(date(2026, 2, day))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'from': '2026-02-01', 'to': '2026-02-28', 'bucket': 'month'})
+        self.assertEqual(len(response.json()['series']), 1)
+        self.assertIn("'2026-02-28'", queries[-1]['sql'])
+        self.assertNotIn("'2026-02-27'", queries[-1]['sql'])
+
+    def test_invalid_parameters(self):
+        for params in [{'bucket': 'year'}, {'from': 'yesterday'}, {'block': 'BIHTA'}, {'milestone': 'bogus'}]:
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+
+@override_settings(TASK_SYNC_LAG_SECONDS=0)
+class TaskSyncTest(TestCase):
+
+    def setUp(self):
+        self.tasks = [
+            Task.objects.create(
+                title="Sync %d" % i, milestone='row', block=location('BIHTA'),
+                start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+            )
+            for i in range(5)
+        ]
+        self.url = reverse('task_management:task-changes')
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_sync_then_deltas(self):
+        ids, cursor, has_more = [], None, True
+        while has_more:
+            page = self.sync(cursor, limit=2)
+            ids.extend(row['id'] for row in page['changed'])
+            cursor, has_more = page['cursor'], page['has_more']
+        self.assertEqual(sorted(ids), sorted(task.pk for task in self.tasks))
+
+        self.assertEqual(self.sync(cursor)['changed'], [])
+
+        edited, deleted = self.tasks[0], self.tasks[1]
+        edited.status = 'completed'
+        edited.save()
+        deleted_id = deleted.pk
+        self.client.delete(reverse('task_management:task-detail', args=[deleted_id]))
+        page = self.sync(cursor, fields='id,status')
+        self.assertEqual(page['changed'], [{'id': edited.pk, 'status': 'completed'}])
+        self.assertEqual(page['deleted'], [deleted_id])
+
+        cursor = page['cursor']
+        Task.objects.filter(pk__in=[self.tasks[2].pk, self.tasks[3].pk]).delete()
+        self.assertEqual(sorted(self.sync(cursor)['deleted']), sorted([self.tasks[2].pk, self.tasks[3].pk]))
+
+    @override_settings(TASK_SYNC_LAG_SECONDS=60)
+    def test_recent_changes_wait_for_the_lag(self):
+        now = timezone.now()
+        first, recent, *rest = self.tasks
+        Task.objects.filter(pk__in=[task.pk for task in rest]).delete()
+        TaskTombstone.objects.update(deleted_at=now - timedelta(minutes=5))
+        Task.objects.filter(pk=first.pk).update(updated_at=now - timedelta(minutes=2))
+        Task.objects.filter(pk=recent.pk).update(updated_at=now - timedelta(seconds=30))
+
+        page = self.sync()
+        # Rows inside the lag are sent, but the cursor stays before them
+        self.assertEqual([row['id'] for row in page['changed']], [first.pk, recent.pk])
+        # A slow transaction commits a row stamped before `recent`
+        late = Task.objects.create(
+            title="Late", milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+        Task.objects.filter(pk=late.pk).update(updated_at=now - timedelta(seconds=45))
+        late_delete = TaskTombstone.objects.create(task_id=999999, deleted_at=now - timedelta(seconds=10))
+        pending = self.sync(page['cursor'])
+        self.assertEqual([row['id'] for row in pending['changed']], [late.pk, recent.pk])
+        self.assertEqual(pending['deleted'], [late_delete.task_id])
+        self.assertEqual(decode_sync_cursor(pending['cursor'])[:3], decode_sync_cursor(page['cursor'])[:3])
+
+        with override_settings(TASK_SYNC_LAG_SECONDS=0):
+            page = self.sync(page['cursor'])
+            self.assertEqual([row['id'] for row in page['changed']], [late.pk, recent.pk])
+            self.assertEqual(page['deleted'], [late_delete.task_id])
+            # Past the lag they are not sent again
+            page = self.sync(page['cursor'])
+        self.assertEqual((page['changed'], page['deleted']), ([], []))
+
+    @override_settings(TASK_SYNC_LAG_SECONDS=60)
+    def test_own_edits_show_up_inside_the_lag(self):
+        page = self.sync()
+        self.assertEqual(len(page['changed']), 5)
+        edited, deleted = self.tasks[:2]
+        response = self.client.patch(
+            reverse('task_management:task-detail', args=[edited.pk]), {'status': 'completed'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.delete(reverse('task_management:task-detail', args=[deleted.pk]))
+        page = self.sync(page['cursor'], fields='id,status')
+        self.assertIn({'id': edited.pk, 'status': 'completed'}, page['changed'])
+        self.assertEqual(page['deleted'], [deleted.pk])
+
+    def test_sync_scoped_to_an_assignee(self):
+        mine, theirs = [
+            User.objects.create_user(username=name, email=f'{name}@example.com') for name in ('mine', 'theirs')
+        ]
+        kept, reassigned, other, *_ = self.tasks
+        Task.objects.filter(pk__in=[kept.pk, reassigned.pk]).update(assigned_to=mine)
+        Task.objects.filter(pk=other.pk).update(assigned_to=theirs)
+
+        ids, cursor, has_more = [], None, True
+        while has_more:
+            page = self.sync(cursor, assigned_to=mine.pk, limit=1)
+            ids.extend(row['id'] for row in page['changed'])
+            cursor, has_more = page['cursor'], page['has_more']
+        self.assertEqual(sorted(ids), [kept.pk, reassigned.pk])
+        self.assertEqual(self.sync(cursor, assigned_to=mine.pk)['changed'], [])
+
+        reassigned.assigned_to = theirs
+        reassigned.save()
+        other.assigned_to = mine
+        other.save()
+        page = self.sync(cursor, assigned_to=mine.pk)
+        self.assertEqual([row['id'] for row in page['changed']], [other.pk])
+        self.assertEqual(page['deleted'], [reassigned.pk])
+
+        self.assertEqual(self.client.get(self.url, {'assigned_to': 'me'}).status_code, 400)
+
+    def test_full_sync_ignores_earlier_deletions(self):
+        self.tasks[4].delete()
+        page = self.sync()
+        self.assertEqual(page['deleted'], [])
+        self.assertEqual(self.sync(page['cursor'])['deleted'], [])
+
+    def test_expired_and_invalid_cursors(self):
+        stale = encode_sync_cursor(None, None, 0, datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.client.get(self.url, {'since': stale}).status_code, 410)
+        self.assertEqual(self.client.get(self.url, {'since': 'garbage'}).status_code, 404)
+
+    def test_prune_tombstones(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks]).delete()
+        self.assertEqual(TaskTombstone.objects.count(), 5)
+        self.assertEqual(TaskTombstone.objects.prune(before=timezone.now() + timedelta(seconds=1)), 5)
+
+
+class RequestMetricsTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        Task.objects.create(
+            title="Survey Bihta", milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+        self.url = reverse('task_management:task-list')
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+$')
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+
+    def test_sampled_structured_log(self):
+        with self.settings(METRICS_LOG_SAMPLE_RATE=1.0), self.assertLogs('backend.metrics', 'INFO') as logs:
+            self.client.get(self.url)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'task_management:task-list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['bytes'], 0)
+        self.assertGreater(record['db_queries'], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.get(self.url)
+        self.assertIn(self.client.get('/metrics').status_code, (401, 403))
+
+        admin = User.objects.create_user(username='admin', email='admin@example.com', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        labels = 'view="task_management:task-list",method="GET"'
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', body)
+        self.assertIn(f'http_requests_total{{{labels},status="2xx"}} 1', body)
+        self.assertRegex(body, r'http_request_db_queries_total\{%s\} [1-9]' % labels)
+
+
+class FastJSONTest(TestCase):
+
+    def test_renderer_encodes_python_types(self):
+        payload = {
+            1: Decimal('2.50'),
+            'when': datetime(2026, 1, 1, 12, 30, tzinfo=dt_timezone.utc),
+            'day': date(2026, 1, 1),
+        }
+        rendered = json.loads(FastJSONRenderer().render(payload))
+        self.assertEqual(rendered, {'1': 2.5, 'when': '2026-01-01T12:30:00Z', 'day': '2026-01-01'})
+
+    def test_task_list_matches_stdlib_renderer(self):
+        Task.objects.create(
+            title="Survey Bihta", milestone='row', block=location('BIHTA'),
+            start_date=date(2026, 1, 1), estimated_end_date=date(2026, 2, 1),
+        )
+        url = reverse('task_management:task-list')
+        fast = self.client.get(url).content
+        with self.settings(FAST_JSON_ENABLED=False):
+            stdlib = self.client.get(url).content
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+
+    def test_parser_rejects_malformed_json(self):
+        user = User.objects.create_user(username='manager', email='manager@example.com')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            reverse('task_management:task-bulk-status'), '{"items": [', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class SeedTasksTest(TestCase):
+
+    def seed(self, tasks=600, **options):
+        call_command('seed_tasks', tasks=tasks, users=5, workers=1, stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return list(Task.objects.order_by('title').values_list(
+            'title', 'milestone', 'status', 'block_id', 'start_date', 'estimated_end_date', 'completed_date',
+        ))
+
+    def test_covers_every_block_and_keeps_rollup(self):
+        self.seed()
+        self.assertEqual(Task.objects.count(), 600)
+        self.assertEqual(Task.objects.values('block').distinct().count(), Block.objects.count())
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+        self.assertFalse(Task.objects.filter(status='completed', completed_date__isnull=True).exists())
+        self.assertFalse(Task.objects.filter(estimated_end_date__lt=models.F('start_date')).exists())
+        # The search index is rebuilt after the load
+        title = Task.objects.order_by('id').values_list('title', flat=True).first()
+        response = self.client.get(reverse('task_management:task-search'), {'q': title.split(' #')[0]})
+        self.assertIn(title, [row['title'] for row in response.json()])
+
+    def test_same_seed_same_data(self):
+        self.seed(seed=3)
+        first = self.snapshot()
+        ids = set(Task.objects.values_list('id', flat=True))
+        self.seed(seed=3, clear=True)
+        self.assertEqual(self.snapshot(), first)
+        self.assertEqual(set(TaskTombstone.objects.values_list('task_id', flat=True)), ids)
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+
+    def test_small_load_keeps_existing_tasks(self):
+        self.seed(seed=1)
+        self.seed(tasks=20, seed=2)
+        self.assertEqual(Task.objects.count(), 620)
+        self.assertEqual(TaskRollup.objects.stored(), TaskRollup.objects.recount())
+        self.assertTrue(Task.objects.filter(title__endswith=' #619').exists())
+
+    def test_demo_accounts(self):
+        self.seed(tasks=0, demo_accounts=True)
+        self.assertTrue(User.objects.get(username='admin').is_superuser)
+        self.assertTrue(User.objects.get(username='rammohan').check_password('Rammohan@01'))
+        self.seed(tasks=0, demo_accounts=True)
+        self.assertEqual(User.objects.filter(username__startswith='admin').count(), 3)
+
+
+def import_upload(data):
+    rows = ''.join(
+        f"Imported {i},row,nil,{','.join(data['location'])},2026-01-01,2026-02-01,budget_user_0\n" for i in range(5)
+    )
+    header = "title,milestone,status,state,business_area,district,block,start_date,estimated_end_date,assigned_to\n"
+    return {'file': SimpleUploadedFile('tasks.csv', (header + rows).encode('utf-8'), content_type='text/csv')}
+
+
+def first_task(data):
+    return [data['tasks'][0].id]
+
+
+def task_payload(data):
+    state, business_area, district, block = data['location']
+    return {
+        'title': 'Budget created task', 'milestone': 'row', 'state': state, 'business_area': business_area,
+        'district': district, 'block': block, 'start_date': '2026-01-01', 'estimated_end_date': '2026-02-01',
+    }
+
+
+PAGE = {'page_size': 25}
+
+# Query budgets and body ceilings (at LARGE) for every route in tasks/urls.py
+TASK_ROUTES = [
+    Route('task_management:api-root', 'get', 0, 1),
+    Route('task_management:task-list', 'get', 4, 20, params=lambda data: PAGE),
+    Route('task_management:task-list', 'post', 9, 1, status=201, params=task_payload),
+    Route('task_management:task-all-tasks', 'get', 4, 20, params=lambda data: PAGE),
+    Route('task_management:task-bulk-status', 'post', 12, 1, params=lambda data: {
+        'items': [{'id': task.id, 'status': 'completed'} for task in data['tasks'][:5]],
+    }),
+    Route('task_management:task-by-location', 'get', 4, 20,
+          params=lambda data: {'district': data['location'][2], **PAGE}),
+    Route('task_management:task-by-milestone', 'get', 4, 10, params=lambda data: {'milestone': 'row', **PAGE}),
+    Route('task_management:task-changes', 'get', 2, 20, params=lambda data: {'limit': 25}),
+    Route('task_management:task-export', 'get', 1, 4, params=lambda data: {'output': 'csv', 'milestone': 'row'}),
+    Route('task_management:task-import-tasks', 'post', 10, 1, params=import_upload, format='multipart'),
+    Route('task_management:task-my-tasks', 'get', 4, 4,
+          params=lambda data: {'user_id': data['users'][0].id, **PAGE}),
+    Route('task_management:task-search', 'get', 4, 20, params=lambda data: {'q': 'budget tren', 'limit': 25}),
+    Route('task_management:task-detail', 'get', 1, 1, args=first_task),
+    Route('task_management:task-detail', 'put', 11, 1, args=first_task, params=task_payload),
+    Route('task_management:task-detail', 'patch', 9, 1, args=first_task, params=lambda data: {'status': 'completed'}),
+    Route('task_management:task-detail', 'delete', 8, 1, status=204, args=first_task),
+    Route('task_management:user-list', 'get', 1, 10),
+    Route('task_management:user-detail', 'get', 1, 1, args=lambda data: [data['users'][0].id]),
+    Route('task_management:milestone-list', 'get', 1, 3),
+    Route('task_management:milestone-detail', 'get', 1, 1, args=lambda data: [data['milestone'].id]),
+    Route('task_management:update-task-status', 'patch', 9, 1, args=first_task,
+          params=lambda data: {'status': 'in_progress'}),
+    Route('task_management:get-states', 'get', 2, 1),
+    Route('task_management:get-business-areas', 'get', 2, 1, args=lambda data: data['location'][:1]),
+    Route('task_management:get-districts', 'get', 2, 1, args=lambda data: data['location'][:2]),
+    Route('task_management:get-blocks', 'get', 2, 1, args=lambda data: data['location'][:3]),
+    Route('task_management:task-summary', 'get', 5, 1),
+    Route('task_management:milestone-progress', 'get', 4, 2),
+    Route('task_management:progress-history', 'get', 3, 1),
+    Route('task_management:render_all_tasks', 'get', 4, 20, params=lambda data: PAGE),
+    Route('task_management:assigned_tasks', 'get', 2, 4, args=lambda data: [data['users'][0].id]),
+    Route('task_management:current-user', 'get', 1, 1, params=lambda data: {'user_id': data['users'][0].id}),
+]
+
+
+class TaskQueryBudgetTest(QueryBudgetMixin, TestCase):
+
+    def test_every_route_has_a_budget(self):
+        self.assert_routes_covered(TASK_ROUTES, task_urls.urlpatterns, 'task_management:')
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        self.assert_budgets(TASK_ROUTES)
@@ -27,6 +27,7 @@ urlpatterns = [
     # Dashboard endpoints
     path('dashboard/task-summary/', views.task_summary, name='task-summary'),
     path('dashboard/milestone-progress/', views.milestone_progress, name='milestone-progress'),
+    path('dashboard/progress-history/', views.progress_history, name='progress-history'),
     path("alltasks/", views.all_tasks_view, name="render_all_tasks"),
     path('api/v1/tasks/assigned/<int:user_id>/', views.get_assigned_tasks, name='assigned_tasks'),
     # Auth-related endpoints
@@ -1,94 +1,94 @@
+import logging
+from functools import partial
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from rest_framework.authentication import TokenAuthentication
+from users.authentication import CachedTokenAuthentication
 # from authentication import CsrfExemptSessionAuthentication
-from .models import Task, Milestone
+from .models import Task, Milestone, TaskRollup, DailyProgressSnapshot, State, BusinessArea, District, Block
+from .export import EXPORT_FORMATS, stream_tasks
+from .importer import ImportFormatError, detect_format, import_tasks
+from .caching import LOCATIONS, MILESTONES, TASKS, USERS, cached_response
+from .conditional import (
+    conditional_response, daily_fingerprint, location_fingerprint, snapshot_fingerprint, task_fingerprint
+)
+from .filters import (
+    FILTER_PARAMS, TaskFilterBackend, depends_on_today, filter_tasks, location_filters, parse_choices, parse_date
+)
+from .sync import get_sync_page_size, task_changes
+from .search import MAX_SEARCH_LIMIT, SEARCH_LIMIT, search_terms, search_tasks
+from .pagination import TaskKeysetPagination
 from users.models import User
 from .serializers import (
-    TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer,
-    UserSerializer, MilestoneSerializer
+    TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer, TaskValuesSerializer,
+    UserSerializer, MilestoneSerializer, sparse_fields
 )
 
-# Load location data (in a real application, this would be from a database)
-# For demonstration, we're using a mock data structure similar to what's in locationData.js
-import json
-from pathlib import Path
-import os
-
-# This would normally load from a file or DB, mocked for simplicity
-LOCATION_DATA = {
-    "states": ['BIHAR'],
-    "BIHAR": {
-      "businessAreas": ['PATNA', 'GAYA', 'BHAGALPUR', 'DARBHANGA', 'MUZAFFARPUR'],
-      "PATNA": {
-        "districts": ['PATNA', 'NALANDA', 'BHOJPUR', 'BUXAR'],
-        "PATNA": ['BIHTA', 'SAMPATCHAL', 'PHULWARI', 'BAKHTIYARPUR', 'DINAPUR', 'MANER', 'PUNPUN', 'KHUSRUPUR', 'FATUHA', 'DHANARUA', 'BELCHCHI', 'PALIGANJ', 'ATHAMALGOLA', 'PANDARAK', 'BARH', 'MOKAMA', 'DULHIN BAZAR', 'MASAURHI', 'BIKRAM', 'NAUBATPUR', 'PATNA SADAR', 'GHOSWARI', 'DANIYAWAN'],
-        "NALANDA": ['ISLAMPUR', 'BIND', 'KATRISARAI', 'HARNAUT', 'RAJGIR', 'RAHUI', 'NOORSARAI', 'NAGAR NAUSA', 'BIHARSHARIF', 'SILAO', 'HILSA', 'EKANGARSARI', 'GIRIAK', 'KARAI PARUSURAI', 'THARTHARI', 'CHANDI', 'PARBALPUR', 'SARMERA', 'BEN', 'ASTHAWAN'],
-        "BHOJPUR": ['AGIAON', 'SHAHPUR', 'SANDESH', 'BARHARA', 'SAHAR', 'ARA', 'KOLIWAR', 'BEHEA', 'TARARI', 'PIRO', 'CHARPOKHARI', 'UDWANTNAGAR', 'GARHANI', 'JAGDISHPUR'],
-        "BUXAR": ['NAWANAGAR', 'BRAHMPUR', 'DUMRAON', 'CHAUSA', 'CHOUGAIN', 'ITARHI', 'RAJPUR', 'BUXAR', 'SIMRI', 'KESATH', 'CHAKKI']
-      },
-      "GAYA": {
-        "districts": ['ROHTAS', 'NAWADA', 'ARWAL', 'GAYA', 'JEHANABAD', 'AURANGABAD', 'KAIMUR(BHABUA)'],
-        "ROHTAS": ['SURAJPURA', 'SANJHOULI', 'DINARA', 'CHENARI', 'NAWHATTA', 'DEHRI', 'BIKRAMGANJ', 'ROHTAS', 'KOCHAS', 'NOKHA', 'TILOUTHU', 'NASRIGANJ', 'RAJUPUR', 'SASARAM', 'KARAKAT', 'KARGAHAR', 'DAWATH', 'AKHORIGOLA', 'SHEOSAGAR'],
-        "NAWADA": ['MESCAUR', 'NARHAT', 'NARDIGANJ', 'AKBARPUR', 'GOBINDPUR', 'ROH', 'KASHICHAK', 'RAJAULI', 'PAKRI BARAWAN', 'NAWADA', 'WARISALIGANJ', 'SIRDALA', 'KAWAKOLE', 'HISUA'],
-        "ARWAL": ['ARWAL', 'KALER', 'KAPRI', 'KURTHA', 'SONBHADRA-BANSI-SURAJPUR'],
-        "GAYA": ['DUMARIA', 'KHIZARSARAI', 'MOHRA', 'GURARU', 'IMAMGANJ', 'BARACHATTI', 'BODHGAYA', 'ATRI', 'AMAS', 'PARAIYA', 'WAZIRGANJ', 'SHERGHATTY', 'FATEHPUR', 'MOHANPUR', 'NEEMCHAK BATHANI', 'MANPUR', 'KONCH', 'BELAGANJ', 'GAYA TOWN', 'TEKARI', 'BANKEY BAZAR', 'TANKUPPA', 'DOBHI'],
-        "JEHANABAD": ['KAKO', 'JEHANABAD', 'RATNI FARIDPUR', 'GHOSHI', 'HULASGNAJ', 'MODANGANJ', 'MAKHUMPUR'],
-        "AURANGABAD": ['HASPURA', 'KUTUMBA', 'GOH', 'BARUN', 'RAFIGANJ', 'NABINAGAR', 'DEO', 'DAUDNAGAR', 'MADANPUR', 'AURANGABAD', 'OBRA'],
-        'KAIMUR(BHABUA)': ['RAMGARH', 'ADHAURA', 'KUDRA', 'BHABUA', 'RAMPUR', 'DURGAWATI', 'MOHANIA', 'BHAGWANPUR', 'CHAND', 'CHAINPUR', 'NUAON']
-      },
-      "BHAGALPUR": {
-        "districts": ['SHEIKHPURA', 'MUNGER', 'BANKA', 'LAKSHISARAI', 'BHAGALPUR', 'ARARIA', 'PURNIA', 'JAMUI', 'KATIHAR', 'KISHANGANJ'],
-        "SHEIKHPURA": ['ARIARI', 'BARBIGHA', 'CHEWARA', 'GHAT KUSUMBHA', 'SHEIKHOPUR SARAI', 'SHEIKHPURA'],
-        "MUNGER": ['DHARHARA', 'JAMALPUR', 'SANGRAMPUR', 'TETIABAMBAR', 'MUNGER SADAR', 'BARIYARPUR', 'TARAPUR', 'ASARGANJ', 'KHARAGPUR'],
-        "BANKA": ['CHANNAN', 'KATORIA', 'AMARPUR', 'BELHAR', 'DHURAIYA', 'BAUSI', 'BANKA', 'BARAHAT', 'FULLIDUMAR', 'RAJAUN', 'SHAMBHUGANJ'],
-        "LAKSHISARAI": ['BARAHIYA', 'CHANNAN', 'HALSI', 'LAKHISARAI', 'PIPARIYA', 'RAMGARH CHOWK', 'SURAJGARHA'],
-        "BHAGALPUR": ['NARAYANPUR', 'GORADIH', 'PIRPAINTI', 'NAUGACHHIA', 'KHARIK', 'SABOUR', 'KAHALGAON', 'RANGRACHOWK', 'ISMAILPUR', 'GOPALPUR', 'SULTANGANJ', 'NATHNAGAR', 'SONHAULA', 'JAGDISHPUR', 'BIHPUR', 'SHAHKUND'],
-        "ARARIA": ['RANIGANJ', 'FORBESGANJ', 'KURSAKAΝΤΑ', 'PALASI', 'NARPATGANJ', 'BHARGAMA', 'JOKIHAT', 'SIKTY', 'ARARIA'],
-        "PURNIA": ['RUPOULI', 'SRINAGAR', 'AMOUR', 'BAISA', 'BANMANKHI', 'PURNIA EAST', 'BARHARA', 'DAGRAUA', 'BAISI', 'KRITYANAND NAGAR', 'DHAMDAHA', 'JALALGARH', 'KASBA', 'BHAWANIPUR'],
-        "JAMUI": ['BARHAT', 'SIKANDRA', 'ISLAMNAGAR ALIGANJ', 'JAMUI', 'JHAJHA', 'SONO', 'KHAIRA', 'LAXMIPUR', 'GIDHOR', 'CHAKAI'],
-        "KATIHAR": ['MANIHARI', 'DANDKHORA', 'KADWA', 'BALRAMPUR', 'KORHA', 'FALKA', 'SAMELI', 'HASANGANJ', 'KURSELA', 'MANSAHI', 'KATIHAR', 'AZAMNAGAR', 'BARARI', 'PRANPUR', 'BARSOI', 'AMDABAD'],
-        "KISHANGANJ": ['POTHIA', 'BAHADURGANJ', 'THAKURGANJ', 'DIGHALBANK', 'KOCHADHAMAN', 'TERHAGACHH', 'KISHANGANJ']
-      },
-      "DARBHANGA": {
-        "districts": ['BEGUSARAI', 'SAHARSA', 'DARBHANGA', 'MADHEPURA', 'SAMASTIPUR', 'MADHUBANI', 'SUPAUL', 'KHAGARIA'],
-        "BEGUSARAI": ['GADHUPURA', 'SAHEBPUR KAMAL', 'BARAUNI', 'DANDARI', 'CHERIA BARIARPUR', 'BEGUSARAI', 'NAWKOTHI', 'KHODAWANDPUR', 'BALLIA', 'BAKHRI', 'TEGHRA', 'BIRPUR', 'BHAGWANPUR', 'SAMHO AKHA KURHA', 'MANSURCHAK', 'CHHAURAHI', 'BACHHWARA', 'MATIHANI'],
-        "SAHARSA": ['SOUR BAZAR', 'KAHARA', 'NAUHATTA', 'SONBARSA', 'BANMA ITAHARI', 'SATTAR KATTAIYA', 'SALKHUA', 'PATARGHAT', 'MAHISHI', 'SIMRI BAKHTIARPUR'],
-        "DARBHANGA": ['GHANSHYAMPUR', 'KUSHESWAR ASTHAN EAST', 'KUSHESHWAR ASTHAN', 'DARBHANGA', 'JALE', 'HAYAGHAT', 'BIRAUL', 'SINGHWARA', 'TARDIH', 'MANIGACHHI', 'HANUMAN NAGAR', 'BENIPUR', 'BAHERI', 'GAURABAURAM', 'KEOTIRUNWAY', 'ALINAGAR', 'BAHADURPUR', 'KIRATPUR'],
-        "MADHEPURA": ['UDA KISHANGANJ', 'PURANI', 'GHELARH', 'GAMHARIYA', 'SHANKARPUR', 'CHAUSA', 'ALAMNAGAR', 'SINGHESHWAR', 'GWALPARA', 'MADHEPURA', 'KUMARKHAND', 'BIHARIGANJ', 'MURLIGANJ'],
-        "SAMASTIPUR": ['WARISNAGAR', 'BITHAN', 'SARAIRANJAN', 'DALSINGHSARA', 'KHANPUR', 'MOHIUDDINAGAR', 'VIDYAPATI NAGAR', 'PATORI', 'MORWA', 'KALYANPUR', 'ROSERA', 'HASANPUR', 'TAJPUR', 'SAMASTIPUR', 'MOHANPUR', 'BIBHUTPUR', 'PUSA', 'SHIVAJI NAGAR', 'SINGHIA', 'UJIARPUR'],
-        "MADHUBANI": ['PHULPARAS', 'LAUKAHA (KHUTAUNA)', 'RAJNAGAR', 'LADANIA', 'PANDAUL', 'KALUAHI', 'NIRMALI', 'MADHWAPUR', 'MADHEPUR', 'JHANJHARPUR', 'BABU BARHI', 'GHOGHARDIHA', 'BENIPATTI', 'KHAJAULI', 'BISFI', 'LAKHNAUR', 'RAHIKA', 'MADHUBANI', 'BASOPATTI', 'MARAUNA', 'ANDHRATHARHI', 'LAUKAHI', 'HARLAKHI', 'JAINAGAR'],
-        "SUPAUL": ['BASANTPUR', 'TRIBENIGANJ', 'KISHANPUR', 'NIRMALI', 'PRATAPGANJ', 'SUPAUL', 'SARAIGARH BHARTIYAHI', 'RAGHOPUR', 'CHHATAPUR', 'PIPRA'],
-        "KHAGARIA": ['MANSI', 'GOGRI', 'KHAGARIA', 'BELDAUR', 'CHAUTHAM', 'PARBATTA', 'ALAULI']
-      },
-      "MUZAFFARPUR": {
-        "districts": ['SIWAN', 'SITAMARHI', 'VAISHALI', 'PASHCHIM CHAMPARAN', 'SHEOHAR', 'GOPALGANJ', 'PURBI CHAMPARAN', 'MUZAFFARPUR', 'SARAN'],
-        "SIWAN": ['SIWAN', 'GUTHANI', 'MAIRWA', 'BHAGWANPUR HAT', 'DARAULI', 'SISWAN', 'DARAUNDHA', 'RAGHUNATHPUR', 'HUSSAINGANJ', 'BARHARIA', 'ANDAR', 'BASANTPUR', 'MAHARAJGANJ', 'NAUTAN', 'ZIRADEI', 'PACHRUKHI', 'HASAN PURA', 'GORIAKOTHI', 'LAKRI NABIGANJ'],
-        "SITAMARHI": ['PARSAUNI', 'RUNNISAIDPUR', 'BATHANAHA', 'PUPRI', 'SUPPI', 'SURSAND', 'SONBARSA', 'BAJPATTI', 'MAJORGANJ', 'CHORAUT', 'BOKHRA', 'NANPUR', 'PARIHAR', 'RIGA', 'BELSAND', 'BAIRGANIA', 'DUMRA'],
-        "VAISHALI": ['SAHDEI BUZURG', 'MAHNAR', 'HAJIPUR', 'BIDUPUR', 'VAISHALI', 'MAHUA', 'PATEDHI BELSAR', 'RAJAPAKAR', 'CHEHRAKALA', 'JANDAHA', 'RAGHOPUR', 'PATEPUR', 'GARAUL', 'BHAGWANPUR', 'DESRI', 'LALGANJ'],
-        'PASHCHIM CHAMPARAN': ['SIKTA', 'THAKRAHAN', 'MAJHAULIA', 'PIPRASI', 'BETTIAH', 'MAINATAND', 'LAURIYA', 'BAGAHA-II', 'NARKATIAGANJ', 'NAUTAN', 'RAMNAGAR', 'BAGAHA-I', 'CHANPATIA', 'GAUNAHA', 'BAIRIA', 'MADHUBANI', 'JOGAPATTI'],
-        "SHEOHAR": ['DUMARI KATSARI', 'PIPRAHI', 'PURNAHIYA', 'SHEOHAR', 'TARIYANI'],
-        "GOPALGANJ": ['BHOREY', 'GOPALGANJ', 'KATAIYA', 'UCHKAGAON', 'MANJHA', 'SIDHWALIYA', 'PHULWARIYA', 'PANCHDEORI', 'KUCHAIKOTE', 'BARAULI', 'BAIKUNTHPUR', 'HATHUA', 'THAWE', 'BIJAIPUR'],
-        'PURBI CHAMPARAN': ['CHAWRADANO', 'BANJARIYA', 'TETARIYA', 'GHORASAHAN', 'MEHSI', 'RAXAUL', 'RAMGARHWA', 'CHIRAIYA', 'KESARIA', 'ADAPUR', 'KOTWA', 'SUGAULI', 'TURKAULIA', 'KALYANPUR', 'PATAHI', 'SANGRAMPUR', 'DHAKA', 'HARSIDHI', 'PAKRIDAYAL', 'MADHUBAN', 'ARERAJ', 'BANKATWA', 'CHAKIA (PIPRA)', 'MOTIHARI', 'PAHARPUR', 'PIPRA KOTHI', 'PHENHARA'],
-        "MUZAFFARPUR": ['MURAUL', 'SARAIYA', 'GAIGHAT', 'BOCHAHAN', 'MOTIPUR', 'KURHANI', 'SAHEBGANJ', 'BANDRA', 'MARWAN', 'PAROO', 'KANTI', 'KATRA', 'AURAI', 'MINAPUR', 'SAKRA', 'MUSHAHARI'],
-        "SARAN": ['TARAIYA', 'ISUAPUR', 'MARHAURAH', 'BANIAPUR', 'NAGRA', 'DIGHWARA', 'MAKER', 'SONEPUR', 'CHHAPRA', 'GARKHA', 'MASHRAKΗ', 'PARSA', 'JALALPUR', 'EKMA', 'MANJHI', 'AMNOUR', 'DARIAPUR', 'LAHLADPUR', 'PANAPUR', 'REVELGANJ']
-      }
+
+logger = logging.getLogger(__name__)
+
+# Default span of the progress history chart
+PROGRESS_HISTORY_DAYS = 90
+
+
+def task_counts(prefix=''):
+    """
+    Count annotations for the tasks reached through ``prefix``
+    (e.g. 'assigned_tasks__'): total, open, completed and overdue
+    """
+    open_statuses = [code for code, _ in Task.STATUS_CHOICES if code != 'completed']
+    is_open = Q(**{prefix + 'status__in': open_statuses})
+    return {
+        'task_count': Count(prefix + 'id'),
+        'open_count': Count(prefix + 'id', filter=is_open),
+        'completed_count': Count(prefix + 'id', filter=Q(**{prefix + 'status': 'completed'})),
+        'overdue_count': Count(prefix + 'id', filter=is_open & Q(**{
+            prefix + 'estimated_end_date__lt': timezone.now().date()
+        })),
+    }
+
+
+def task_list_validators(request):
+    """
+    (fingerprint, ETag extras) for a filtered task list. Overdue and due
+    soon lists change at midnight without any write, so they carry the date.
+    """
+    if depends_on_today(request.query_params):
+        today = timezone.now().date()
+        return daily_fingerprint(task_fingerprint, today), (today,)
+    return task_fingerprint, ()
+
+
+def milestone_task_counts():
+    """
+    task_counts() for Milestone rows, which match tasks by code rather
+    than by foreign key, as one correlated subquery per count
+    """
+    tasks = Task.objects.filter(milestone=OuterRef('code')).order_by().values('milestone')
+    return {
+        name: Coalesce(Subquery(tasks.annotate(total=aggregate).values('total')), 0)
+        for name, aggregate in task_counts().items()
     }
-  }
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing tasks
     """
-    queryset = Task.objects.all().select_related('assigned_to')
+    queryset = Task.objects.all().select_related('assigned_to', Task.LOCATION_RELATED)
     serializer_class = TaskSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    pagination_class = TaskKeysetPagination
+    filter_backends = [TaskFilterBackend]
 
     # permission_classes = [IsAuthenticated]
 
@@ -103,7 +103,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def get_serializer_class(self):
-        print("Fetching serializer class")  
+        logger.debug("Fetching serializer class")
         """
         Use different serializers for different actions
         """
@@ -116,13 +116,13 @@ class TaskViewSet(viewsets.ModelViewSet):
         return TaskSerializer
     
     def perform_create(self, serializer):
-        print("Performing task creation")
+        logger.debug("Performing task creation")
         """
         Set any additional fields on creation
         """
         serializer.save()
     def create(self, request, *args, **kwargs):
-        print("🔁 Custom create() called")
+        logger.debug("Custom create() called")
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
@@ -132,11 +132,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_201_CREATED)
     
     def perform_destroy(self, instance):
-        print("🔁 Performing task deletion")
+        logger.debug("Performing task deletion")
         instance.delete()
 
     def delete(self, request, *args, **kwargs):
-        print("🔁 Custom delete() called")
+        logger.debug("Custom delete() called")
         instance = self.get_object()
         self.perform_destroy(instance)
         return Response({
@@ -144,13 +144,13 @@ class TaskViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_204_NO_CONTENT)
 
     def pefrom_put(self, serializer):
-        print("🔁 Performing task update")
+        logger.debug("Performing task update")
         """
         Set any additional fields on update
         """
         serializer.save()
     def put(self, request, *args, **kwargs):
-        print("🔁 Custom put() called")
+        logger.debug("Custom put() called")
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -162,27 +162,100 @@ class TaskViewSet(viewsets.ModelViewSet):
     
 
 
+    def list_response(self, queryset):
+        """
+        Serialize a task queryset, one keyset page at a time when the
+        client asked for pagination, or answer 304 if nothing changed.
+        Rows go through the values() fast path, limited to ?fields=.
+        """
+        serializer = TaskValuesSerializer(sparse_fields(self.request))
+
+        def build():
+            rows = serializer.values(queryset)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(serializer.to_representation(page))
+            return Response(serializer.to_representation(rows), status=status.HTTP_200_OK)
+
+        fingerprint, extra = task_list_validators(self.request)
+        return conditional_response(self.request, fingerprint, build, *extra)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
     def pefrom_alltasks(self, serializer):
-        print("🔁 Performing task retrieval")
+        logger.debug("Performing task retrieval")
         """
         Set any additional fields on retrieval
         """
         serializer.save()
     @action(detail=False, methods=['get'])
     def all_tasks(self, request, *args, **kwargs):
-        print("🔁 Custom AllTasks() called")
+        logger.debug("Custom AllTasks() called")
         """
         Retrieve all tasks
         """ 
-        print("🔁 Custom AllTasks() called")
         tasks = self.get_queryset()
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(tasks)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Delta sync: tasks changed and deleted since ?since=<cursor>, at most
+        ?limit= of each, with the cursor for the next call. ?assigned_to=
+        limits the copy to one user's tasks. Changes from the last
+        TASK_SYNC_LAG_SECONDS, such as the caller's own edits, are included
+        and sent again on later calls until they are older. See tasks.sync.
+        """
+        serializer = TaskValuesSerializer(sparse_fields(request))
+        scope = None
+        assignee = request.query_params.get('assigned_to')
+        if assignee:
+            if not assignee.isdigit():
+                raise ValidationError({'assigned_to': "Expected a user id."})
+            scope = Q(assigned_to_id=int(assignee))
+        return Response(task_changes(
+            self.get_queryset(), serializer,
+            since=request.query_params.get('since'),
+            limit=get_sync_page_size(request.query_params.get('limit')),
+            scope=scope,
+        ))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over task titles and subtasks, most relevant first:
+        ?q=tren bih matches "Trench Bihta". Combines with the list filters;
+        returns at most ?limit= rows, each with its search ``rank``.
+        """
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            return Response({"error": "q parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = TaskValuesSerializer(sparse_fields(request))
+        results = (
+            search_tasks(self.filter_queryset(self.get_queryset()), query, rank=True)
+            .order_by('-search_rank', 'id')
+        )
+
+        def build():
+            rows = list(results.values(*serializer.lookups, 'search_rank')[:max(limit, 0)])
+            data = serializer.to_representation(rows)
+            for item, row in zip(data, rows):
+                item['rank'] = row['search_rank']
+            return Response(data, status=status.HTTP_200_OK)
+
+        fingerprint, extra = task_list_validators(request)
+        return conditional_response(request, fingerprint, build, *extra)
 
 
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
-        print("Fetching tasks for user")
+        logger.debug("Fetching tasks for user")
         """
         Filter tasks assigned to the current user
         """
@@ -196,12 +269,11 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         tasks = self.queryset.filter(assigned_to_id=user_id)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.list_response(tasks)
     
     @action(detail=False, methods=['get'])
     def by_milestone(self, request):
-        print("Fetching tasks by milestone")
+        logger.debug("Fetching tasks by milestone")
         """
         Filter tasks by milestone
         """
@@ -213,28 +285,14 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         tasks = self.queryset.filter(milestone=milestone)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.list_response(tasks)
     
     @action(detail=False, methods=['get'])
     def by_location(self, request):
         """
         Filter tasks by location hierarchy
         """
-        state = request.query_params.get('state')
-        business_area = request.query_params.get('business_area')
-        district = request.query_params.get('district')
-        block = request.query_params.get('block')
-        
-        filters = {}
-        if state:
-            filters['state'] = state
-        if business_area:
-            filters['business_area'] = business_area
-        if district:
-            filters['district'] = district
-        if block:
-            filters['block'] = block
+        filters = location_filters(request.query_params)
         
         if not filters:
             return Response(
@@ -243,8 +301,120 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         tasks = self.queryset.filter(**filters)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.list_response(tasks)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream tasks as NDJSON (default) or CSV, row by row.
+        Accepts the same filters as by_location and by_milestone.
+        """
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = location_filters(request.query_params)
+        milestone = request.query_params.get('milestone')
+        if milestone:
+            filters['milestone'] = milestone
+
+        # The body is read after the response leaves the routing middleware,
+        # so the queryset carries the request's database itself
+        tasks = Task.objects.using(request.read_database).filter(**filters)
+        return stream_tasks(tasks, export_format)
+
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[IsAuthenticated])
+    def bulk_status(self, request):
+        """
+        Change the status of many tasks in one transaction, with one UPDATE
+        per target status. Accepts either
+            {"items": [{"id": 1, "status": "completed"}, ...]}
+        or a filter, taking the task list's filter parameters, plus a target status
+            {"filter": {"block": "BIHTA", "milestone": "row"}, "status": "completed"}
+        and reports a result for every task id.
+        """
+        valid_statuses = dict(Task.STATUS_CHOICES)
+        results = []
+        # Target status -> (queryset to move, ids the client asked for)
+        targets = {}
+
+        if 'items' in request.data:
+            items = request.data['items']
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                return Response({"error": "items must be a list of {id, status} objects"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            ids_by_status = {}
+            seen = set()
+            for item in items:
+                task_id, new_status = item.get('id'), item.get('status')
+                # type() rather than isinstance(): true and false are not ids
+                if type(task_id) is not int or task_id in seen:
+                    results.append({"id": task_id, "result": "invalid", "error": "Missing or repeated id"})
+                elif new_status not in valid_statuses:
+                    results.append({"id": task_id, "result": "invalid",
+                                    "error": f"Status must be one of: {', '.join(valid_statuses)}"})
+                else:
+                    ids_by_status.setdefault(new_status, []).append(task_id)
+                    seen.add(task_id)
+            for new_status, ids in ids_by_status.items():
+                targets[new_status] = (Task.objects.filter(pk__in=ids), ids)
+        else:
+            new_status = request.data.get('status')
+            criteria = request.data.get('filter')
+            if new_status not in valid_statuses:
+                return Response({"error": f"status must be one of: {', '.join(valid_statuses)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(criteria, dict):
+                criteria = {}
+            # Same parameters and validation as the task list filters
+            params = {
+                name: str(criteria[name]) for name in (*FILTER_PARAMS, 'days')
+                if criteria.get(name) not in (None, '', False)
+            }
+            if not params.keys() & set(FILTER_PARAMS):
+                return Response({"error": "Provide items or a non-empty filter"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            targets[new_status] = (filter_tasks(Task.objects.all(), params), [])
+
+        with transaction.atomic():
+            for new_status, (queryset, requested) in targets.items():
+                previous = queryset.set_status(new_status)
+                for task_id, old_status in sorted(previous.items()):
+                    results.append({
+                        "id": task_id,
+                        "status": new_status,
+                        "result": "unchanged" if old_status == new_status else "updated",
+                    })
+                results.extend(
+                    {"id": task_id, "result": "not_found"}
+                    for task_id in requested if task_id not in previous
+                )
+
+        updated = sum(1 for row in results if row['result'] == 'updated')
+        failed = any(row['result'] in ('invalid', 'not_found') for row in results)
+        return Response(
+            {"updated": updated, "results": results},
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAuthenticated, IsAdminUser])
+    def import_tasks(self, request):
+        """
+        Upsert tasks from an uploaded CSV or XLSX ``file``, keyed on
+        (block, milestone, title). Rejected rows are returned with reasons.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = import_tasks(upload, detect_format(upload.name))
+        except ImportFormatError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
@@ -254,6 +424,14 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().annotate(**task_counts('assigned_tasks__'))
+
+    def list(self, request, *args, **kwargs):
+        # Overdue counts depend on the date
+        build = partial(super().list, request, *args, **kwargs)
+        return cached_response(request, 'users', (TASKS, USERS), None, build, timezone.now().date())
+
 
 class MilestoneViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -262,22 +440,43 @@ class MilestoneViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Milestone.objects.all()
     serializer_class = MilestoneSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().annotate(**milestone_task_counts())
+
+    def list(self, request, *args, **kwargs):
+        build = partial(super().list, request, *args, **kwargs)
+        return cached_response(request, 'milestones', (TASKS, MILESTONES), None, build, timezone.now().date())
+
+    def retrieve(self, request, *args, **kwargs):
+        build = partial(super().retrieve, request, *args, **kwargs)
+        return cached_response(request, 'milestone', (TASKS, MILESTONES), None, build, timezone.now().date())
+
 
 @api_view(['GET'])
 def get_assigned_tasks(request, user_id):
     # Check if the user exists
     user = get_object_or_404(User, id=user_id)  
     tasks = Task.objects.filter(assigned_to=user)
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer = TaskValuesSerializer(sparse_fields(request))
+    return Response(serializer.to_representation(serializer.values(tasks)), status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 def all_tasks_view(request):
-    print("🔁 all_tasks_view called")
-    tasks = Task.objects.all()
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    logger.debug("all_tasks_view called")
+    tasks = Task.objects.all().select_related('assigned_to', Task.LOCATION_RELATED)
+
+    serializer = TaskValuesSerializer(sparse_fields(request))
+
+    def build():
+        rows = serializer.values(tasks)
+        paginator = TaskKeysetPagination()
+        page = paginator.paginate_queryset(rows, request)
+        if page is not None:
+            return paginator.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows), status=status.HTTP_200_OK)
+
+    return conditional_response(request, task_fingerprint, build)
 
 
 @api_view(['PATCH'])
@@ -285,7 +484,7 @@ def update_task_status(request, pk):
     """
     Update only the status of a task
     """
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related('assigned_to', Task.LOCATION_RELATED), pk=pk)
     
     # In a real app, you'd check permissions
     # For example: if task.assigned_to != request.user:
@@ -302,114 +501,227 @@ def update_task_status(request, pk):
 @api_view(['GET'])
 def get_states(request):
     """Get all available states"""
-    return Response(LOCATION_DATA.get('states', []))
+    def build():
+        return Response(list(State.objects.values_list('name', flat=True)))
+
+    return cached_response(request, 'states', (LOCATIONS,), location_fingerprint, build)
 
 
 @api_view(['GET'])
 def get_business_areas(request, state):
     """Get business areas for a specific state"""
-    if state not in LOCATION_DATA:
-        return Response([], status=status.HTTP_404_NOT_FOUND)
-    
-    return Response(LOCATION_DATA.get(state, {}).get('businessAreas', []))
+    def build():
+        names = list(
+            BusinessArea.objects.filter(state__name=state).values_list('name', flat=True)
+        )
+        if not names and not State.objects.filter(name=state).exists():
+            return Response([], status=status.HTTP_404_NOT_FOUND)
+
+        return Response(names)
+
+    return cached_response(request, 'business_areas', (LOCATIONS,), location_fingerprint, build)
 
 
 @api_view(['GET'])
 def get_districts(request, state, business_area):
     """Get districts for a specific state and business area"""
-    if state not in LOCATION_DATA or business_area not in LOCATION_DATA.get(state, {}):
-        return Response([], status=status.HTTP_404_NOT_FOUND)
-    
-    return Response(LOCATION_DATA.get(state, {}).get(business_area, {}).get('districts', []))
+    def build():
+        names = list(
+            District.objects.filter(
+                business_area__name=business_area,
+                business_area__state__name=state,
+            ).values_list('name', flat=True)
+        )
+        if not names and not BusinessArea.objects.filter(name=business_area, state__name=state).exists():
+            return Response([], status=status.HTTP_404_NOT_FOUND)
+
+        return Response(names)
+
+    return cached_response(request, 'districts', (LOCATIONS,), location_fingerprint, build)
 
 
 @api_view(['GET'])
 def get_blocks(request, state, business_area, district):
     """Get blocks for a specific location hierarchy"""
-    if (state not in LOCATION_DATA or 
-        business_area not in LOCATION_DATA.get(state, {}) or
-        district not in LOCATION_DATA.get(state, {}).get(business_area, {})):
-        return Response([], status=status.HTTP_404_NOT_FOUND)
-    
-    return Response(LOCATION_DATA.get(state, {}).get(business_area, {}).get(district, []))
+    def build():
+        names = list(
+            Block.objects.filter(
+                district__name=district,
+                district__business_area__name=business_area,
+                district__business_area__state__name=state,
+            ).values_list('name', flat=True)
+        )
+        if not names and not District.objects.filter(
+                name=district,
+                business_area__name=business_area,
+                business_area__state__name=state).exists():
+            return Response([], status=status.HTTP_404_NOT_FOUND)
+
+        return Response(names)
+
+    return cached_response(request, 'blocks', (LOCATIONS,), location_fingerprint, build)
 
 
 @api_view(['GET'])
 def task_summary(request):
-    print("Fetching task summary")
+    logger.debug("Fetching task summary")
     """
     Get summary statistics about tasks
     """
-    total_tasks = Task.objects.count()
-    completed_tasks = Task.objects.filter(status='completed').count()
-    in_progress_tasks = Task.objects.filter(status='in_progress').count()
-    nil_tasks = Task.objects.filter(status='nil').count()
-    
-    # Calculate completion percentage
-    completion_percentage = (
-        (completed_tasks / total_tasks) * 100 
-        if total_tasks > 0 else 0
-    )
-    
-    # Tasks due soon (within next 7 days)
+    # due_soon depends on the date, so it is part of the ETag too
     today = timezone.now().date()
-    week_ahead = today + timezone.timedelta(days=7)
-    due_soon = Task.objects.filter(
-        status='in_progress',
-        estimated_end_date__range=[today, week_ahead]
-    ).count()
-    
-    # Tasks by state
-    tasks_by_state = list(Task.objects.values('state')
-                         .annotate(count=Count('id'))
-                         .order_by('-count'))
-    
-    return Response({
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'in_progress_tasks': in_progress_tasks,
-        'nil_tasks': nil_tasks,
-        'completion_percentage': round(completion_percentage, 2),
-        'due_soon': due_soon,
-        'tasks_by_state': tasks_by_state
-    })
+
+    def build():
+        # Per-state, per-status counts come from the rollup in O(groups)
+        status_counts = {'completed': 0, 'in_progress': 0, 'nil': 0}
+        state_counts = {}
+        for row in (TaskRollup.objects.order_by()
+                    .values('block__district__business_area__state__name', 'status')
+                    .annotate(count=Sum('count'))):
+            state = row['block__district__business_area__state__name']
+            status_counts[row['status']] = status_counts.get(row['status'], 0) + row['count']
+            state_counts[state] = state_counts.get(state, 0) + row['count']
+
+        total_tasks = sum(status_counts.values())
+        completed_tasks = status_counts['completed']
+        in_progress_tasks = status_counts['in_progress']
+        nil_tasks = status_counts['nil']
+
+        # Calculate completion percentage
+        completion_percentage = (
+            (completed_tasks / total_tasks) * 100
+            if total_tasks > 0 else 0
+        )
+
+        # Tasks due soon (within next 7 days)
+        week_ahead = today + timezone.timedelta(days=7)
+        due_soon = Task.objects.filter(
+            status='in_progress',
+            estimated_end_date__range=[today, week_ahead]
+        ).count()
+
+        # Tasks by state
+        tasks_by_state = sorted(
+            ({'state': state, 'count': count} for state, count in state_counts.items() if count),
+            key=lambda row: -row['count']
+        )
+
+        return Response({
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'in_progress_tasks': in_progress_tasks,
+            'nil_tasks': nil_tasks,
+            'completion_percentage': round(completion_percentage, 2),
+            'due_soon': due_soon,
+            'tasks_by_state': tasks_by_state
+        })
+
+    return cached_response(request, 'task_summary', (TASKS, LOCATIONS), task_fingerprint, build, today)
+
+
+def status_aggregates(aggregate, field):
+    """
+    Annotations for the total and per-status counts, as Count('id') over
+    tasks or Sum('count') over rollup buckets
+    """
+    annotations = {'total': aggregate(field)}
+    for code, _ in Task.STATUS_CHOICES:
+        annotations[code] = aggregate(field, filter=Q(status=code))
+    return annotations
 
 
 @api_view(['GET'])
 def milestone_progress(request):
     """
-    Get progress information for each milestone
+    Get progress information for each milestone.
+    Optional location levels and assigned_to parameters scope the
+    counts to the filtered dashboard views.
     """
-    milestones_data = []
-    
-    # Milestone choices from Task model
-    milestone_choices = dict(Task.MILESTONE_CHOICES)
-    
-    for code, name in milestone_choices.items():
-        total = Task.objects.filter(milestone=code).count()
-        completed = Task.objects.filter(milestone=code, status='completed').count()
-        in_progress = Task.objects.filter(milestone=code, status='in_progress').count()
-        nil = Task.objects.filter(milestone=code, status='nil').count()
-        
-        # Calculate percentage
-        percentage = (completed / total) * 100 if total > 0 else 0
-        
-        milestones_data.append({
-            'code': code,
-            'name': name,
-            'total': total,
-            'completed': completed,
-            'in_progress': in_progress,
-            'nil': nil,
-            'percentage': round(percentage, 2)
-        })
-    
-    return Response(milestones_data)
+    assigned_to = request.query_params.get('assigned_to')
+    if assigned_to and not assigned_to.isdigit():
+        return Response({"assigned_to": "Expected a user id."}, status=status.HTTP_400_BAD_REQUEST)
+
+    def build():
+        filters = location_filters(request.query_params)
+        if assigned_to:
+            # The rollup is not keyed by assignee, aggregate the tasks directly
+            filters['assigned_to_id'] = int(assigned_to)
+            annotations = status_aggregates(Count, 'id')
+            source = Task.objects.filter(**filters)
+        else:
+            annotations = status_aggregates(Sum, 'count')
+            source = TaskRollup.objects.filter(**filters)
+
+        # One grouped aggregate instead of four COUNT queries per milestone
+        counts = {
+            row['milestone']: row
+            for row in source
+            .order_by()
+            .values('milestone')
+            .annotate(**annotations)
+        }
+
+        milestones_data = []
+        for code, name in Task.MILESTONE_CHOICES:
+            row = counts.get(code, {})
+            total = row.get('total') or 0
+            completed = row.get('completed') or 0
+
+            # Calculate percentage
+            percentage = (completed / total) * 100 if total > 0 else 0
+
+            milestones_data.append({
+                'code': code,
+                'name': name,
+                'total': total,
+                'completed': completed,
+                'in_progress': row.get('in_progress') or 0,
+                'nil': row.get('nil') or 0,
+                'percentage': round(percentage, 2)
+            })
+
+        return Response(milestones_data)
+
+    # Location and assignee filters are matched by name and id
+    return cached_response(request, 'milestone_progress', (TASKS, USERS, LOCATIONS), task_fingerprint, build)
+
+
+@api_view(['GET'])
+def progress_history(request):
+    """
+    Task counts by status over time from the daily progress snapshots.
+    ?bucket=day|week|month (default day), ?from= and ?to= (default the
+    last 90 days), and milestone, state, business_area and district
+    filters. Each point is the last snapshot captured in its bucket.
+    """
+    params = request.query_params
+    bucket = params.get('bucket', 'day')
+    if bucket not in DailyProgressSnapshot.BUCKETS:
+        return Response({"bucket": "Expected day, week or month."}, status=status.HTTP_400_BAD_REQUEST)
+    if params.get('block'):
+        return Response({"block": "Progress history is kept per district."}, status=status.HTTP_400_BAD_REQUEST)
+    end = parse_date(params, 'to') or timezone.now().date()
+    start = parse_date(params, 'from') or end - timezone.timedelta(days=PROGRESS_HISTORY_DAYS)
+
+    filters = {
+        lookup: params[field]
+        for field, lookup in DailyProgressSnapshot.LOCATION_LOOKUPS.items() if params.get(field)
+    }
+    milestones = parse_choices(params, 'milestone', Task.MILESTONE_CHOICES)
+    if milestones:
+        filters['milestone__in'] = milestones
+
+    def build():
+        series = DailyProgressSnapshot.objects.filter(**filters).series(bucket, start, end)
+        return Response({'bucket': bucket, 'from': start, 'to': end, 'series': series})
+
+    # The default range moves with the date, so it is part of the ETag
+    return conditional_response(request, snapshot_fingerprint, build, start, end)
 
 
 @api_view(['GET'])
 def get_current_user(request):
-    print("Fetching current user")
+    logger.debug("Fetching current user")
     """
     Get information about the currently logged-in user
     In a real application, this would use request.user
@@ -424,7 +736,7 @@ def get_current_user(request):
         )
     
     try:
-        user = User.objects.get(id=user_id)
+        user = User.objects.annotate(**task_counts('assigned_tasks__')).get(id=user_id)
         serializer = UserSerializer(user)
         return Response(serializer.data)
     except User.DoesNotExist:
@@ -0,0 +1,179 @@
+"""
+Token authentication backed by Django's cache.
+
+DRF's TokenAuthentication joins Token and User on every request. Here the
+token's creation time and its user's column values are cached under a
+hash of the token key for AUTH_TOKEN_CACHE_TTL seconds, so a warm request
+authenticates without touching the database. Each request builds its own
+Token and User from those values, so no instance is shared between
+requests or threads.
+
+Entries live in the default cache, so with a shared backend (see CACHES)
+a revocation in one worker reaches every other worker. Deleting a token
+drops its entry; saving, deleting or bulk-updating a user bumps that
+user's version, which retires every entry cached under an older one.
+Both happen at once and again when the transaction commits, so a request
+racing the write cannot re-cache the old row. With the per-process
+default cache, other workers can serve a stale entry until the TTL runs
+out.
+
+Tokens older than AUTH_TOKEN_EXPIRY seconds are rejected (0 disables
+expiry); rotate_token() replaces a user's token with a fresh one.
+"""
+import hashlib
+import time
+from datetime import timedelta
+from functools import partial
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+from .signals import users_bulk_changed
+
+ENTRY_KEY = 'auth-token:{}'
+USER_VERSION_KEY = 'auth-token:user-version:{}'
+
+
+class CachedToken(NamedTuple):
+    """What is cached for a token: plain values, never model instances"""
+    db: str
+    user_id: int
+    created: Any
+    user_values: tuple
+    user_version: int
+
+
+class TokenCache:
+    """Token key -> CachedToken in Django's cache, expiring after ``ttl``"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    @staticmethod
+    def entry_key(key):
+        # Keep raw tokens out of the cache's key space
+        return ENTRY_KEY.format(hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def user_version(user_id):
+        key = USER_VERSION_KEY.format(user_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        return version
+
+    def get(self, key):
+        """A fresh (user, token) pair for ``key``, or None on a miss"""
+        entry = cache.get(self.entry_key(key))
+        if entry is None or cache.get(USER_VERSION_KEY.format(entry.user_id)) != entry.user_version:
+            return None
+        user = User.from_db(entry.db, [field.attname for field in User._meta.concrete_fields], entry.user_values)
+        token = Token.from_db(entry.db, ['key', 'user_id', 'created'], [key, entry.user_id, entry.created])
+        token.user = user
+        return user, token
+
+    def set(self, key, token):
+        if self.ttl <= 0:
+            return
+        user = token.user
+        entry = CachedToken(
+            db=token._state.db,
+            user_id=user.pk,
+            created=token.created,
+            user_values=tuple(getattr(user, field.attname) for field in User._meta.concrete_fields),
+            user_version=self.user_version(user.pk),
+        )
+        cache.set(self.entry_key(key), entry, self.ttl)
+
+    def invalidate(self, key):
+        cache.delete(self.entry_key(key))
+
+    def invalidate_users(self, user_ids):
+        for user_id in user_ids:
+            try:
+                cache.incr(USER_VERSION_KEY.format(user_id))
+            except ValueError:
+                # No version yet means no entry was cached under one
+                pass
+
+
+token_cache = TokenCache(ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60))
+
+
+def now_and_on_commit(func, *args, using=None):
+    func(*args)
+    transaction.on_commit(partial(func, *args), using=using)
+
+
+def token_expired(token):
+    expiry = getattr(settings, 'AUTH_TOKEN_EXPIRY', 0)
+    return bool(expiry) and token.created < timezone.now() - timedelta(seconds=expiry)
+
+
+def issue_token(user):
+    """The user's current token, replacing it first if it has expired"""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token_expired(token):
+        token = rotate_token(user)
+    return token
+
+
+def rotate_token(user):
+    """Replace the user's token with a new one"""
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that serves repeat lookups from token_cache and
+    rejects expired tokens
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+        else:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            user = token.user
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed('User inactive or deleted.')
+            token_cache.set(key, token)
+
+        if token_expired(token):
+            token_cache.invalidate(key)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        return (user, token)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, using, **kwargs):
+    now_and_on_commit(token_cache.invalidate, instance.key, using=using)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user(sender, instance, using, update_fields=None, **kwargs):
+    # Covers password changes, deactivation and deletes (including bulk_delete)
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    now_and_on_commit(token_cache.invalidate_users, [instance.pk], using=using)
+
+
+@receiver(users_bulk_changed)
+def forget_bulk_changed_users(sender, user_ids, **kwargs):
+    now_and_on_commit(token_cache.invalidate_users, list(user_ids))
@@ -0,0 +1,29 @@
+"""
+Password hashing for batch user creation.
+
+PBKDF2 is deliberately slow, so hashing a few thousand passwords one after
+another takes minutes. Large batches are spread across a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Below this many passwords the pool start-up costs more than it saves
+PARALLEL_HASH_THRESHOLD = 16
+
+
+def hash_workers():
+    return getattr(settings, 'USER_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def hash_passwords(passwords):
+    """make_password() for every password, in order"""
+    workers = min(hash_workers(), len(passwords))
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or workers <= 1:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
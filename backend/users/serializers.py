@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .passwords import hash_passwords
+from .signals import users_bulk_changed
 
 User = get_user_model()
 
@@ -91,19 +97,119 @@ class UserSerializer(serializers.ModelSerializer):
         """
         Update and return an existing user, handling password correctly.
         """
+        self.assign(instance, validated_data)
+        instance.save()
+        return instance
+
+    def assign(self, instance, validated_data):
+        """
+        Copy validated data onto the instance without saving it, hashing
+        any new password. Returns the names of the fields that changed.
+        """
         # Extract password from validated data
         password = validated_data.pop('password', None)
-        
+        changed = set()
+
         # Update user fields
         for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
+            if getattr(instance, attr) != value:
+                setattr(instance, attr, value)
+                changed.add(attr)
+
         # Update password if provided
         if password:
             instance.set_password(password)
-            
-        instance.save()
-        return instance
+            changed.add('password')
+        return changed
+
+
+class UserBulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Creates a batch of users with one uniqueness query, passwords hashed
+    across a process pool and batched INSERTs.
+    """
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+
+        unique_fields = UserBatchSerializer.UNIQUE_FIELDS
+        claims = Q()
+        for field in unique_fields:
+            claims |= Q(**{f"{field}__in": [attrs[field] for attrs in validated if attrs.get(field)]})
+        taken = set()
+        for row in User.objects.filter(claims).values_list(*unique_fields):
+            taken.update(zip(unique_fields, row))
+
+        errors = []
+        for attrs in validated:
+            item_errors = {}
+            for field in unique_fields:
+                key = (field, attrs.get(field))
+                if key[1] and key in taken:
+                    item_errors[field] = [f"user with this {field} already exists."]
+                taken.add(key)
+            errors.append(item_errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def create(self, validated_data):
+        users = []
+        passwords = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            passwords.append(attrs.pop('password', None))
+            if not attrs.get('username'):
+                attrs['username'] = attrs['email']
+            users.append(User(**attrs))
+
+        hashed = iter(hash_passwords([password for password in passwords if password]))
+        for user, password in zip(users, passwords):
+            if password:
+                user.password = next(hashed)
+            else:
+                user.set_unusable_password()
+
+        using = router.db_for_write(User)
+        with transaction.atomic(using=using):
+            User.objects.using(using).bulk_create(users, batch_size=self.batch_size)
+            if not connections[using].features.can_return_rows_from_bulk_insert:
+                # MySQL does not report the new ids; read them back by username
+                self.fetch_ids(users, using)
+        users_bulk_changed.send(sender=User, user_ids=[user.pk for user in users], fields=set())
+        return users
+
+    def fetch_ids(self, users, using):
+        for start in range(0, len(users), self.batch_size):
+            batch = users[start:start + self.batch_size]
+            ids = dict(
+                User.objects.using(using)
+                .filter(username__in=[user.username for user in batch])
+                .values_list('username', 'id')
+            )
+            for user in batch:
+                user.pk = ids[user.username]
+
+
+class UserBatchSerializer(UserSerializer):
+    """
+    UserSerializer for batch writes. Username and email uniqueness is
+    checked once for the whole batch instead of with a query per row.
+    """
+    UNIQUE_FIELDS = ('username', 'email')
+
+    class Meta(UserSerializer.Meta):
+        list_serializer_class = UserBulkCreateListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.UNIQUE_FIELDS:
+            fields[name].validators = [
+                validator for validator in fields[name].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
 
 
 class UserListSerializer(serializers.ModelSerializer):
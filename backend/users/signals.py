@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after set-based writes (bulk_update, bulk_create) that bypass the
+# per-instance post_save signal. Arguments: user_ids, fields.
+users_bulk_changed = Signal()
@@ -1,6 +1,23 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from backend.testing import PASSWORD, QueryBudgetMixin, Route
+from . import urls as user_urls
+from .authentication import CachedTokenAuthentication
 from .models import User
+from .views import LegacyBulkUpdateErrors, bulk_update_users
 
 class UserModelTests(TestCase):
 
@@ -18,12 +35,13 @@ class UserModelTests(TestCase):
 class UserViewsTests(TestCase):
 
     def setUp(self):
-        self.user = User.objects.create_user(
+        self.user = User.objects.create_superuser(
             username='admin',
             password='admin',
             email='admin@example.com'
         )
-        self.client.login(username='admin', password='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
 
     def test_user_list_view(self):
         response = self.client.get(reverse('user-list'))
@@ -31,24 +49,270 @@ class UserViewsTests(TestCase):
         self.assertContains(response, 'admin')
 
     def test_user_create_view(self):
-        response = self.client.post(reverse('user-create'), {
+        response = self.client.post(reverse('user-list'), {
             'username': 'newuser',
-            'password': 'newpassword',
+            'password': 'N3w-user-pass',
+            'confirm_password': 'N3w-user-pass',
             'email': 'newuser@example.com'
-        })
-        self.assertEqual(response.status_code, 302)  # Redirect after successful creation
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
         self.assertTrue(User.objects.filter(username='newuser').exists())
 
     def test_user_update_view(self):
-        response = self.client.post(reverse('user-update', args=[self.user.id]), {
+        response = self.client.patch(reverse('user-detail', args=[self.user.id]), {
             'username': 'updateduser',
             'email': 'updateduser@example.com'
-        })
-        self.assertEqual(response.status_code, 302)  # Redirect after successful update
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
         self.user.refresh_from_db()
         self.assertEqual(self.user.username, 'updateduser')
 
     def test_user_delete_view(self):
-        response = self.client.post(reverse('user-delete', args=[self.user.id]))
-        self.assertEqual(response.status_code, 302)  # Redirect after successful deletion
-        self.assertFalse(User.objects.filter(id=self.user.id).exists())
\ No newline at end of file
+        other = User.objects.create_user(username='other', email='other@example.com', password='other')
+        response = self.client.delete(reverse('user-detail', args=[other.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(User.objects.filter(id=other.id).exists())
+
+
+class UserBulkUpdateTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        self.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='old-pass')
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('user-bulk-update')
+
+    def test_query_count_is_bounded(self):
+        items = [{'id': user.id, 'role': 'surveyor'} for user in self.users]
+        with CaptureQueriesContext(connection) as small:
+            self.client.patch(self.url, items[:2], format='json')
+        with self.assertNumQueries(len(small)):
+            response = self.client.patch(self.url, items, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.filter(role='surveyor').count(), 5)
+
+    def test_errors_are_reported_per_item(self):
+        first, second, third = self.users[:3]
+        response = self.client.patch(self.url, [
+            {'id': first.id, 'full_name': 'First', 'password': 'N3w-secret!', 'confirm_password': 'N3w-secret!'},
+            {'id': second.id, 'email': third.email},
+            {'id': 999999, 'role': 'viewer'},
+            {'role': 'viewer'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([user['id'] for user in response.json()['updated']], [first.id])
+        self.assertEqual(len(response.json()['errors']), 3)
+
+        first.refresh_from_db()
+        self.assertEqual(first.full_name, 'First')
+        self.assertTrue(first.check_password('N3w-secret!'))
+        second.refresh_from_db()
+        self.assertEqual(second.email, 'user1@example.com')
+
+    def test_ids_may_be_strings_but_must_be_numeric(self):
+        first = self.users[0]
+        response = self.client.patch(self.url, [
+            {'id': str(first.id), 'full_name': 'First'},
+            {'id': 'abc', 'full_name': 'Nobody'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([user['id'] for user in response.json()['updated']], [first.id])
+        [error] = response.json()['errors']
+        self.assertEqual(error['id'], 'abc')
+        self.assertIn('detail', error)
+
+    def test_legacy_error_shape(self):
+        _, errors = bulk_update_users([
+            {'role': 'viewer'},
+            {'id': 999999, 'role': 'viewer'},
+            {'id': 'abc'},
+            {'id': self.users[0].id, 'email': 'not-an-email'},
+        ], LegacyBulkUpdateErrors)
+        self.assertEqual(errors[:2], [
+            {'error': 'User ID is required for bulk update.'},
+            {'id': 999999, 'error': 'User does not exist.'},
+        ])
+        self.assertEqual(set(errors[2]), {'id', 'error'})
+        self.assertEqual(set(errors[3]), {'id', 'errors'})
+
+    def test_duplicate_username_within_batch(self):
+        first, second = self.users[:2]
+        response = self.client.patch(self.url, [
+            {'id': first.id, 'username': 'renamed'},
+            {'id': second.id, 'username': 'renamed'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()['errors'], [{str(second.id): {'username': ['user with this username already exists.']}}])
+
+
+class UserBulkCreateTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('user-bulk-create')
+
+    def payload(self, count, prefix='worker'):
+        return [
+            {'username': f'{prefix}{i}', 'email': f'{prefix}{i}@example.com', 'full_name': f'Worker {i}',
+             'password': 'Field-Team-2026', 'confirm_password': 'Field-Team-2026'}
+            for i in range(count)
+        ]
+
+    def test_creates_batch_with_hashed_passwords(self):
+        # Enough users to go through the process pool
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.payload(20), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 20)
+        self.assertTrue(all(row['id'] for row in response.json()))
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "users_user"')]
+        self.assertEqual(len(inserts), 1)
+
+        worker = User.objects.get(username='worker7')
+        self.assertTrue(worker.check_password('Field-Team-2026'))
+        self.assertNotEqual(worker.password, User.objects.get(username='worker8').password)
+
+    def test_ids_without_returning_inserts(self):
+        # As on MySQL, where bulk_create() leaves the primary keys unset
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.client.post(self.url, self.payload(3), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            {row['username']: row['id'] for row in response.json()},
+            dict(User.objects.filter(username__startswith='worker').values_list('username', 'id')),
+        )
+
+    def test_rejects_existing_and_repeated_usernames(self):
+        User.objects.create_user(username='worker1', email='someone@example.com')
+        items = self.payload(3)
+        items[2]['email'] = items[0]['email']
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [
+            {},
+            {'username': ['user with this username already exists.']},
+            {'email': ['user with this email already exists.']},
+        ])
+        self.assertFalse(User.objects.filter(username='worker0').exists())
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='field', email='field@example.com', password='x')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('current_user')
+
+    def test_warm_request_skips_database(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['username'], 'field')
+
+    def test_requests_get_their_own_user(self):
+        authentication = CachedTokenAuthentication()
+        first, _ = authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            second, token = authentication.authenticate_credentials(self.token.key)
+        self.assertIsNot(first, second)
+        self.assertEqual((second.pk, second.username, token.user), (self.user.pk, 'field', second))
+        # A cached user is saved like one loaded from the database
+        second.full_name = 'Field Worker'
+        second.save(update_fields=['full_name'])
+        self.assertEqual(User.objects.get(pk=self.user.pk).full_name, 'Field Worker')
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_logout_revokes_token(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_bulk_delete_invalidates_cache(self):
+        self.client.get(self.url)
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    @override_settings(AUTH_TOKEN_EXPIRY=3600)
+    def test_expired_token_is_rejected_and_rotated_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(hours=2))
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        response = self.client.post(reverse('login'), {'username': 'field', 'password': 'x'})
+        self.assertNotEqual(response.json()['token'], self.token.key)
+
+    def test_rotate(self):
+        new_key = self.client.post(reverse('token_rotate')).json()['token']
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {new_key}')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+def new_users(prefix, count=5):
+    return [
+        {'username': f'{prefix}{i}', 'email': f'{prefix}{i}@example.com', 'full_name': f'Worker {i}',
+         'password': 'Field-Team-2026', 'confirm_password': 'Field-Team-2026'}
+        for i in range(count)
+    ]
+
+
+def first_user(data):
+    return [data['users'][0].id]
+
+
+def reset_link(data):
+    user = data['users'][0]
+    return [urlsafe_base64_encode(force_bytes(user.pk)), default_token_generator.make_token(user)]
+
+
+NEW_PASSWORD = {'new_password': 'N3w-secret-2026', 'confirm_password': 'N3w-secret-2026'}
+
+# Query budgets and body ceilings (at LARGE) for every route in users/urls.py
+USER_ROUTES = [
+    Route('api-root', 'get', 0, 1),
+    Route('login', 'post', 2, 1, client='anonymous',
+          params=lambda data: {'username': data['users'][0].username, 'password': PASSWORD}),
+    Route('logout', 'post', 2, 1, token=True),
+    Route('token_rotate', 'post', 4, 1, token=True),
+    Route('password_change', 'post', 9, 1, client='user',
+          params=lambda data: {'old_password': PASSWORD, **NEW_PASSWORD}),
+    Route('password_reset', 'post', 1, 1, client='anonymous',
+          params=lambda data: {'email': data['users'][0].email}),
+    Route('password_reset_confirm', 'post', 3, 1, client='anonymous', args=reset_link,
+          params=lambda data: NEW_PASSWORD),
+    Route('current_user', 'get', 0, 1, client='user'),
+    Route('user-bulk-create', 'post', 5, 2, status=201, params=lambda data: new_users('bulk')),
+    Route('user-bulk-update', 'patch', 5, 2,
+          params=lambda data: [{'id': user.id, 'role': 'viewer'} for user in data['users'][:5]]),
+    Route('user-bulk-delete', 'post', 9, 1, params=lambda data: {'ids': [user.id for user in data['users'][1:3]]}),
+    Route('user-list', 'get', 1, 8),
+    Route('user-list', 'post', 4, 1, status=201, params=lambda data: new_users('single', 1)[0]),
+    Route('user-detail', 'get', 1, 1, args=first_user),
+    Route('user-detail', 'put', 5, 1, args=first_user, params=lambda data: {
+        'username': 'renamed', 'email': 'renamed@example.com', 'full_name': 'Renamed', 'role': 'viewer',
+    }),
+    Route('user-detail', 'patch', 3, 1, args=first_user, params=lambda data: {'role': 'viewer'}),
+    Route('user-detail', 'delete', 9, 1, status=204, args=first_user),
+]
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, TestCase):
+
+    def test_every_route_has_a_budget(self):
+        self.assert_routes_covered(USER_ROUTES, user_urls.urlpatterns)
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        self.assert_budgets(USER_ROUTES)
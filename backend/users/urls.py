@@ -11,6 +11,7 @@ urlpatterns = [
     # Auth endpoints
     path('auth/login/',    views.UserLoginView.as_view(),    name='login'),
     path('auth/logout/',   views.UserLogoutView.as_view(),   name='logout'),
+    path('auth/token/rotate/', views.TokenRotateView.as_view(), name='token_rotate'),
     path('auth/password-change/', views.PasswordChangeView.as_view(), name='password_change'),
     path('auth/password-reset/',  views.PasswordResetView.as_view(),  name='password_reset'),
     path('auth/password-reset-confirm/<uidb64>/<token>/',
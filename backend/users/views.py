@@ -1,3 +1,5 @@
+import logging
+
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from rest_framework import status, viewsets, generics, permissions
 from rest_framework.decorators import action
@@ -9,14 +11,148 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
-from .serializers import UserSerializer, UserListSerializer
+from .serializers import UserSerializer, UserListSerializer, UserBatchSerializer
+from .signals import users_bulk_changed
+from .authentication import issue_token, rotate_token
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class BulkUpdateErrors:
+    """Per-item error bodies of UserViewSet.bulk_update"""
+
+    @staticmethod
+    def missing_id():
+        return {"detail": "Each item must include an 'id'"}
+
+    @staticmethod
+    def bad_id(user_id, message):
+        return {"id": user_id, "detail": message}
+
+    @staticmethod
+    def not_found(user_id):
+        return {"id": user_id, "detail": "User not found"}
+
+    @staticmethod
+    def invalid(user_id, errors):
+        return {user_id: errors}
+
+
+class LegacyBulkUpdateErrors:
+    """Per-item error bodies of UserBulkUpdateView"""
+
+    @staticmethod
+    def missing_id():
+        return {"error": "User ID is required for bulk update."}
+
+    @staticmethod
+    def bad_id(user_id, message):
+        return {"id": user_id, "error": message}
+
+    @staticmethod
+    def not_found(user_id):
+        return {"id": user_id, "error": "User does not exist."}
+
+    @staticmethod
+    def invalid(user_id, errors):
+        return {"id": user_id, "errors": errors}
+
+
+def bulk_update_users(items, error_format=BulkUpdateErrors):
+    """
+    Apply a batch of partial user updates with a bounded number of queries:
+    one in_bulk fetch, one uniqueness lookup and one bulk_update inside a
+    transaction. Returns (updated users as data, per-item errors), the
+    errors built by ``error_format``.
+    """
+    # Ids arrive as JSON numbers or strings; in_bulk keys by the int pk
+    user_ids = {}
+    errors = []
+    for index, item in enumerate(items):
+        if not item.get("id"):
+            continue
+        try:
+            user_ids[index] = User._meta.pk.to_python(item["id"])
+        except ValidationError as exc:
+            user_ids[index] = exc
+    users = User.objects.in_bulk([user_id for user_id in user_ids.values() if isinstance(user_id, int)])
+    pending = []
+
+    for index, item in enumerate(items):
+        user_id = item.get("id")
+        if not user_id:
+            errors.append(error_format.missing_id())
+            continue
+        if isinstance(user_ids[index], ValidationError):
+            errors.append(error_format.bad_id(user_id, user_ids[index].messages[0]))
+            continue
+        instance = users.get(user_ids[index])
+        if instance is None:
+            errors.append(error_format.not_found(user_id))
+            continue
+        serializer = UserBatchSerializer(instance, data=item, partial=True)
+        if serializer.is_valid():
+            pending.append(serializer)
+        else:
+            errors.append(error_format.invalid(user_id, serializer.errors))
+
+    # Usernames and emails claimed by the batch, checked against the table
+    # and against earlier items of the same batch
+    unique_fields = UserBatchSerializer.UNIQUE_FIELDS
+    claims = Q()
+    for field in unique_fields:
+        values = [s.validated_data[field] for s in pending if field in s.validated_data]
+        if values:
+            claims |= Q(**{f"{field}__in": values})
+    owners = {}
+    if claims:
+        for row in User.objects.filter(claims).values("id", *unique_fields):
+            for field in unique_fields:
+                owners[(field, row[field])] = row["id"]
+
+    accepted = []
+    for serializer in pending:
+        user_id = serializer.instance.pk
+        keys = [(field, serializer.validated_data[field]) for field in unique_fields
+                if field in serializer.validated_data]
+        clashes = {
+            field: [f"user with this {field} already exists."]
+            for field, value in keys if owners.get((field, value), user_id) != user_id
+        }
+        if clashes:
+            errors.append(error_format.invalid(user_id, clashes))
+            continue
+        owners.update((key, user_id) for key in keys)
+        accepted.append(serializer)
+
+    changed_users = []
+    fields = set()
+    for serializer in accepted:
+        changed = serializer.assign(serializer.instance, dict(serializer.validated_data))
+        if changed:
+            changed_users.append(serializer.instance)
+            fields |= changed
+
+    if changed_users:
+        now = timezone.now()
+        for user in changed_users:
+            user.updated_at = now
+        with transaction.atomic():
+            User.objects.bulk_update(changed_users, sorted(fields) + ["updated_at"], batch_size=1000)
+        users_bulk_changed.send(
+            sender=User, user_ids=[user.pk for user in changed_users], fields=fields
+        )
+
+    return [UserSerializer(serializer.instance).data for serializer in accepted], errors
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -34,7 +170,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return UserSerializer
 
     def get_permissions(self):
-        print(f"🔥 UserViewSet: {self.action} endpoint called")
+        logger.debug("UserViewSet: %s endpoint called", self.action)
         if self.action == 'list':
             return [AllowAny()]  # ✅ Anyone can access user list
         elif self.action == 'bulk_create':  # ✅ Allow unauthenticated users to bulk create
@@ -50,10 +186,10 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk-create', permission_classes=[IsAuthenticated, IsAdminUser])
     def bulk_create(self, request):
-        print("🔥 bulk_create endpoint called")
+        logger.debug("bulk_create endpoint called")
         # if not request.user.is_authenticated:
         #     return Response({"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
-        serializer = self.get_serializer(data=request.data, many=True)
+        serializer = UserBatchSerializer(data=request.data, many=True, context=self.get_serializer_context())
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -63,33 +199,12 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['patch'], url_path='bulk-update', permission_classes=[IsAuthenticated, IsAdminUser])
     def bulk_update(self, request):
-        print("🔥 bulk_update endpoint called")
-        print(f"Request data: {request.data}")
+        logger.debug("bulk_update endpoint called")
 
         if not isinstance(request.data, list) or not all(isinstance(item, dict) for item in request.data):
             return Response({"detail": "Expected a list of user update dictionaries."}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_users = []
-        errors = []
-
-        for item in request.data:
-            user_id = item.get("id")
-            if not user_id:
-                errors.append({"detail": "Each item must include an 'id'"})
-                continue
-
-            try:
-                instance = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                errors.append({"id": user_id, "detail": "User not found"})
-                continue
-
-            serializer = UserSerializer(instance, data=item, partial=True)
-            if serializer.is_valid():
-                serializer.save()
-                updated_users.append(serializer.data)
-            else:
-                errors.append({user_id: serializer.errors})
+        updated_users, errors = bulk_update_users(request.data)
 
         if errors:
             return Response(
@@ -136,7 +251,7 @@ class UserLoginView(APIView):
         user = authenticate(username=username, password=password)
         
         if user:
-            token, _ = Token.objects.get_or_create(user=user)
+            token = issue_token(user)
             return Response({
                 'token': token.key,
                 'role': user.role if hasattr(user, 'role') and user.role else 'user',
@@ -159,13 +274,27 @@ class UserLogoutView(APIView):
 
     def post(self, request):
         logout(request)
+        # Revoke the API token too; deleting it drops it from the auth cache
+        if isinstance(request.auth, Token):
+            request.auth.delete()
         return Response({"detail": "Successfully logged out."})
 
+
+class TokenRotateView(APIView):
+    """
+    View to replace the current user's API token with a new one.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        token = rotate_token(request.user)
+        return Response({"token": token.key})
+
 class UserBulkCreateView(generics.CreateAPIView):
     """
     View for creating multiple users at once.
     """
-    serializer_class = UserSerializer
+    serializer_class = UserBatchSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def create(self, request, *args, **kwargs):
@@ -187,29 +316,10 @@ class UserBulkUpdateView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def patch(self, request):
-        user_data = request.data
-        updated_users = []
-        errors = []
-
-        for data in user_data:
-            try:
-                user_id = data.pop('id', None)
-                if not user_id:
-                    errors.append({"error": "User ID is required for bulk update."})
-                    continue
-
-                user = User.objects.get(id=user_id)
-                serializer = UserSerializer(user, data=data, partial=True)
-                
-                if serializer.is_valid():
-                    serializer.save()
-                    updated_users.append(serializer.data)
-                else:
-                    errors.append({"id": user_id, "errors": serializer.errors})
-            except User.DoesNotExist:
-                errors.append({"id": user_id, "error": "User does not exist."})
-            except Exception as e:
-                errors.append({"id": user_id, "error": str(e)})
+        if not isinstance(request.data, list) or not all(isinstance(item, dict) for item in request.data):
+            return Response({"detail": "Expected a list of user update dictionaries."}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated_users, errors = bulk_update_users(request.data, LegacyBulkUpdateErrors)
 
         return Response({
             "updated": updated_users,
@@ -23,6 +23,7 @@ export async function logout() {
     localStorage.removeItem('userRole');
     localStorage.removeItem('userName');
     localStorage.removeItem('userId');
+    localStorage.removeItem(TASK_SYNC_KEY);
     if (!response.ok) throw new Error(`Logout failed: ${response.status}`);
     return await response.json();
 }
@@ -44,6 +45,60 @@ export async function AllTasks() {
     return await response.json();
 }
 
+// Local copy of one user's tasks, kept current with tasks/changes/ deltas
+export const TASK_SYNC_KEY = 'taskSync';
+
+function loadTaskSync(userId) {
+    try {
+        const saved = JSON.parse(localStorage.getItem(TASK_SYNC_KEY)) || {};
+        return saved.userId === userId ? saved : {};
+    } catch {
+        return {};
+    }
+}
+
+function saveTaskSync(sync) {
+    try {
+        localStorage.setItem(TASK_SYNC_KEY, JSON.stringify(sync));
+    } catch {
+        // Over the storage quota (or storage disabled): sync in full next time
+        localStorage.removeItem(TASK_SYNC_KEY);
+    }
+}
+
+// Returns the user's tasks, fetching only rows changed or deleted since the last sync
+export async function syncTasks(userId) {
+    const saved = loadTaskSync(userId);
+    const tasks = new Map((saved.tasks || []).map(task => [task.id, task]));
+    let cursor = saved.cursor;
+    let hasMore = true;
+    while (hasMore) {
+        const params = new URLSearchParams({ assigned_to: userId });
+        if (cursor) params.set('since', cursor);
+        const response = await fetch(`${BASE_URL}tasks/tasks/changes/?${params}`, {
+            headers: authHeaders(),
+        });
+        if (cursor && (response.status === 410 || response.status === 404)) {
+            // Expired or unreadable cursor: start over with a full sync
+            localStorage.removeItem(TASK_SYNC_KEY);
+            return syncTasks(userId);
+        }
+        if (!response.ok) {
+            const error = new Error(`Failed to sync tasks: ${response.status}`);
+            error.status = response.status;
+            throw error;
+        }
+        const page = await response.json();
+        page.deleted.forEach(id => tasks.delete(id));
+        page.changed.forEach(task => tasks.set(task.id, task));
+        cursor = page.cursor;
+        hasMore = page.has_more;
+    }
+    const all = [...tasks.values()];
+    saveTaskSync({ userId, cursor, tasks: all });
+    return all;
+}
+
 export async function addTask(task) {
     const response = await fetch(`${BASE_URL}tasks/tasks/`, {
         method: 'POST',
@@ -97,6 +152,16 @@ export async function fetchMilestoneProgress() {
     return await response.json();
 }
 
+// Status counts over time; params: bucket (day|week|month), from, to, milestone, state, business_area, district
+export async function fetchProgressHistory(params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${BASE_URL}tasks/dashboard/progress-history/?${query}`, {
+        headers: authHeaders(),
+    });
+    if (!response.ok) throw new Error(`Failed to fetch progress history: ${response.status}`);
+    return await response.json();
+}
+
 export async function addUser(user) {
     const token = localStorage.getItem('authToken');
     if (!token) throw new Error('Authentication token is missing. Please log in.');
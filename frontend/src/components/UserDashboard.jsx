@@ -3,6 +3,7 @@ import { AlertCircle, LogOut } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 import './UserDashboard.css';
 import bannerImage from '../assets/banner.jpg';
+import { syncTasks, TASK_SYNC_KEY } from '../api/taskApi';
 
 // Read from .env — never hardcoded
 const BASE_URL = `${import.meta.env.VITE_API_BASE_URL}/`;
@@ -46,6 +47,7 @@ const UserDashboard = () => {
         localStorage.removeItem('userRole');
         localStorage.removeItem('userName');
         localStorage.removeItem('userId');
+        localStorage.removeItem(TASK_SYNC_KEY);
         navigate('/');
         window.location.reload();
     };
@@ -59,23 +61,17 @@ const UserDashboard = () => {
         try {
             setIsLoading(true);
             setError('');
-            const response = await fetch(`${BASE_URL}tasks/alltasks/`, {
-                method: 'GET',
-                headers: authHeaders,
-            });
-            if (response.status === 401) { handleLogout(); return; }
-            if (!response.ok) throw new Error(`Failed to fetch tasks: ${response.status}`);
-
-            const allTasks = await response.json();
-            const numericUserId = parseInt(userId, 10);
-
-            const userTasks = allTasks.filter(task => {
-                const assigned = task.assigned_to;
-                if (typeof assigned === 'object' && assigned !== null) return assigned.id === numericUserId;
-                if (typeof assigned === 'number') return assigned === numericUserId;
-                if (typeof assigned === 'string') return parseInt(assigned, 10) === numericUserId;
-                return false;
-            });
+            let userTasks;
+            try {
+                // Only this user's tasks are synced and kept locally
+                userTasks = await syncTasks(userId);
+            } catch (err) {
+                if (err.status === 401) { handleLogout(); return; }
+                throw err;
+            }
+            // Same order as tasks/alltasks/: newest start date first, then title
+            userTasks.sort((a, b) =>
+                b.start_date.localeCompare(a.start_date) || a.title.localeCompare(b.title));
 
             setTasks(userTasks.map(task => ({
                 ...task,